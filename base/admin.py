@@ -1,6 +1,7 @@
 from django.contrib import admin
-from .models import Session, Exercise, Line
+from .models import Session, Exercise, Line, PersonalRecord
 
 admin.site.register(Session)
 admin.site.register(Exercise)
 admin.site.register(Line)
+admin.site.register(PersonalRecord)
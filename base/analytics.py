@@ -0,0 +1,339 @@
+"""
+Author: Joshua Delos Santos
+Date: 18/10/2026
+
+
+This file computes training analytics over a user's whole history with NumPy.
+
+All lines of the user are read with one values_list() query and kept as
+columns: exercise id, weight, reps and date arrays. The query is run on a
+cursor directly and its rows are fetched into a structured array, skipping
+the per-value Decimal and datetime conversions of the ORM; dates come back
+as days since the Unix epoch (EpochDays). The columns are then sorted by
+exercise and date, so per-exercise results are reductions over contiguous
+groups (ufunc.reduceat) rather than Python loops. From the columns it
+derives:
+
+    - estimated one-rep max of every set, with the Epley and Brzycki formulas
+    - relative intensity of every set: its weight over the best Epley
+      estimate of the exercise so far
+    - volume (weight x reps) per exercise and week, weeks starting on Monday
+    - the acute:chronic workload ratio of every day: the mean daily volume
+      over the last 7 days divided by the mean over the last 28
+
+Days and weeks are those of the current time zone, like the progress
+series (see base/progress.py). The results are cached in the listing cache
+until the user's data changes.
+
+Loading is what costs: the database driver still builds a Python object
+for every value, so 500,000 lines take about 0.9 s to load on SQLite, of
+which the query itself is about 0.2 s, and the analytics about 0.2 s more.
+Only SQLite and PostgreSQL can compute EpochDays; other backends raise
+NotSupportedError.
+
+NumPy is optional. Without it ANALYTICS_AVAILABLE is False and the
+statistics page and API leave the analytics out.
+
+
+Example:
+    if ANALYTICS_AVAILABLE:
+        analytics = get_analytics(request.user)
+        analytics['exercises'][0]['epley_1rm']  # 123.33
+"""
+
+
+from datetime import timedelta, timezone as dt_timezone
+from django.db import NotSupportedError, connection
+from django.db.models import FloatField, Func
+from django.utils import timezone
+from base.listing_cache import listing_cache
+from base.models import Exercise
+from users.api.app_user import AppUser
+
+try:
+    import numpy as np
+except ImportError:  # Optional dependency, analytics are turned off without it
+    np = None
+
+
+ANALYTICS_AVAILABLE = np is not None
+COLUMN_DTYPE = [('exercise_id', 'i8'), ('weight', 'f8'), ('reps', 'i8'), ('date', 'f8')]  # One record per fetched row
+UNIX_EPOCH_JULIAN_DAY = 2440587.5
+SECONDS_PER_DAY = 86_400
+MICROSECONDS_PER_DAY = 86_400_000_000
+ACUTE_DAYS = 7
+CHRONIC_DAYS = 28
+MAX_BRZYCKI_REPS = 36  # The formula divides by 37 - reps
+WEEKDAY_OF_EPOCH = 3  # 1970-01-01 was a Thursday, Monday is 0
+
+
+
+class EpochDays(Func):
+    """
+    The date of a DateTimeField as fractional days since the Unix epoch, so the database returns
+    a number instead of a datetime that would be built for every row. SQLite and PostgreSQL only.
+    """
+    output_field = FloatField()
+
+
+    def as_sql(self, compiler, connection, **extra_context):
+        raise NotSupportedError(f"EpochDays is not supported on {connection.vendor}.")
+
+
+    def as_sqlite(self, compiler, connection, **extra_context):
+        template = f'(julianday(%(expressions)s) - {UNIX_EPOCH_JULIAN_DAY})'
+        return super().as_sql(compiler, connection, template=template, **extra_context)
+
+
+    def as_postgresql(self, compiler, connection, **extra_context):
+        template = f'(EXTRACT(EPOCH FROM %(expressions)s) / {SECONDS_PER_DAY})'
+        return super().as_sql(compiler, connection, template=template, **extra_context)
+
+
+
+class LineColumns:
+    """
+    A user's lines as parallel arrays, ordered by exercise, then date.
+
+    Attributes:
+        exercise_ids (ndarray): int64 exercise id of each line.
+        weights (ndarray): float64 weight of each line.
+        reps (ndarray): int64 reps of each line.
+        dates (ndarray): datetime64[us] date of each line, in the current time zone.
+    """
+    def __init__(self, exercise_ids, weights, reps, dates):
+        """
+        Initialise the columns.
+        """
+        self.exercise_ids = exercise_ids
+        self.weights = weights
+        self.reps = reps
+        self.dates = dates
+
+
+    def __len__(self):
+        """
+        Return the number of lines.
+        """
+        return len(self.exercise_ids)
+
+
+    def group_starts(self):
+        """
+        Return the index of the first line of every exercise, for ufunc.reduceat().
+        """
+        return np.flatnonzero(np.r_[True, self.exercise_ids[1:] != self.exercise_ids[:-1]])
+
+
+
+def load_line_columns(user):
+    """
+    Load all lines of a user as LineColumns with a single query.
+
+    Returns:
+        LineColumns: The columns, empty arrays if the user has no lines.
+    """
+    queryset = AppUser(user).get_user_lines().values_list('exercise_id', 'weight', 'reps', EpochDays('date'))
+    sql, params = queryset.query.sql_with_params()
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        rows = np.array(cursor.fetchall(), dtype=COLUMN_DTYPE)  # Faster than stepping the cursor with np.fromiter()
+
+    dates = to_local_time((rows['date'] * MICROSECONDS_PER_DAY).round().astype('datetime64[us]'))
+    order = np.lexsort((dates, rows['exercise_id']))  # Sorting here is several times faster than ORDER BY in SQLite
+    return LineColumns(rows['exercise_id'][order], rows['weight'][order], rows['reps'][order], dates[order])
+
+
+
+def to_local_time(dates):
+    """
+    Turn UTC datetime64[us] dates into wall-clock dates of the current time zone. The offset is
+    looked up once per UTC day; only the dates of a day whose offset changes are looked up one by one.
+    """
+    zone = timezone.get_current_timezone()
+    days, day_index = np.unique(dates.astype('datetime64[D]'), return_inverse=True)
+    bounds = np.array([_utc_offset(day, zone) for day in np.r_[days, days[-1:] + 1].astype('datetime64[us]').tolist()], dtype=np.int64)
+    offsets = bounds[:-1][day_index]
+
+    changing = np.flatnonzero(np.isin(day_index, np.flatnonzero(bounds[:-1] != bounds[1:])))
+    offsets[changing] = [_utc_offset(moment, zone) for moment in dates[changing].tolist()]
+
+    return dates + offsets.astype('timedelta64[us]')
+
+
+
+def _utc_offset(moment, zone):
+    """
+    Offset of a naive UTC datetime in a time zone, in microseconds.
+    """
+    return moment.replace(tzinfo=dt_timezone.utc).astimezone(zone).utcoffset() // timedelta(microseconds=1)
+
+
+
+def epley(weights, reps):
+    """
+    Estimated one-rep max with the Epley formula, weight x (1 + reps / 30).
+    A single is its own one-rep max. NaN for sets without a positive weight and reps.
+    """
+    estimate = np.where(reps == 1, weights, weights * (1 + reps / 30))
+    return np.where((weights > 0) & (reps > 0), estimate, np.nan)
+
+
+
+def brzycki(weights, reps):
+    """
+    Estimated one-rep max with the Brzycki formula, weight x 36 / (37 - reps).
+    NaN for sets without a positive weight and reps, and above MAX_BRZYCKI_REPS reps.
+    """
+    valid = (weights > 0) & (reps > 0) & (reps <= MAX_BRZYCKI_REPS)
+    return np.where(valid, weights * 36 / np.where(valid, 37 - reps, 1), np.nan)
+
+
+
+def relative_intensity(columns, one_rep_maxes):
+    """
+    Weight of every set as a fraction of the best one-rep max estimate of its exercise so far,
+    including the set itself. NaN while an exercise has no valid estimate yet.
+    """
+    if not len(columns):
+        return np.empty(0)
+
+    best = np.nan_to_num(one_rep_maxes, nan=0.0)
+    # A running maximum per exercise in one pass: lift each group above every earlier one, then take it off again
+    group = np.cumsum(np.r_[False, columns.exercise_ids[1:] != columns.exercise_ids[:-1]])
+    offset = group * (best.max() + 1)
+    running_best = np.maximum.accumulate(best + offset) - offset
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.where(running_best > 0, columns.weights / running_best, np.nan)
+
+
+
+def weekly_volume(columns):
+    """
+    Total volume of every exercise per week.
+
+    Returns:
+        tuple: (exercise ids, Monday of each week as datetime64[D], volumes), sorted by exercise then week.
+    """
+    days = columns.dates.astype('datetime64[D]')
+    if not len(days):
+        return columns.exercise_ids, days, np.empty(0)
+
+    mondays = days - (days.astype(np.int64) + WEEKDAY_OF_EPOCH) % 7
+    # Lines are sorted by exercise and date, so every exercise's week is one contiguous run
+    starts = np.flatnonzero(np.r_[True, (columns.exercise_ids[1:] != columns.exercise_ids[:-1]) | (mondays[1:] != mondays[:-1])])
+    volumes = np.add.reduceat(columns.weights * columns.reps, starts)
+
+    return columns.exercise_ids[starts], mondays[starts], volumes
+
+
+
+def workload_ratio(columns, acute_days=ACUTE_DAYS, chronic_days=CHRONIC_DAYS):
+    """
+    Acute:chronic workload ratio of every day from the first line to the last, using the
+    total volume of each day as its load and rolling means over both windows.
+
+    Returns:
+        tuple: (days as datetime64[D], daily loads, acute means, chronic means, ratios). A ratio
+            is NaN until a full chronic window has passed or when the chronic load is 0.
+    """
+    days = columns.dates.astype('datetime64[D]')
+    if not len(days):
+        empty = np.empty(0)
+        return days, empty, empty, empty, empty
+
+    first = days.min()
+    offsets = (days - first).astype(np.int64)
+    loads = np.bincount(offsets, weights=columns.weights * columns.reps)
+
+    totals = np.r_[0.0, np.cumsum(loads)]
+    index = np.arange(len(loads))
+    acute = (totals[index + 1] - totals[np.maximum(index + 1 - acute_days, 0)]) / acute_days
+    chronic = (totals[index + 1] - totals[np.maximum(index + 1 - chronic_days, 0)]) / chronic_days
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        ratios = np.where((index >= chronic_days - 1) & (chronic > 0), acute / chronic, np.nan)
+
+    return first + index.astype('timedelta64[D]'), loads, acute, chronic, ratios
+
+
+
+def get_analytics(user):
+    """
+    Get the analytics of a user, served from the listing cache until the user's data changes.
+
+    Args:
+        user (User): The user whose lines are analysed.
+
+    Returns:
+        dict: 'exercises', a list with the id, name, slug and session slug of every exercise that has
+            lines, its best 'epley_1rm' and 'brzycki_1rm', the 'intensity' of its latest set and its
+            'weekly_volume' ({'week', 'volume'} per week, oldest first); and 'workload', the latest
+            'acute', 'chronic' and 'ratio' and the daily 'series' of them.
+
+    Raises:
+        RuntimeError: If NumPy is not installed.
+    """
+    if not ANALYTICS_AVAILABLE:
+        raise RuntimeError("Analytics need NumPy, which is not installed.")
+
+    return listing_cache.get_or_load(user.id, 'analytics', lambda: _load_analytics(user))
+
+
+
+def _load_analytics(user):
+    """
+    Compute the analytics with one query for the lines and one for the exercise names.
+    """
+    columns = load_line_columns(user)
+    if not len(columns):
+        return {'exercises': [], 'workload': {'acute': None, 'chronic': None, 'ratio': None, 'series': []}}
+
+    epley_1rm = epley(columns.weights, columns.reps)
+    brzycki_1rm = brzycki(columns.weights, columns.reps)
+    intensity = relative_intensity(columns, epley_1rm)
+
+    starts = columns.group_starts()
+    ends = np.r_[starts[1:], len(columns)] - 1
+    best_epley = np.fmax.reduceat(epley_1rm, starts)  # fmax skips NaN
+    best_brzycki = np.fmax.reduceat(brzycki_1rm, starts)
+
+    volume_exercises, volume_weeks, volumes = weekly_volume(columns)
+    weeks = {}
+    for exercise_id, week, volume in zip(volume_exercises.tolist(), volume_weeks.tolist(), volumes.tolist()):
+        weeks.setdefault(exercise_id, []).append({'week': week, 'volume': round(volume, 2)})
+
+    stats = {
+        exercise_id: {'epley_1rm': _number(best_epley[group]), 'brzycki_1rm': _number(best_brzycki[group]),
+                      'intensity': _number(intensity[ends[group]]), 'weekly_volume': weeks[exercise_id]}
+        for group, exercise_id in enumerate(columns.exercise_ids[starts].tolist())
+    }
+    exercises = (
+        Exercise.objects.filter(id__in=list(stats), user=user)
+        .order_by('session__name', 'name')
+        .values('id', 'name', 'slug', 'session__slug')
+    )
+
+    days, loads, acute, chronic, ratios = workload_ratio(columns)
+    series = [
+        {'date': day, 'load': _number(load), 'acute': _number(acute_mean), 'chronic': _number(chronic_mean), 'ratio': _number(ratio)}
+        for day, load, acute_mean, chronic_mean, ratio in zip(days.tolist(), loads, acute, chronic, ratios)
+    ]
+
+    return {
+        'exercises': [
+            {'id': exercise['id'], 'name': exercise['name'], 'slug': exercise['slug'],
+             'session': exercise['session__slug'], **stats[exercise['id']]}
+            for exercise in exercises
+        ],
+        'workload': {'acute': series[-1]['acute'], 'chronic': series[-1]['chronic'], 'ratio': series[-1]['ratio'], 'series': series},
+    }
+
+
+
+def _number(value):
+    """
+    Turn a NumPy scalar into a float rounded to 2 places, None for NaN.
+    """
+    return None if np.isnan(value) else round(float(value), 2)
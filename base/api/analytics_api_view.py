@@ -0,0 +1,31 @@
+"""
+Author: Joshua Delos Santos
+Date: 18/10/2026
+"""
+
+from django.http import JsonResponse
+from base.analytics import ANALYTICS_AVAILABLE, get_analytics
+from base.api.api_view import ApiView
+from base.api.conditional import json_response
+
+
+class AnalyticsApiView(ApiView):
+    """
+    Return the estimated one-rep maxes, intensity, weekly volume and workload ratio of the authenticated user.
+
+    GET /api/v1/analytics/
+        {"exercises": [{"id": 1, "name": "Squats", "slug": "squats", "session": "leg-day", "epley_1rm": 116.67,
+          "brzycki_1rm": 112.5, "intensity": 0.86, "weekly_volume": [{"week": "2024-01-01", "volume": 1500.0}]}],
+         "workload": {"acute": 214.29, "chronic": 180.0, "ratio": 1.19,
+          "series": [{"date": "2024-01-01", "load": 1500.0, "acute": 214.29, "chronic": 53.57, "ratio": null}]}}
+
+    Answers 501 when NumPy is not installed.
+    """
+    def get(self, request):
+        """
+        Handle GET requests: return the analytics of the user's whole history.
+        """
+        if not ANALYTICS_AVAILABLE:
+            return JsonResponse({'error': 'Analytics are not available on this server.'}, status=501)
+
+        return json_response(get_analytics(request.user))
@@ -0,0 +1,41 @@
+"""
+Author: Joshua Delos Santos
+Date: 18/10/2026
+"""
+
+from django.http import JsonResponse
+from django.utils.cache import get_conditional_response
+from django.views import View
+from base.api.conditional import api_validators, tag_response
+
+
+class ApiView(View):
+    """
+    Base class for the read-only JSON API views.
+
+    Answers unauthenticated requests with a 401 JSON error instead of redirecting to the login page,
+    and reads whose ETag or Last-Modified still match with 304 before the handler runs.
+    """
+    http_method_names = ['get', 'head', 'options']
+
+
+    def dispatch(self, request, *args, **kwargs):
+        """
+        Reject unauthenticated requests, then return 304 when the user's data has not changed,
+        otherwise dispatch and tag the response.
+        """
+        if not request.user.is_authenticated:
+            return JsonResponse({'error': 'Authentication required.'}, status=401)
+
+        if request.method not in ('GET', 'HEAD'):
+            return super().dispatch(request, *args, **kwargs)
+
+        etag, last_modified = api_validators(request)
+        response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+        if response is None:
+            response = super().dispatch(request, *args, **kwargs)
+
+        if response.status_code in (200, 304):
+            tag_response(response, etag, last_modified)
+
+        return response
@@ -0,0 +1,82 @@
+"""
+Author: Joshua Delos Santos
+Date: 18/10/2026
+
+
+This file answers repeated API reads with 304 Not Modified.
+
+Every API payload is derived from the user's data, and every write bumps
+the user's data version (see base/data_version.py). ApiView builds an
+ETag from that version and the request's path and query string before the
+handler runs, which costs one cache read and no query, so a matching
+If-None-Match or If-Modified-Since is answered with 304 without loading
+anything. Otherwise the handler runs and its response is sent with the
+ETag.
+
+Last-Modified is the time of the user's last change, which moves on every
+write, deletes included. HTTP dates have whole seconds, so a change in the
+same second as the response could be missed by a client comparing dates;
+Last-Modified is therefore left out until the last change is a second old,
+and the ETag alone is sent.
+
+The version is read before the handler runs, so a write that lands during
+it can only make the ETag older than the payload, which costs one extra
+load on the next request, never a stale 304. Responses are sent with
+Cache-Control: private, no-cache, so clients always revalidate and shared
+caches never store them.
+
+
+Example:
+    etag, last_modified = api_validators(request)
+    return json_response({'sessions': rows})
+"""
+
+
+import hashlib
+import json
+import time
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import HttpResponse
+from django.utils.cache import patch_cache_control
+from django.utils.http import http_date
+from base.data_version import get_last_change
+
+
+
+def api_validators(request):
+    """
+    Build the ETag and Last-Modified of an API read for the request's user.
+
+    Returns:
+        tuple: (etag, last_modified), the quoted ETag and the Unix time of the user's last change.
+    """
+    version, changed_at = get_last_change(request.user.id)
+    digest = hashlib.sha256(f'{request.user.id}:{version}:{request.get_full_path()}'.encode()).hexdigest()
+
+    return f'"{digest[:32]}"', int(changed_at)
+
+
+
+def tag_response(response, etag, last_modified):
+    """
+    Send the validators and the revalidation Cache-Control with a 200 or 304 API response.
+    """
+    response.headers['ETag'] = etag
+    if last_modified < int(time.time()):
+        response.headers['Last-Modified'] = http_date(last_modified)
+    patch_cache_control(response, private=True, no_cache=True)  # Clients may keep it but must revalidate
+
+
+
+def json_response(payload):
+    """
+    Return payload as compact JSON.
+
+    Args:
+        payload (dict): The data to send.
+
+    Returns:
+        HttpResponse: The JSON response.
+    """
+    body = json.dumps(payload, cls=DjangoJSONEncoder, separators=(',', ':'))
+    return HttpResponse(body, content_type='application/json')
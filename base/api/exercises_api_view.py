@@ -0,0 +1,38 @@
+"""
+Author: Joshua Delos Santos
+Date: 18/10/2026
+"""
+
+from base.api.api_view import ApiView
+from base.api.conditional import json_response
+from base.viewModels.exercises_view_model import ExerciseViewModel
+from users.api.app_user import AppUser
+
+
+EXERCISE_FIELDS = ('id', 'name', 'slug', 'updated_at')
+
+
+class ExercisesApiView(ApiView):
+    """
+    List the exercises of one of the authenticated user's sessions.
+
+    GET /api/v1/sessions/<session_slug>/exercises/
+        {"exercises": [{"id": 1, "name": "Bench Press", "slug": "bench-press", "updated_at": "..."}]}
+    """
+    def setup(self, request, *args, **kwargs):
+        """
+        Initialize view_model before dispatch.
+        Called by Django for each request.
+        """
+        super().setup(request, *args, **kwargs)
+        self.view_model = ExerciseViewModel(request.user)
+
+
+    def get(self, request, session_slug):
+        """
+        Handle GET requests: return the exercises of the session as compact values() rows.
+        """
+        session = self.view_model.get_session(session_slug)
+        exercises = list(AppUser(request.user).get_session_exercises(session).order_by('id').values(*EXERCISE_FIELDS))
+
+        return json_response({'exercises': exercises})
@@ -0,0 +1,40 @@
+"""
+Author: Joshua Delos Santos
+Date: 18/10/2026
+"""
+
+from base.api.api_view import ApiView
+from base.api.conditional import json_response
+from base.pagination import paginate_lines
+from base.viewModels.lines_view_model import LinesViewModel
+from users.api.app_user import AppUser
+
+
+LINE_FIELDS = ('id', 'weight', 'reps', 'date')
+
+
+class LinesApiView(ApiView):
+    """
+    List one page of the lines of an exercise, newest first.
+
+    GET /api/v1/sessions/<session_slug>/exercises/<exercise_slug>/lines/?cursor=<cursor>
+        {"lines": [{"id": 1, "weight": "100.00", "reps": 5, "date": "..."}], "next_cursor": "..."}
+    """
+    def setup(self, request, *args, **kwargs):
+        """
+        Initialize view_model before dispatch.
+        Called by Django for each request.
+        """
+        super().setup(request, *args, **kwargs)
+        self.view_model = LinesViewModel(request.user)
+
+
+    def get(self, request, session_slug, exercise_slug):
+        """
+        Handle GET requests: return a keyset page of lines as compact values() rows.
+        """
+        exercise = self.view_model.get_exercise(session_slug, exercise_slug)
+        lines = AppUser(request.user).get_exercise_lines(exercise).values(*LINE_FIELDS)
+        page = paginate_lines(lines, request.GET.get('cursor'))
+
+        return json_response({'lines': page.lines, 'next_cursor': page.next_cursor})
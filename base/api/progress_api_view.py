@@ -0,0 +1,28 @@
+"""
+Author: Joshua Delos Santos
+Date: 18/10/2026
+"""
+
+from django.http import JsonResponse
+from base.api.api_view import ApiView
+from base.api.conditional import json_response
+from base.progress import DEFAULT_BUCKET, PROGRESS_BUCKETS, get_progress
+
+
+class ProgressApiView(ApiView):
+    """
+    Return the progress series of every exercise of the authenticated user.
+
+    GET /api/v1/progress/?bucket=day|week|month
+        {"bucket": "week", "exercises": [{"id": 1, "name": "Squats", "slug": "squats", "session": "leg-day",
+         "series": [{"period": "2024-01-01", "max_weight": "100.00", "total_volume": "1500.00", "average_reps": 5.0}]}]}
+    """
+    def get(self, request):
+        """
+        Handle GET requests: return the series for the requested bucket size.
+        """
+        bucket = request.GET.get('bucket', DEFAULT_BUCKET)
+        if bucket not in PROGRESS_BUCKETS:
+            return JsonResponse({'error': f"bucket must be one of: {', '.join(PROGRESS_BUCKETS)}."}, status=400)
+
+        return json_response(get_progress(request.user, bucket))
@@ -0,0 +1,27 @@
+"""
+Author: Joshua Delos Santos
+Date: 18/10/2026
+"""
+
+from base.api.api_view import ApiView
+from base.api.conditional import json_response
+from users.api.app_user import AppUser
+
+
+SESSION_FIELDS = ('id', 'name', 'slug', 'updated_at')
+
+
+class SessionsApiView(ApiView):
+    """
+    List the authenticated user's sessions.
+
+    GET /api/v1/sessions/
+        {"sessions": [{"id": 1, "name": "Push Day", "slug": "push-day", "updated_at": "..."}]}
+    """
+    def get(self, request):
+        """
+        Handle GET requests: return the sessions as compact values() rows.
+        """
+        sessions = list(AppUser(request.user).get_user_sessions().order_by('id').values(*SESSION_FIELDS))
+
+        return json_response({'sessions': sessions})
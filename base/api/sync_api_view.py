@@ -0,0 +1,31 @@
+"""
+Author: Joshua Delos Santos
+Date: 18/10/2026
+"""
+
+from django.http import JsonResponse
+from base.api.api_view import ApiView
+from base.sync import get_changes_since
+
+
+class SyncApiView(ApiView):
+    """
+    Return the user's sessions, exercises and lines changed since a cursor.
+
+    GET /api/v1/sync/?cursor=<cursor>
+        {"sessions": [...], "exercises": [...], "lines": [...],
+         "deleted": {"sessions": [ids], "exercises": [ids], "lines": [ids]},
+         "cursor": 42, "has_more": false}
+
+    Start with cursor 0 and pass back the returned cursor; keep syncing while has_more is true.
+    """
+    def get(self, request):
+        """
+        Handle GET requests: return the delta after the given cursor.
+        """
+        try:
+            cursor = int(request.GET.get('cursor', 0))
+        except ValueError:
+            return JsonResponse({'error': 'The cursor must be an integer.'}, status=400)
+
+        return JsonResponse(get_changes_since(request.user, cursor))
@@ -0,0 +1,23 @@
+"""
+URL configuration for version 1 of the JSON API
+
+Author: Joshua Delos Santos
+Date: 18/10/2026
+"""
+
+from django.urls import path
+from .sessions_api_view import SessionsApiView
+from .exercises_api_view import ExercisesApiView
+from .lines_api_view import LinesApiView
+from .sync_api_view import SyncApiView
+from .progress_api_view import ProgressApiView
+from .analytics_api_view import AnalyticsApiView
+
+urlpatterns = [
+    path('sync/', SyncApiView.as_view(), name='api_sync'),
+    path('sessions/', SessionsApiView.as_view(), name='api_sessions'),
+    path('sessions/<slug:session_slug>/exercises/', ExercisesApiView.as_view(), name='api_exercises'),
+    path('sessions/<slug:session_slug>/exercises/<slug:exercise_slug>/lines/', LinesApiView.as_view(), name='api_lines'),
+    path('progress/', ProgressApiView.as_view(), name='api_progress'),
+    path('analytics/', AnalyticsApiView.as_view(), name='api_analytics'),
+]
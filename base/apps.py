@@ -4,3 +4,10 @@ from django.apps import AppConfig
 class BaseConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'base'
+
+    def ready(self):
+        from base import signals  # noqa: F401  Connect the model signal receivers
+        from base.data_version import check_cache_is_shared
+        from base.importer import check_database_support
+        check_cache_is_shared()
+        check_database_support()
@@ -0,0 +1,161 @@
+"""
+Author: Joshua Delos Santos
+Date: 18/10/2026
+
+
+This file holds the helpers shared by the seeding and benchmark commands.
+
+seed_users() creates a realistic dataset with batched inserts: users,
+their sessions, the exercises of each session and a history of lines for
+each exercise, spread back in time. The batches do not send bulk_created:
+its receivers would write the change log, personal records and counters
+once per batch, which took most of the time. Instead, once a user's rows
+are in, the change log gets one INSERT ... SELECT per model, the records
+are rebuilt and the counters reconciled, and the data version is bumped,
+leaving the same state as the receivers would.
+
+
+Example:
+    users = seed_users(users=10, sessions_per_user=4, exercises_per_session=5, lines_per_exercise=1000)
+    summarize([0.010, 0.012, 0.020])  # {'p50_ms': 12.0, 'p95_ms': 20.0, 'p99_ms': 20.0}
+"""
+
+
+import random
+from datetime import timedelta
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.db import transaction
+from django.utils import timezone
+from django.utils.text import slugify
+from base.counters import reconcile_counters
+from base.data_version import notify_data_changed
+from base.models import Session, Exercise, Line
+from base.personal_records import rebuild_records
+from base.signals import TRACKED_MODELS
+from base.sync import record_saved
+
+
+SEED_PASSWORD = 'replus-seed'
+SEED_BATCH_SIZE = 5000
+SESSION_NAMES = ['Push Day', 'Pull Day', 'Leg Day', 'Upper Body', 'Lower Body', 'Full Body', 'Arms', 'Conditioning']
+EXERCISE_NAMES = [
+    'Bench Press', 'Squat', 'Deadlift', 'Overhead Press', 'Barbell Row', 'Pull Up', 'Dip', 'Lunge',
+    'Leg Press', 'Curl', 'Tricep Extension', 'Lateral Raise', 'Calf Raise', 'Hip Thrust', 'Face Pull',
+]
+SETS_PER_DAY = 4
+
+
+
+def percentile(values, fraction):
+    """
+    Return the value at the given fraction (0-1) of the sorted values, 0 if there are none.
+    """
+    if not values:
+        return 0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+
+def summarize(latencies):
+    """
+    Summarize latencies given in seconds.
+
+    Returns:
+        dict: p50_ms, p95_ms and p99_ms.
+    """
+    return {
+        'p50_ms': percentile(latencies, 0.50) * 1000,
+        'p95_ms': percentile(latencies, 0.95) * 1000,
+        'p99_ms': percentile(latencies, 0.99) * 1000,
+    }
+
+
+
+def numbered(names, index):
+    """
+    Return a realistic name for the given index, numbering repeats once the list runs out.
+    """
+    name = names[index % len(names)]
+    return name if index < len(names) else f'{name} {index // len(names) + 1}'
+
+
+
+def track_seeded(user):
+    """
+    Do the bookkeeping of the bulk_created receivers once for all the seeded rows of a user.
+    """
+    for model, kind in TRACKED_MODELS.items():
+        record_saved(user.id, kind, model.objects.filter(user=user))
+    rebuild_records(user)
+    reconcile_counters(user)
+    notify_data_changed(user.id)
+
+
+
+def seed_users(users, sessions_per_user, exercises_per_session, lines_per_exercise,
+               prefix='seed', batch_size=SEED_BATCH_SIZE, seed=None, progress=None):
+    """
+    Create users with sessions, exercises and lines using batched inserts.
+
+    Args:
+        users (int): Number of users to create.
+        sessions_per_user (int): Sessions created for each user.
+        exercises_per_session (int): Exercises created in each session.
+        lines_per_exercise (int): Lines created for each exercise, about SETS_PER_DAY a day going back from now.
+        prefix (str): Usernames are '<prefix><n>', numbered after any existing ones with the prefix.
+        batch_size (int): Maximum rows per INSERT.
+        seed (int): Seed for the random weights and reps, None for a random dataset.
+        progress (callable): Called with (users done, lines created) after each user.
+
+    Returns:
+        list: The created users. Their password is SEED_PASSWORD.
+    """
+    rng = random.Random(seed)
+    now = timezone.now()
+    password = make_password(SEED_PASSWORD)  # Hash once, it is deliberately slow
+    first = User.objects.filter(username__startswith=prefix).count()
+
+    created_users = User.objects.bulk_create(
+        [User(username=f'{prefix}{first + index}', password=password) for index in range(users)],
+        batch_size=batch_size,
+    )
+
+    lines_created = 0
+    for done, user in enumerate(created_users, start=1):
+        with transaction.atomic():
+            sessions = Session.objects.bulk_create([
+                Session(name=name, slug=slugify(name), user=user)
+                for name in (numbered(SESSION_NAMES, index) for index in range(sessions_per_user))
+            ], batch_size=batch_size)
+
+            exercises = Exercise.objects.bulk_create([
+                Exercise(name=name, slug=slugify(name), session=session, user=user)
+                for session in sessions
+                for name in (numbered(EXERCISE_NAMES, index) for index in range(exercises_per_session))
+            ], batch_size=batch_size)
+
+            batch = []
+            for exercise in exercises:
+                weight = rng.randrange(20, 120, 5)
+                for index in range(lines_per_exercise):
+                    age = timedelta(days=(lines_per_exercise - index) / SETS_PER_DAY)
+                    batch.append(Line(
+                        exercise_id=exercise.id, user_id=user.id, date=now - age,
+                        weight=weight + rng.choice((-5, 0, 0, 5)), reps=rng.randint(3, 12),
+                    ))
+                    if len(batch) >= batch_size:
+                        Line.objects.bulk_create(batch)
+                        lines_created += len(batch)
+                        batch = []
+            if batch:
+                Line.objects.bulk_create(batch)
+                lines_created += len(batch)
+
+            track_seeded(user)
+
+        if progress:
+            progress(done, lines_created)
+
+    return created_users
@@ -0,0 +1,236 @@
+"""
+Author: Joshua Delos Santos
+Date: 18/10/2026
+
+
+This file keeps the denormalised counters of exercises and sessions up to date.
+
+Exercise.line_count, total_volume and last_performed_at, and
+Session.exercise_count and last_performed_at, let the listing pages show
+"N sets, last trained X" from the rows they already load, instead of a
+COUNT and a MAX per row. Every path that adds or removes lines or
+exercises calls in here: the model signals for single saves, deletes and
+bulk_created batches (see base/signals.py), the importer's raw inserts and
+the fast delete of base/deletion.py.
+
+Counts and volumes move by F() increments, one UPDATE per table for a
+whole batch, so concurrent writers never lose each other's changes. Dates
+only move forward on an add; on a removal the latest date is read back
+from the (exercise, date) index within the same UPDATE. A session's latest
+date is the latest of its exercises. The exercises table of the affected
+sessions is invalidated too, as it shows the counters.
+
+reconcile_counters() recomputes the counters from the rows themselves and
+repairs any drift, see the reconcile_counters management command.
+
+
+Example:
+    lines_added([(exercise.id, Decimal('100'), 5, timezone.now())], [exercise.session_id])
+    exercises_removed([session.id])
+    reconcile_counters(user)  # (exercises repaired, sessions repaired)
+"""
+
+
+from collections import Counter
+from decimal import Decimal
+from django.db.models import Case, Count, DateTimeField, DecimalField, F, Max, OuterRef, PositiveIntegerField, Subquery, Sum, Value, When
+from django.db.models.functions import Coalesce, Greatest
+from base.data_version import notify_objects_changed, EXERCISES_SCOPE
+from base.models import Session, Exercise, Line, MAX_VOLUME_DIGITS, NUMBER_DECIMAL_PLACE
+
+
+RECONCILE_BATCH_SIZE = 500  # Repaired rows per UPDATE
+VOLUME_FIELD = DecimalField(max_digits=MAX_VOLUME_DIGITS, decimal_places=NUMBER_DECIMAL_PLACE)
+
+
+
+def lines_added(lines, session_ids=None):
+    """
+    Count new lines in their exercises and sessions.
+
+    Args:
+        lines (iterable): (exercise_id, weight, reps, date) of every new line.
+        session_ids (iterable): The sessions of those exercises, looked up when None.
+    """
+    totals = {}
+    for exercise_id, weight, reps, date in lines:
+        count, volume, latest = totals.get(exercise_id, (0, Decimal(0), date))
+        totals[exercise_id] = (count + 1, volume + Decimal(weight) * reps, max(latest, date))
+    if not totals:
+        return
+
+    latest = _by_id({exercise_id: total[2] for exercise_id, total in totals.items()}, DateTimeField())
+    Exercise.all_objects.filter(id__in=totals).update(
+        line_count=F('line_count') + _by_id({exercise_id: total[0] for exercise_id, total in totals.items()}, PositiveIntegerField()),
+        total_volume=F('total_volume') + _by_id({exercise_id: total[1] for exercise_id, total in totals.items()}, VOLUME_FIELD),
+        last_performed_at=Greatest(Coalesce('last_performed_at', latest), latest),
+    )
+    _update_sessions(totals, session_ids)
+
+
+
+def lines_removed(lines, session_ids=None):
+    """
+    Take removed lines out of the counters of their exercises and sessions.
+
+    Args:
+        lines (iterable): (exercise_id, weight, reps) of every removed line.
+        session_ids (iterable): The sessions of those exercises, looked up when None.
+    """
+    totals = {}
+    for exercise_id, weight, reps in lines:
+        count, volume = totals.get(exercise_id, (0, Decimal(0)))
+        totals[exercise_id] = (count + 1, volume + Decimal(weight) * reps)
+    if not totals:
+        return
+
+    counts = _by_id({exercise_id: total[0] for exercise_id, total in totals.items()}, PositiveIntegerField())
+    Exercise.all_objects.filter(id__in=totals).update(
+        line_count=Greatest(F('line_count') - counts, 0),  # Never below 0, even with drift
+        total_volume=F('total_volume') - _by_id({exercise_id: total[1] for exercise_id, total in totals.items()}, VOLUME_FIELD),
+        last_performed_at=_latest_line_date(),
+    )
+    _update_sessions(totals, session_ids)
+
+
+
+def exercises_added(session_ids):
+    """
+    Count new exercises in their sessions.
+
+    Args:
+        session_ids (iterable): The session of every new exercise, repeated for several in one session.
+    """
+    counts = Counter(session_id for session_id in session_ids if session_id is not None)
+    if counts:
+        Session.all_objects.filter(id__in=counts).update(exercise_count=F('exercise_count') + _by_id(counts, PositiveIntegerField()))
+
+
+
+def exercises_removed(session_ids):
+    """
+    Take removed or soft-deleted exercises out of the counters of their sessions.
+    Call it once the exercises are gone or marked, so the latest date leaves them out.
+
+    Args:
+        session_ids (iterable): The session of every removed exercise, repeated for several in one session.
+    """
+    counts = Counter(session_id for session_id in session_ids if session_id is not None)
+    if counts:
+        Session.all_objects.filter(id__in=counts).update(
+            exercise_count=Greatest(F('exercise_count') - _by_id(counts, PositiveIntegerField()), 0),
+            last_performed_at=_latest_exercise_date(),
+        )
+
+
+
+def reconcile_counters(user=None, exercise_ids=None):
+    """
+    Recompute the counters from the lines and exercises and repair the rows that drifted.
+
+    Args:
+        user (User): Only reconcile this user's exercises and sessions. None for everyone's.
+        exercise_ids (iterable): Only reconcile these exercises and their sessions.
+
+    Returns:
+        tuple: (exercises repaired, sessions repaired)
+    """
+    exercises = Exercise.all_objects.all()
+    sessions = Session.all_objects.all()
+    if user is not None:
+        exercises, sessions = exercises.filter(user=user), sessions.filter(user=user)
+    if exercise_ids is not None:
+        exercises = exercises.filter(id__in=list(exercise_ids))
+        sessions = sessions.filter(id__in=exercises.values('session_id'))
+
+    exercise_counters = {
+        'line_count': Coalesce(Subquery(_lines().annotate(count=Count('id')).values('count')), 0),
+        'total_volume': Coalesce(
+            Subquery(_lines().annotate(volume=Sum(F('weight') * F('reps'), output_field=VOLUME_FIELD)).values('volume')),
+            Value(Decimal(0)), output_field=VOLUME_FIELD,
+        ),
+        'last_performed_at': _latest_line_date(),
+    }
+    session_counters = {
+        'exercise_count': Coalesce(Subquery(_active_exercises().annotate(count=Count('id')).values('count')), 0),
+        'last_performed_at': _latest_exercise_date(),
+    }
+
+    # Exercises first, the latest date of a session comes from its exercises
+    return _repair(exercises, exercise_counters), _repair(sessions, session_counters)
+
+
+
+def _repair(queryset, counters):
+    """
+    Update the counters of the rows whose stored values differ from the recomputed ones.
+
+    Returns:
+        int: The number of rows repaired.
+    """
+    names = list(counters)
+    actual = queryset.annotate(**{f'actual_{name}': expression for name, expression in counters.items()})
+    rows = actual.values_list('id', *names, *(f'actual_{name}' for name in names)).order_by()
+    drifted = [row[0] for row in rows.iterator() if row[1:len(names) + 1] != row[len(names) + 1:]]
+
+    for start in range(0, len(drifted), RECONCILE_BATCH_SIZE):
+        queryset.model.all_objects.filter(id__in=drifted[start:start + RECONCILE_BATCH_SIZE]).update(**counters)
+
+    return len(drifted)
+
+
+
+def _update_sessions(exercise_ids, session_ids):
+    """
+    Move the latest date of the sessions of the exercises and invalidate their exercises tables.
+    """
+    if session_ids is None:
+        session_ids = Exercise.all_objects.filter(id__in=list(exercise_ids)).values_list('session_id', flat=True)
+    session_ids = {session_id for session_id in session_ids if session_id is not None}
+
+    if session_ids:
+        Session.all_objects.filter(id__in=session_ids).update(last_performed_at=_latest_exercise_date())
+        notify_objects_changed(EXERCISES_SCOPE, session_ids)
+
+
+
+def _by_id(values, output_field):
+    """
+    An expression giving each row id its value from values, a plain value when there is only one row.
+    """
+    if len(values) == 1:
+        return Value(next(iter(values.values())), output_field=output_field)
+
+    return Case(*[When(id=row_id, then=Value(value)) for row_id, value in values.items()], output_field=output_field)
+
+
+
+def _lines():
+    """
+    The lines of the outer exercise, grouped for one aggregate.
+    """
+    return Line.objects.filter(exercise=OuterRef('pk')).order_by().values('exercise')
+
+
+
+def _active_exercises():
+    """
+    The exercises of the outer session that are not soft-deleted, grouped for one aggregate.
+    """
+    return Exercise.objects.filter(session=OuterRef('pk')).order_by().values('session')
+
+
+
+def _latest_line_date():
+    """
+    The date of the latest line of the outer exercise, read from the (exercise, date) index.
+    """
+    return Subquery(Line.objects.filter(exercise=OuterRef('pk')).order_by('-date').values('date')[:1])
+
+
+
+def _latest_exercise_date():
+    """
+    The latest date of the exercises of the outer session that are not soft-deleted.
+    """
+    return Subquery(_active_exercises().annotate(latest=Max('last_performed_at')).values('latest'))
@@ -0,0 +1,242 @@
+"""
+Author: Joshua Delos Santos
+Date: 18/10/2026
+
+
+This file keeps a data version counter for every user in Django's cache.
+
+Any save or delete of a user's Session, Exercise or Line bumps the user's
+version (see base/signals.py). Anything derived from the user's data, such
+as cached listings, is stored under a key that includes the version, so a
+bump makes every stale entry unreachable without having to find and
+delete it.
+
+Narrower versions are kept the same way for single objects, so a write
+only invalidates what shows it: LINES_SCOPE, the lines of one exercise,
+and EXERCISES_SCOPE, the exercises of one session. They key the cached
+table fragments of the lines and exercises pages.
+
+Each bump of a user's version also records the time of the change, which
+the API sends as Last-Modified; get_last_change() reads both with one
+cache call.
+
+If a counter is evicted it restarts from the current time in
+nanoseconds, a value no earlier counter can have reached, so old entries
+stay unreachable.
+
+The versions must be shared by every worker process, or a write in one
+would leave the others serving stale listings and 304s, and the cache's
+incr() must be atomic, or two concurrent bumps can both write the same
+value and one write is never seen. Redis (RedisCache) and Memcached
+(PyMemcacheCache, PyLibMCCache) qualify. The file-based and database
+backends do not: their incr() is a get followed by a set. Local memory is
+atomic but per process. check_cache_is_shared(), run at startup, refuses
+the file-based and database backends, and a per-process backend when
+settings.WEB_CONCURRENCY is above 1.
+
+
+Example:
+    version = get_data_version(request.user.id)
+    version = await aget_data_version(request.user.id)  # From async views
+    version, changed_at = get_last_change(request.user.id)
+    notify_data_changed(request.user.id)
+
+    version = await aget_object_version(LINES_SCOPE, exercise.id)
+    notify_objects_changed(LINES_SCOPE, [exercise.id])
+"""
+
+
+import time
+from functools import partial
+from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import ImproperlyConfigured
+from django.db import transaction
+
+
+DATA_VERSION_KEY = 'replus:data-version:{user_id}'
+DATA_CHANGED_KEY = 'replus:data-changed:{user_id}'
+OBJECT_VERSION_KEY = 'replus:data-version:{scope}:{object_id}'
+LINES_SCOPE = 'lines'  # Keyed by exercise id
+EXERCISES_SCOPE = 'exercises'  # Keyed by session id
+PROCESS_LOCAL_CACHES = (
+    'django.core.cache.backends.locmem.LocMemCache',
+    'django.core.cache.backends.dummy.DummyCache',
+)
+NON_ATOMIC_CACHES = (  # BaseCache.incr(), a get then a set, so concurrent bumps can be lost
+    'django.core.cache.backends.filebased.FileBasedCache',
+    'django.core.cache.backends.db.DatabaseCache',
+)
+
+
+
+def check_cache_is_shared():
+    """
+    Make sure every worker process sees the same versions and no bump is lost.
+
+    Raises:
+        ImproperlyConfigured: If the cache backend has no atomic incr(), or several workers are
+            configured with a per-process one.
+    """
+    backend = settings.CACHES['default']['BACKEND']
+    if backend in NON_ATOMIC_CACHES:
+        raise ImproperlyConfigured(
+            f"{backend} increments with a get followed by a set, so two concurrent writes can bump a data version "
+            "to the same value and serve stale listings and 304s. Set CACHE_BACKEND to "
+            "django.core.cache.backends.redis.RedisCache or django.core.cache.backends.memcached.PyMemcacheCache."
+        )
+    if getattr(settings, 'WEB_CONCURRENCY', 1) > 1 and backend in PROCESS_LOCAL_CACHES:
+        raise ImproperlyConfigured(
+            f"{backend} keeps the data versions per process, so {settings.WEB_CONCURRENCY} workers would serve stale listings "
+            "and 304s after each other's writes. Set CACHE_BACKEND to a shared cache with atomic increments, "
+            "django.core.cache.backends.redis.RedisCache or django.core.cache.backends.memcached.PyMemcacheCache."
+        )
+
+
+
+def get_data_version(user_id):
+    """
+    Get the current data version of a user.
+
+    Returns:
+        int: The version, created if the user has none yet.
+    """
+    return _get_version(DATA_VERSION_KEY.format(user_id=user_id))
+
+
+
+async def aget_data_version(user_id):
+    """
+    Async version of get_data_version, using the cache's async API.
+
+    Returns:
+        int: The version, created if the user has none yet.
+    """
+    return await _aget_version(DATA_VERSION_KEY.format(user_id=user_id))
+
+
+
+def get_last_change(user_id):
+    """
+    Get the data version of a user and the time of their last change with one cache read.
+
+    Returns:
+        tuple: (version, changed_at), changed_at a Unix timestamp. A user whose change time is
+            not recorded, never written or evicted, is taken to have changed now.
+    """
+    version_key, changed_key = DATA_VERSION_KEY.format(user_id=user_id), DATA_CHANGED_KEY.format(user_id=user_id)
+    values = cache.get_many([version_key, changed_key])
+
+    version = values[version_key] if version_key in values else _get_version(version_key)
+    changed_at = values.get(changed_key)
+    if changed_at is None:
+        cache.add(changed_key, time.time(), timeout=None)
+        changed_at = cache.get(changed_key)
+
+    return version, changed_at
+
+
+
+def bump_data_version(user_id):
+    """
+    Move a user to a new data version, invalidating everything cached for the old one,
+    and record the time of the change.
+    """
+    _bump_version(DATA_VERSION_KEY.format(user_id=user_id))
+    cache.set(DATA_CHANGED_KEY.format(user_id=user_id), time.time(), timeout=None)
+
+
+
+def notify_data_changed(user_id):
+    """
+    Bump the user's data version after a write.
+
+    The version is bumped right away, so the writing request sees its own
+    change, and again once the transaction commits, so a reader that cached
+    pre-commit data under the intermediate version misses as well.
+    """
+    bump_data_version(user_id)
+    transaction.on_commit(partial(bump_data_version, user_id))
+
+
+
+def get_object_version(scope, object_id):
+    """
+    Get the current version of one object's data, e.g. the lines of an exercise.
+
+    Args:
+        scope (str): LINES_SCOPE or EXERCISES_SCOPE.
+        object_id (int): The id of the exercise or session.
+
+    Returns:
+        int: The version, created if the object has none yet.
+    """
+    return _get_version(OBJECT_VERSION_KEY.format(scope=scope, object_id=object_id))
+
+
+
+async def aget_object_version(scope, object_id):
+    """
+    Async version of get_object_version.
+    """
+    return await _aget_version(OBJECT_VERSION_KEY.format(scope=scope, object_id=object_id))
+
+
+
+def bump_object_versions(scope, object_ids):
+    """
+    Move objects to a new version, invalidating everything cached for the old one.
+    """
+    for object_id in set(object_ids):
+        _bump_version(OBJECT_VERSION_KEY.format(scope=scope, object_id=object_id))
+
+
+
+def notify_objects_changed(scope, object_ids):
+    """
+    Bump the versions of objects after a write, now and once the transaction commits,
+    like notify_data_changed.
+    """
+    object_ids = [object_id for object_id in set(object_ids) if object_id is not None]
+    if object_ids:
+        bump_object_versions(scope, object_ids)
+        transaction.on_commit(partial(bump_object_versions, scope, object_ids))
+
+
+
+def _get_version(key):
+    """
+    Get the counter under key, creating it if it does not exist.
+    """
+    version = cache.get(key)
+
+    if version is None:
+        cache.add(key, time.time_ns(), timeout=None)
+        version = cache.get(key)
+
+    return version
+
+
+
+async def _aget_version(key):
+    """
+    Async version of _get_version.
+    """
+    version = await cache.aget(key)
+
+    if version is None:
+        await cache.aadd(key, time.time_ns(), timeout=None)
+        version = await cache.aget(key)
+
+    return version
+
+
+
+def _bump_version(key):
+    """
+    Increment the counter under key, restarting it if it does not exist.
+    """
+    try:
+        cache.incr(key)
+    except ValueError:  # The counter was never created or has been evicted
+        cache.set(key, time.time_ns(), timeout=None)
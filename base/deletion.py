@@ -0,0 +1,160 @@
+"""
+Author: Joshua Delos Santos
+Date: 18/10/2026
+
+
+This file deletes sessions and exercises with set-based statements.
+
+Model.delete() makes Django's deletion collector load every related
+Exercise and Line into memory, so it can send post_delete for each one,
+and a session with years of lines takes seconds. Here everything is done
+in one transaction with one statement per table instead: the tombstones
+of the lines, exercises and session go into the change log with
+INSERT ... SELECT, then their rows are removed with one raw
+DELETE ... WHERE ... IN (SELECT ...) per table, which sends no signals. The personal records of the
+exercises are removed with them, the session's counters are updated (see
+base/counters.py) and the owner's data version and the session's
+exercises version are bumped, which is everything the signal receivers
+would have done.
+
+In soft-delete mode (settings.SOFT_DELETE) the rows are only marked with
+deleted_at, which the default managers hide, and the user gets an instant
+response. The tombstones and personal records are handled at once, so
+clients and listings never see the rows again. purge_deleted(), run from
+the purge_deleted management command, removes the marked rows later.
+
+
+Example:
+    delete_session(session)
+    delete_exercise(exercise, soft=True)
+    purge_deleted(older_than=timedelta(hours=1))
+"""
+
+
+from datetime import timedelta
+from django.conf import settings
+from django.db import connections, transaction
+from django.utils import timezone
+from base.data_version import notify_data_changed, notify_objects_changed, EXERCISES_SCOPE
+from base.counters import exercises_removed
+from base.models import Session, Exercise, Line, PersonalRecord, Change
+from base.sync import record_tombstones
+
+
+PURGE_BATCH_SIZE = 100  # Exercises purged per transaction
+
+
+
+def delete_session(session, soft=None):
+    """
+    Delete a session with its exercises and lines.
+
+    Args:
+        session (Session): The session to delete.
+        soft (bool): Mark the rows instead of removing them. None to follow settings.SOFT_DELETE.
+    """
+    _delete(session.user_id, Exercise.all_objects.filter(session=session), Session.all_objects.filter(id=session.id), soft)
+
+
+
+def delete_exercise(exercise, soft=None):
+    """
+    Delete an exercise with its lines.
+
+    Args:
+        exercise (Exercise): The exercise to delete.
+        soft (bool): Mark the rows instead of removing them. None to follow settings.SOFT_DELETE.
+    """
+    with transaction.atomic():
+        _delete(exercise.user_id, Exercise.all_objects.filter(id=exercise.id), None, soft)
+        exercises_removed([exercise.session_id])
+    notify_objects_changed(EXERCISES_SCOPE, [exercise.session_id])  # No post_delete to do it
+
+
+
+def purge_deleted(older_than=None):
+    """
+    Remove the soft-deleted sessions and exercises, and their lines, from the database.
+
+    Args:
+        older_than (timedelta): Only purge rows soft-deleted at least this long ago. None for all of them.
+
+    Returns:
+        tuple: (sessions purged, exercises purged)
+    """
+    cutoff = timezone.now() - (older_than or timedelta())
+    exercise_ids = list(Exercise.all_objects.filter(deleted_at__lte=cutoff).order_by('id').values_list('id', flat=True))
+
+    for start in range(0, len(exercise_ids), PURGE_BATCH_SIZE):
+        with transaction.atomic():
+            _remove(Exercise.all_objects.filter(id__in=exercise_ids[start:start + PURGE_BATCH_SIZE]))
+
+    sessions = Session.all_objects.filter(deleted_at__lte=cutoff)
+    with transaction.atomic():
+        # Their exercises were soft-deleted with them and are mostly gone by now
+        session_count = _remove(Exercise.all_objects.filter(session__in=sessions), sessions)
+
+    return session_count, len(exercise_ids)
+
+
+
+def _delete(user_id, exercises, sessions, soft):
+    """
+    Record tombstones for the sessions, the exercises and their lines, drop their personal
+    records, then mark or remove the rows, all in one transaction. Exercises that were
+    soft-deleted before already have their tombstones.
+    """
+    soft = settings.SOFT_DELETE if soft is None else soft
+    live_exercises = exercises.filter(deleted_at__isnull=True)
+
+    with transaction.atomic():
+        record_tombstones(user_id, Change.LINE, Line.objects.filter(exercise__in=live_exercises))
+        record_tombstones(user_id, Change.EXERCISE, live_exercises)
+        if sessions is not None:
+            record_tombstones(user_id, Change.SESSION, sessions)
+        _delete_rows(PersonalRecord, 'exercise', live_exercises)
+
+        if soft:
+            now = timezone.now()
+            live_exercises.update(deleted_at=now)
+            if sessions is not None:
+                sessions.update(deleted_at=now)
+        else:
+            _remove(exercises, sessions)
+
+        notify_data_changed(user_id)
+
+
+
+def _remove(exercises, sessions=None):
+    """
+    Delete the lines and personal records of the exercises, then the exercises and the
+    sessions, with one DELETE each. Must run in a transaction.
+
+    Returns:
+        int: The number of sessions deleted.
+    """
+    _delete_rows(Line, 'exercise', exercises)
+    _delete_rows(PersonalRecord, 'exercise', exercises)
+    _delete_rows(Exercise, 'id', exercises)
+    return _delete_rows(Session, 'id', sessions) if sessions is not None else 0
+
+
+
+def _delete_rows(model, field_name, queryset):
+    """
+    Delete the rows of model whose field_name is the primary key of a row of queryset, with one
+    DELETE that loads nothing and sends no signals. QuerySet.delete() would collect every row
+    to send post_delete for it.
+
+    Returns:
+        int: The number of rows deleted.
+    """
+    connection = connections[queryset.db]
+    table = connection.ops.quote_name(model._meta.db_table)
+    column = connection.ops.quote_name(model._meta.get_field(field_name).column)
+    sql, params = queryset.order_by().values('pk').query.sql_with_params()
+
+    with connection.cursor() as cursor:
+        cursor.execute(f'DELETE FROM {table} WHERE {column} IN ({sql})', params)
+        return cursor.rowcount
@@ -0,0 +1,211 @@
+"""
+Author: Joshua Delos Santos
+Date: 18/10/2026
+
+
+This file streams a user's full training history as CSV or JSON Lines.
+
+Lines are read with values_list().iterator(), so rows are fetched from the
+database in chunks and written out one at a time: memory stays flat no
+matter how long the history is, and the header goes out before the query
+has even run. Each row carries the names of its session and exercise.
+Sessions and exercises that have no lines yet follow as rows with empty
+line fields, so a full export holds everything the user owns.
+
+Both a sync and an async generator are provided, because Django buffers
+a whole streaming response when the iterator does not match the server
+(sync iterators under ASGI, async iterators under WSGI).
+
+
+Example:
+    rows = export_rows(request.user, start=date(2024, 1, 1))
+    StreamingHttpResponse(stream_export(rows, 'csv'), content_type=EXPORT_FORMATS['csv'])
+"""
+
+
+import csv
+import json
+from datetime import datetime, time, timedelta
+from itertools import islice
+from asgiref.sync import sync_to_async
+from django.utils import timezone
+from base.models import Session, Exercise
+from users.api.app_user import AppUser
+
+
+EXPORT_CHUNK_SIZE = 2000
+EXPORT_COLUMNS = ('session', 'exercise', 'date', 'weight', 'reps')
+EXPORT_FIELDS = ('exercise__session__name', 'exercise__name', 'date', 'weight', 'reps')
+EXPORT_FORMATS = {
+    'csv': 'text/csv',
+    'jsonl': 'application/x-ndjson',
+}
+
+
+
+class Echo:
+    """
+    A file-like object that returns what is written to it, so csv.writer can format one row at a time.
+    """
+    def write(self, value):
+        """
+        Return the formatted row instead of storing it.
+        """
+        return value
+
+
+
+class ExportRows:
+    """
+    The rows of an export, readable with sync or async iteration.
+
+    Attributes:
+        lines (QuerySet): values_list() of EXPORT_FIELDS for the user's lines, oldest first.
+        empty (list): values_list() querysets of the names of sessions and exercises without lines.
+    """
+    def __init__(self, lines, empty):
+        """
+        Initialise the rows with the lines and the empty sessions and exercises.
+        """
+        self.lines = lines
+        self.empty = empty
+
+
+    def __iter__(self):
+        """
+        Yield every row, fetching lines EXPORT_CHUNK_SIZE at a time.
+        """
+        yield from self.lines.iterator(chunk_size=EXPORT_CHUNK_SIZE)
+        for queryset in self.empty:
+            for names in queryset.iterator(chunk_size=EXPORT_CHUNK_SIZE):
+                yield _empty_row(names)
+
+
+    async def __aiter__(self):
+        """
+        Async version of __iter__, pulling EXPORT_CHUNK_SIZE rows at a time from a database thread.
+
+        QuerySet.aiterator() cannot be used: for values_list() it runs the query
+        while creating the iterator, on the event loop.
+        """
+        rows = iter(self)  # A generator, nothing runs until the first chunk is taken
+        take_chunk = sync_to_async(lambda: list(islice(rows, EXPORT_CHUNK_SIZE)))
+
+        while chunk := await take_chunk():
+            for row in chunk:
+                yield row
+
+
+
+def export_rows(user, start=None, end=None):
+    """
+    Get the rows of a user's export, optionally limited to a date range.
+
+    Args:
+        user (User): The user whose history is exported.
+        start (date): First day to include. None for no lower bound.
+        end (date): Last day to include. None for no upper bound.
+
+    Returns:
+        ExportRows: The rows, not yet fetched. Sessions and exercises without lines are
+            only included when no range is given, as they have no date.
+    """
+    lines = AppUser(user).get_user_lines()
+    if start is not None:
+        lines = lines.filter(date__gte=_start_of_day(start))
+    if end is not None:
+        lines = lines.filter(date__lt=_start_of_day(end + timedelta(days=1)))
+    lines = lines.order_by('date', 'id').values_list(*EXPORT_FIELDS)
+
+    empty = []
+    if start is None and end is None:
+        empty = [
+            Exercise.objects.filter(user=user, lines__isnull=True).order_by('id').values_list('session__name', 'name'),
+            Session.objects.filter(user=user)
+            .exclude(id__in=Exercise.objects.filter(user=user).values('session_id'))  # Only live exercises count
+            .order_by('id').values_list('name'),
+        ]
+
+    return ExportRows(lines, empty)
+
+
+
+def stream_export(rows, export_format):
+    """
+    Yield the export as encoded chunks, one row at a time.
+
+    Args:
+        rows (ExportRows): The rows from export_rows().
+        export_format (str): A key of EXPORT_FORMATS.
+    """
+    format_row = _row_formatter(export_format)
+    header = _header(export_format)
+    if header:
+        yield header
+
+    for row in rows:
+        yield format_row(row)
+
+
+
+async def astream_export(rows, export_format):
+    """
+    Async version of stream_export, for responses served over ASGI.
+    """
+    format_row = _row_formatter(export_format)
+    header = _header(export_format)
+    if header:
+        yield header
+
+    async for row in rows:
+        yield format_row(row)
+
+
+
+def _start_of_day(day):
+    """
+    Return the first instant of a day in the current time zone.
+    """
+    return timezone.make_aware(datetime.combine(day, time.min))
+
+
+
+def _empty_row(names):
+    """
+    Build the row of a session or exercise that has no lines.
+    """
+    session, exercise = names if len(names) == 2 else (names[0], None)
+    return (session, exercise, None, None, None)
+
+
+
+def _header(export_format):
+    """
+    Return the encoded header of the format, None if it has none.
+    """
+    if export_format == 'csv':
+        return _row_formatter('csv')(EXPORT_COLUMNS)
+    return None
+
+
+
+def _row_formatter(export_format):
+    """
+    Return a function turning one row into encoded bytes of the given format.
+    """
+    if export_format == 'csv':
+        writer = csv.writer(Echo())
+        return lambda row: writer.writerow(['' if value is None else _text(value) for value in row]).encode()
+
+    return lambda row: (json.dumps({
+        column: None if value is None else _text(value) if column in ('date', 'weight') else value
+        for column, value in zip(EXPORT_COLUMNS, row)
+    }, separators=(',', ':')) + '\n').encode()
+
+
+
+def _text(value):
+    """
+    Format a value for the export: ISO 8601 for dates, plain digits for decimals.
+    """
+    return value.isoformat() if isinstance(value, datetime) else str(value)
@@ -0,0 +1,37 @@
+"""
+Author: Joshua Delos Santos
+Date: 18/10/2026
+"""
+
+from django import forms
+from base.importer import IMPORT_FORMATS
+
+
+class ImportForm(forms.Form):
+    """
+    Form for uploading a training history file to import.
+    """
+    file = forms.FileField(
+        label='',
+        widget=forms.ClearableFileInput(attrs={'accept': '.csv,.jsonl', 'class': 'import-file-input'}),
+    )
+    dry_run = forms.BooleanField(label='Dry run (check the file without importing)', required=False)
+
+
+    def clean_file(self):
+        """
+        Accept only files whose extension is one of the import formats.
+        """
+        upload = self.cleaned_data['file']
+        if self.get_format(upload) not in IMPORT_FORMATS:
+            raise forms.ValidationError(f"Upload a {' or '.join('.' + name for name in IMPORT_FORMATS)} file.")
+        return upload
+
+
+    @staticmethod
+    def get_format(upload):
+        """
+        Returns:
+            str: The format of the uploaded file, taken from its extension.
+        """
+        return upload.name.rsplit('.', 1)[-1].lower()
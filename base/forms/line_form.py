@@ -3,8 +3,9 @@ Author: Joshua Delos Santos
 Date: 31/10/2024
 """
 
+from decimal import Decimal
 from django import forms
-from base.models import Line
+from base.models import Line, NUMBER_DECIMAL_PLACE
 
 class LineForm(forms.ModelForm):
     """
@@ -21,3 +22,10 @@ class LineForm(forms.ModelForm):
             'weight': forms.TextInput(attrs={'class': 'weight-input', 'placeholder': ' Weight'}),
             'reps': forms.TextInput(attrs={'class': 'reps-input', 'placeholder': '  Reps'}),
         }
+    
+    
+    def clean_weight(self):
+        """
+        Give the weight the scale of its column, so a saved line shows as it will be read back, e.g. 90 as 90.00.
+        """
+        return self.cleaned_data['weight'].quantize(Decimal(1).scaleb(-NUMBER_DECIMAL_PLACE))
@@ -0,0 +1,368 @@
+"""
+Author: Joshua Delos Santos
+Date: 18/10/2026
+
+
+This file imports a training history from CSV or JSON Lines.
+
+The format is the one written by base/export.py: one record per set with
+session, exercise, date, weight and reps. A record with only a session, or
+only a session and an exercise, creates those without a line.
+
+Records are read as a stream and lines are inserted in batches, each batch
+in its own transaction, so memory stays flat however large the file is.
+A batch is written with prepared multi-row INSERTs that return the new ids,
+and tracked for sync with one executemany() into the change log: compiling
+the SQL of bulk_create() for every row, for the lines and again for their
+changes, costs several times more than the database work itself. Weights
+and reps are checked with the rules of LineForm, its form fields and the
+model's validators, as the raw INSERT skips them. The INSERTs need
+RETURNING, which SQLite has from 3.35; check_database_support() refuses
+an older one at startup. Sessions and exercises are looked up by name
+ignoring case, folded the way the database's LOWER() folds them for their
+unique constraints (ASCII letters only on SQLite), and missing ones are
+created through save(), so they get their slugs exactly as if the user
+had added them. A dry run checks their slugs are free, which save()
+would otherwise only find out. Dates in the file are kept; records without a date
+get the current time. Invalid records are reported and skipped. Once every
+batch is in, the personal records of the exercises that got lines are
+rebuilt with one window query, instead of being merged row by row.
+
+
+Example:
+    with open('history.csv', newline='') as stream:
+        result = import_history(user, parse_rows(stream, 'csv'), dry_run=True)
+    result.lines_created, result.errors
+"""
+
+
+import csv
+import json
+import string
+from datetime import datetime
+from functools import lru_cache
+from decimal import Decimal
+from django.core.exceptions import ImproperlyConfigured, ValidationError
+from django.db import connection, transaction
+from django.utils import timezone
+from django.utils.text import slugify
+from base.data_version import notify_data_changed, notify_objects_changed, LINES_SCOPE
+from base.counters import lines_added
+from base.forms.line_form import LineForm
+from base.models import Session, Exercise, Line, Change, MAX_CHAR_FIELD, MAX_DIGITS, NUMBER_DECIMAL_PLACE
+from base.personal_records import rebuild_records
+from base.sync import record_created
+
+
+IMPORT_BATCH_SIZE = 5000
+IMPORT_FORMATS = ('csv', 'jsonl')
+MAX_REPORTED_ERRORS = 100
+CLEANED_VALUES_CACHE_SIZE = 4096  # Distinct weight and reps texts remembered with their cleaned values
+WEIGHT_QUANTUM = Decimal(1).scaleb(-NUMBER_DECIMAL_PLACE)
+LINE_COLUMNS = ('exercise', 'weight', 'reps', 'date', 'user')  # Order of the values of each inserted line
+ASCII_LOWERCASE = str.maketrans(string.ascii_uppercase, string.ascii_lowercase)
+
+
+
+def check_database_support():
+    """
+    Make sure the database can return the ids of a multi-row INSERT.
+
+    Raises:
+        ImproperlyConfigured: If it cannot, e.g. SQLite before 3.35.
+    """
+    if not connection.features.can_return_rows_from_bulk_insert:
+        raise ImproperlyConfigured(
+            f"The importer inserts lines with INSERT ... RETURNING, which this {connection.display_name} version does not support. "
+            "SQLite needs 3.35 or later."
+        )
+
+
+
+class ImportResult:
+    """
+    The outcome of an import.
+
+    Attributes:
+        rows (int): Records read from the file.
+        sessions_created (int): New sessions, or sessions that would be created in a dry run.
+        exercises_created (int): New exercises, likewise.
+        lines_created (int): New lines, likewise.
+        error_count (int): Records skipped because they were invalid.
+        errors (list): (record number, message) of the first MAX_REPORTED_ERRORS skipped records.
+        dry_run (bool): True if nothing was written.
+    """
+    def __init__(self, dry_run=False):
+        """
+        Initialise an empty result.
+        """
+        self.rows = 0
+        self.sessions_created = 0
+        self.exercises_created = 0
+        self.lines_created = 0
+        self.error_count = 0
+        self.errors = []
+        self.dry_run = dry_run
+
+
+    def add_error(self, number, message):
+        """
+        Count a skipped record, keeping its message if fewer than MAX_REPORTED_ERRORS are kept.
+        """
+        self.error_count += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append((number, message))
+
+
+
+def parse_rows(stream, import_format):
+    """
+    Read records from a text stream one at a time.
+
+    Args:
+        stream: A text file object. CSV files should be opened with newline=''.
+        import_format (str): 'csv' (with a header row) or 'jsonl'.
+
+    Returns:
+        iterator: One dict per record. JSON Lines records that are not valid JSON come out as None.
+    """
+    if import_format == 'csv':
+        return csv.DictReader(stream)
+
+    return (_loads_or_none(line) for line in stream if line.strip())
+
+
+
+def import_history(user, rows, batch_size=IMPORT_BATCH_SIZE, dry_run=False, progress=None):
+    """
+    Import records into a user's history.
+
+    Args:
+        user (User): The user who will own the imported rows.
+        rows (iterable): Records from parse_rows().
+        batch_size (int): Lines per INSERT and per transaction.
+        dry_run (bool): Validate and count everything without writing.
+        progress (callable): Called with the ImportResult after every batch.
+
+    Returns:
+        ImportResult: What was, or in a dry run would be, created, and the skipped records.
+    """
+    result = ImportResult(dry_run)
+    sessions = {_fold_case(session.name): session for session in Session.objects.filter(user=user)}
+    exercises = {
+        (_fold_case(exercise.session.name), _fold_case(exercise.name)): exercise
+        for exercise in Exercise.objects.filter(user=user, session__isnull=False).select_related('session')
+    }
+    slugs = {(None, session.slug) for session in sessions.values()} | {
+        (session_name, exercise.slug) for (session_name, _), exercise in exercises.items()
+    }  # (folded session name or None for a session, slug) of every session and exercise
+    batch = []
+    exercise_ids = set()  # Exercises that got lines, whose personal records are rebuilt at the end
+
+    for number, record in enumerate(rows, start=1):
+        result.rows = number
+        try:
+            session_name, exercise_name, line = _parse_record(record)
+            session_key = _fold_case(session_name)
+            session = _get_or_create(
+                sessions, session_key, None, slugs, result,
+                lambda: Session(name=session_name, user=user),
+            )
+            if exercise_name is None:
+                continue
+            exercise = _get_or_create(
+                exercises, (session_key, _fold_case(exercise_name)), session_key, slugs, result,
+                lambda: Exercise(name=exercise_name, session=session, user=user),
+            )
+        except ValidationError as error:
+            result.add_error(number, ' '.join(error.messages))
+            continue
+
+        if line is not None:
+            batch.append((exercise.id, *line, user.id))
+            exercise_ids.add(exercise.id)
+
+        if len(batch) >= batch_size:
+            _insert_lines(user, batch, result)
+            batch = []
+            if progress:
+                progress(result)
+
+    if batch:
+        _insert_lines(user, batch, result)
+    if exercise_ids and not dry_run:
+        rebuild_records(user, exercise_ids)
+        notify_data_changed(user.id)
+        notify_objects_changed(LINES_SCOPE, exercise_ids)  # Their record badges may have moved
+    if progress:
+        progress(result)
+
+    return result
+
+
+
+def _parse_record(record):
+    """
+    Validate one record.
+
+    Returns:
+        tuple: (session name, exercise name or None, (weight, reps, date) or None)
+    """
+    if not isinstance(record, dict):
+        raise ValidationError("Expected an object with session, exercise, date, weight and reps.")
+
+    session_name = _name(record, 'session')
+    exercise_name = _name(record, 'exercise')
+    if session_name is None:
+        raise ValidationError("session is required.")
+
+    values = [_value(record, field) for field in ('date', 'weight', 'reps')]
+    if not any(values):
+        return session_name, exercise_name, None
+    if exercise_name is None:
+        raise ValidationError("exercise is required for a line.")
+
+    date, weight, reps = values
+    return session_name, exercise_name, (_clean_line_value('weight', weight).quantize(WEIGHT_QUANTUM), _clean_line_value('reps', reps), _date(date))
+
+
+
+def _get_or_create(known, key, slug_scope, slugs, result, build):
+    """
+    Return the session or exercise known under key, creating it if it is new.
+    In a dry run the new object is kept unsaved, so later records still find it.
+    A new object's slug is checked against the taken slugs of its scope (the
+    folded session name for an exercise, None for a session) in both modes,
+    as a dry run has no save() to find a clash.
+    """
+    instance = known.get(key)
+
+    if instance is None:
+        instance = build()
+        slug_key = (slug_scope, slugify(instance.name))
+        if slug_key in slugs:
+            raise ValidationError(f"A similar {instance._meta.verbose_name} to '{instance.name}' already exists.")
+        if not result.dry_run:
+            instance.save()  # Slug and constraint checks as in the app, raises ValidationError on a clash
+        known[key] = instance
+        slugs.add(slug_key)
+
+        if isinstance(instance, Session):
+            result.sessions_created += 1
+        else:
+            result.exercises_created += 1
+
+    return instance
+
+
+
+def _insert_lines(user, lines, result):
+    """
+    Insert one batch of lines in a transaction and track them for sync, unless this is a dry run.
+    """
+    if not result.dry_run:
+        quote = connection.ops.quote_name
+        table = quote(Line._meta.db_table)
+        columns = ', '.join(quote(Line._meta.get_field(name).column) for name in LINE_COLUMNS)
+        row_placeholders = f"({', '.join(['%s'] * len(LINE_COLUMNS))})"
+        rows_per_insert = max(1, connection.features.max_query_params // len(LINE_COLUMNS))
+
+        adapt_decimal = connection.ops.adapt_decimalfield_value
+        adapt_datetime = connection.ops.adapt_datetimefield_value
+        values = [
+            (exercise_id, adapt_decimal(weight, MAX_DIGITS, NUMBER_DECIMAL_PLACE), reps, adapt_datetime(date), user_id)
+            for exercise_id, weight, reps, date, user_id in lines
+        ]
+
+        with transaction.atomic():
+            line_ids = []
+            with connection.cursor() as cursor:
+                for start in range(0, len(values), rows_per_insert):
+                    rows = values[start:start + rows_per_insert]
+                    cursor.execute(
+                        f"INSERT INTO {table} ({columns}) VALUES {', '.join([row_placeholders] * len(rows))} RETURNING {quote('id')}",
+                        [value for row in rows for value in row],
+                    )
+                    line_ids.extend(line_id for line_id, in cursor.fetchall())
+            record_created(user.id, Change.LINE, line_ids)
+            notify_data_changed(user.id)
+            notify_objects_changed(LINES_SCOPE, [line[0] for line in lines])
+            lines_added([(exercise_id, weight, reps, date) for exercise_id, weight, reps, date, _ in lines])
+
+    result.lines_created += len(lines)
+
+
+
+def _fold_case(name):
+    """
+    Lowercase a name the way the database's LOWER() does in the unique constraints on names:
+    SQLite only folds ASCII letters, PostgreSQL folds every letter like str.lower().
+    """
+    return name.translate(ASCII_LOWERCASE) if connection.vendor == 'sqlite' else name.lower()
+
+
+
+def _loads_or_none(text):
+    """
+    Decode one JSON Lines record, None if it is not valid JSON.
+    """
+    try:
+        return json.loads(text)
+    except ValueError:
+        return None
+
+
+
+def _value(record, field):
+    """
+    Return a field of a record as a stripped string, None if it is missing or empty.
+    """
+    value = record.get(field)
+    if value is None:
+        return None
+    value = str(value).strip()
+    return value or None
+
+
+
+def _name(record, field):
+    """
+    Return a session or exercise name, checking it fits the name field.
+    """
+    name = _value(record, field)
+    if name is not None and len(name) > MAX_CHAR_FIELD:
+        raise ValidationError(f"{field} must be at most {MAX_CHAR_FIELD} characters.")
+    return name
+
+
+
+@lru_cache(maxsize=CLEANED_VALUES_CACHE_SIZE)
+def _clean_line_value(field, value):
+    """
+    Clean a weight or reps with the rules of LineForm: its form field, then the model field's validators.
+    Cached, as histories repeat the same few weights and reps and the result only depends on the text.
+    """
+    try:
+        cleaned = LineForm.base_fields[field].clean(value)
+        Line._meta.get_field(field).run_validators(cleaned)
+    except ValidationError as error:
+        raise ValidationError(f"{field}: {' '.join(error.messages)}")
+    return cleaned
+
+
+
+def _date(value):
+    """
+    Parse an ISO 8601 date or date and time. Naive values are taken in the current time zone.
+    """
+    if value is None:
+        date = timezone.now()
+    else:
+        try:
+            date = datetime.fromisoformat(value)
+        except ValueError:
+            raise ValidationError("date must be an ISO 8601 date, e.g. 2024-01-31T18:30:00+00:00.")
+        if date.tzinfo is None:
+            date = timezone.make_aware(date)
+
+    return date
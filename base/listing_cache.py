@@ -0,0 +1,129 @@
+"""
+Author: Joshua Delos Santos
+Date: 18/10/2026
+
+
+This file caches the listings shown on the sessions, exercises and lines pages.
+
+Entries are keyed by the user's data version (see base/data_version.py),
+so they are served until the user saves or deletes something. Works with
+any cache backend check_cache_is_shared() accepts: local memory for a
+single worker, Redis or Memcached for several.
+
+
+Example:
+    sessions = listing_cache.get_or_load(user.id, 'sessions', lambda: list(queryset))
+    sessions = await listing_cache.aget_or_load(user.id, 'sessions', load_sessions)  # From async views
+    listing_cache.stats()  # {'hits': 10, 'misses': 2}
+"""
+
+
+import threading
+from django.core.cache import cache
+from base.data_version import get_data_version, aget_data_version
+
+
+LISTING_KEY = 'replus:listing:{user_id}:{version}:{name}'
+LISTING_TIMEOUT = 60 * 60  # Entries never go stale, the timeout only bounds memory
+
+
+
+class ListingCache:
+    """
+    Per-user listing cache with hit and miss counters.
+
+    Attributes:
+        hits (int): Listings served from the cache by this process.
+        misses (int): Listings loaded from the database by this process.
+    """
+    def __init__(self):
+        """
+        Initialise the cache with empty counters.
+        """
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+
+    def get_or_load(self, user_id, name, load):
+        """
+        Get a listing of the user from the cache, loading and storing it on a miss.
+
+        Args:
+            user_id (int): The id of the user who owns the listing.
+            name (str): The name of the listing, including its arguments, e.g. 'exercises:3'.
+            load (callable): Returns the listing. Must return a picklable value, not a lazy QuerySet.
+
+        Returns:
+            The cached or freshly loaded listing.
+        """
+        key = LISTING_KEY.format(user_id=user_id, version=get_data_version(user_id), name=name)
+        listing = cache.get(key)
+
+        if listing is not None:
+            self._count(hit=True)
+            return listing
+
+        self._count(hit=False)
+        listing = load()
+        cache.set(key, listing, LISTING_TIMEOUT)
+
+        return listing
+
+
+    async def aget_or_load(self, user_id, name, load):
+        """
+        Async version of get_or_load, using the cache's async API.
+
+        Args:
+            user_id (int): The id of the user who owns the listing.
+            name (str): The name of the listing, shared with get_or_load, so both see the same entries.
+            load (callable): Coroutine function returning the listing. Must return a picklable value.
+
+        Returns:
+            The cached or freshly loaded listing.
+        """
+        key = LISTING_KEY.format(user_id=user_id, version=await aget_data_version(user_id), name=name)
+        listing = await cache.aget(key)
+
+        if listing is not None:
+            self._count(hit=True)
+            return listing
+
+        self._count(hit=False)
+        listing = await load()
+        await cache.aset(key, listing, LISTING_TIMEOUT)
+
+        return listing
+
+
+    def stats(self):
+        """
+        Returns:
+            dict: The hit and miss counters.
+        """
+        return {'hits': self.hits, 'misses': self.misses}
+
+
+    def reset_stats(self):
+        """
+        Reset the hit and miss counters to zero.
+        """
+        with self._lock:
+            self.hits = 0
+            self.misses = 0
+
+
+    def _count(self, hit):
+        """
+        Increment the hit or miss counter.
+        """
+        with self._lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+
+
+listing_cache = ListingCache()
@@ -0,0 +1,63 @@
+"""
+Author: Joshua Delos Santos
+Date: 18/10/2026
+
+
+Time the NumPy analytics of a user with a large history, see base/analytics.py.
+
+Runs against a throwaway test database, so it never touches real data. A
+user is seeded with about the requested number of lines, then the columns
+are loaded and the analytics computed several times, uncached, reporting
+the load and the compute time separately.
+
+
+Example:
+    python manage.py bench_analytics --lines 500000 --iterations 5
+"""
+
+
+import time
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from base.analytics import ANALYTICS_AVAILABLE, load_line_columns, _load_analytics
+from base.benchmarking import seed_users, summarize
+
+
+class Command(BaseCommand):
+    help = "Report how long the analytics of a user with a large history take to load and compute."
+
+
+    def add_arguments(self, parser):
+        parser.add_argument('--lines', type=int, default=500_000, help="Lines of the seeded user.")
+        parser.add_argument('--iterations', type=int, default=5, help="Timed runs.")
+        parser.add_argument('--sessions', type=int, default=4, help="Sessions of the seeded user.")
+        parser.add_argument('--exercises', type=int, default=5, help="Exercises per session.")
+
+
+    def handle(self, *args, **options):
+        if not ANALYTICS_AVAILABLE:
+            raise CommandError("NumPy is not installed.")
+
+        old_name = connection.settings_dict['NAME']
+        connection.creation.create_test_db(verbosity=0, autoclobber=True)
+
+        try:
+            exercises = options['sessions'] * options['exercises']
+            user = seed_users(1, options['sessions'], options['exercises'], max(1, options['lines'] // exercises), prefix='bench')[0]
+
+            load_times, total_times = [], []
+            for _ in range(options['iterations']):
+                start = time.perf_counter()
+                columns = load_line_columns(user)
+                loaded = time.perf_counter()
+                _load_analytics(user)  # Loads the columns again, uncached
+                load_times.append(loaded - start)
+                total_times.append(time.perf_counter() - loaded)
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+
+        self.stdout.write(f"{len(columns)} lines, {options['iterations']} runs")
+        self.stdout.write(f"{'step':<10} {'p50 ms':>8} {'p95 ms':>8}")
+        for step, times in [('load', load_times), ('analytics', total_times)]:
+            summary = summarize(times)
+            self.stdout.write(f"{step:<10} {summary['p50_ms']:>8.1f} {summary['p95_ms']:>8.1f}")
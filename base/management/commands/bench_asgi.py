@@ -0,0 +1,198 @@
+"""
+Author: Joshua Delos Santos
+Date: 18/10/2026
+
+
+Compare concurrent page throughput between the WSGI and the ASGI handler.
+
+Each server runs in its own process against a fresh temporary database.
+The WSGI run drives Django's WSGIHandler from a pool of threads, like a
+threaded WSGI server; the async views are adapted to sync for every
+request. The ASGI run drives Django's ASGIHandler from a single event
+loop with that many requests in flight, like an ASGI server, so the async
+views run natively. Both walk the sessions -> exercises -> lines pages of
+seeded users with real session cookies, so authentication is included.
+
+Persistent connections are turned off for the ASGI run, as Django
+recommends, because each ASGI request gets its own database thread.
+
+
+Example:
+    python manage.py bench_asgi --concurrency 32 --requests 2000 --cold
+"""
+
+
+import asyncio
+import io
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from django.conf import settings
+from django.core.handlers.asgi import ASGIHandler
+from django.core.handlers.wsgi import WSGIHandler
+from django.core.management import call_command
+from django.core.management.base import BaseCommand
+from django.db import connections
+from django.test import Client
+from base.benchmarking import seed_users, summarize
+from base.data_version import bump_data_version
+
+
+SERVERS = {'wsgi': {}, 'asgi': {'DB_CONN_MAX_AGE': '0'}}
+LINES_PER_EXERCISE = 200
+PAGES = ['/sessions/', '/sessions/push-day/', '/sessions/push-day/bench-press/']  # First session and exercise seeded
+
+
+class Command(BaseCommand):
+    help = "Compare concurrent page throughput between the WSGI and the ASGI handler."
+
+
+    def add_arguments(self, parser):
+        parser.add_argument('--concurrency', type=int, default=16, help="Requests in flight at once.")
+        parser.add_argument('--requests', type=int, default=1000, help="Requests per server.")
+        parser.add_argument('--users', type=int, default=4, help="Users the requests are spread across.")
+        parser.add_argument('--cold', action='store_true', help="Bump the user's data version before every request, so the listing cache misses.")
+        parser.add_argument('--worker', choices=list(SERVERS), help="Internal: benchmark one server against the configured database and print JSON.")
+
+
+    def handle(self, *args, **options):
+        if options['worker']:
+            self.stdout.write(json.dumps(self.run_worker(options)))
+            return
+
+        results = {}
+        for server, overrides in SERVERS.items():
+            with tempfile.TemporaryDirectory() as directory:
+                env = {**os.environ, **overrides, 'SQLITE_PATH': os.path.join(directory, 'bench.sqlite3')}
+                command = [
+                    sys.executable, str(settings.BASE_DIR / 'manage.py'), 'bench_asgi', '--worker', server,
+                    '--concurrency', str(options['concurrency']),
+                    '--requests', str(options['requests']),
+                    '--users', str(options['users']),
+                    *(['--cold'] if options['cold'] else []),
+                ]
+                output = subprocess.run(command, env=env, check=True, capture_output=True, text=True).stdout
+                results[server] = json.loads(output.strip().splitlines()[-1])
+
+        self.stdout.write(f"{'server':<7} {'requests':>9} {'req/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'errors':>7}")
+        for server, result in results.items():
+            self.stdout.write(
+                f"{server:<7} {result['requests']:>9} {result['throughput']:>8.1f} {result['p50_ms']:>8.2f} "
+                f"{result['p95_ms']:>8.2f} {result['p99_ms']:>8.2f} {result['errors']:>7}"
+            )
+
+        if results['wsgi']['throughput']:
+            ratio = results['asgi']['throughput'] / results['wsgi']['throughput']
+            self.stdout.write(self.style.SUCCESS(f"ASGI throughput: {ratio:.2f}x WSGI at concurrency {options['concurrency']}"))
+
+
+    def run_worker(self, options):
+        """
+        Migrate and seed the configured database, then send the requests through one handler.
+
+        Returns:
+            dict: requests, throughput, p50_ms, p95_ms, p99_ms and errors.
+        """
+        call_command('migrate', verbosity=0)
+        settings.ALLOWED_HOSTS = [*settings.ALLOWED_HOSTS, 'testserver']
+        users = seed_users(options['users'], 1, 1, LINES_PER_EXERCISE, prefix='bench')
+        cookies = []
+        for user in users:
+            client = Client()
+            client.force_login(user)
+            cookies.append((user.id, f"{settings.SESSION_COOKIE_NAME}={client.cookies[settings.SESSION_COOKIE_NAME].value}"))
+        connections.close_all()
+
+        requests = [(*cookies[index % len(cookies)], PAGES[index % len(PAGES)]) for index in range(options['requests'])]
+        run = self.run_wsgi if options['worker'] == 'wsgi' else self.run_asgi
+
+        start = time.perf_counter()
+        latencies, errors = run(requests, options['concurrency'], options['cold'])
+        duration = time.perf_counter() - start
+
+        return {'requests': len(latencies), 'throughput': len(latencies) / duration, 'errors': errors, **summarize(latencies)}
+
+
+    def run_wsgi(self, requests, concurrency, cold):
+        """
+        Send the requests through WSGIHandler from a pool of threads.
+
+        Returns:
+            tuple: (latencies in seconds, number of 5xx responses)
+        """
+        handler = WSGIHandler()
+
+        def send(request):
+            user_id, cookie, path = request
+            if cold:
+                bump_data_version(user_id)
+
+            status = []
+            environ = {
+                'REQUEST_METHOD': 'GET', 'PATH_INFO': path, 'QUERY_STRING': '', 'SCRIPT_NAME': '',
+                'SERVER_NAME': 'testserver', 'SERVER_PORT': '80', 'SERVER_PROTOCOL': 'HTTP/1.1', 'HTTP_HOST': 'testserver',
+                'HTTP_COOKIE': cookie, 'wsgi.input': io.BytesIO(), 'wsgi.errors': sys.stderr, 'wsgi.url_scheme': 'http',
+                'wsgi.version': (1, 0), 'wsgi.multithread': True, 'wsgi.multiprocess': False, 'wsgi.run_once': False,
+            }
+
+            start = time.perf_counter()
+            response = handler(environ, lambda code, headers, exc_info=None: status.append(int(code.split()[0])))
+            b''.join(response)
+            response.close()  # Fires request_finished, like a server would
+            return time.perf_counter() - start, status[0]
+
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            results = list(pool.map(send, requests))
+
+        return [latency for latency, _ in results], sum(status >= 500 for _, status in results)
+
+
+    def run_asgi(self, requests, concurrency, cold):
+        """
+        Send the requests through ASGIHandler from one event loop, concurrency at a time.
+
+        Returns:
+            tuple: (latencies in seconds, number of 5xx responses)
+        """
+        handler = ASGIHandler()
+
+        async def send(request, slots):
+            user_id, cookie, path = request
+            async with slots:
+                if cold:
+                    bump_data_version(user_id)
+
+                scope = {
+                    'type': 'http', 'asgi': {'version': '3.0'}, 'http_version': '1.1', 'method': 'GET',
+                    'scheme': 'http', 'path': path, 'raw_path': path.encode(), 'query_string': b'', 'root_path': '',
+                    'headers': [(b'host', b'testserver'), (b'cookie', cookie.encode())],
+                    'client': ('127.0.0.1', 0), 'server': ('testserver', 80),
+                }
+                body_sent = False
+                status = []
+
+                async def receive():
+                    nonlocal body_sent
+                    if not body_sent:
+                        body_sent = True
+                        return {'type': 'http.request', 'body': b'', 'more_body': False}
+                    await asyncio.Future()  # The client never disconnects, Django cancels this once it has responded
+
+                async def send_message(message):
+                    if message['type'] == 'http.response.start':
+                        status.append(message['status'])
+
+                start = time.perf_counter()
+                await handler(scope, receive, send_message)
+                return time.perf_counter() - start, status[0]
+
+        async def main():
+            slots = asyncio.Semaphore(concurrency)
+            return await asyncio.gather(*(send(request, slots) for request in requests))
+
+        results = asyncio.run(main())
+        return [latency for latency, _ in results], sum(status >= 500 for _, status in results)
@@ -0,0 +1,137 @@
+"""
+Author: Joshua Delos Santos
+Date: 18/10/2026
+
+
+Compare mixed read/write page throughput with and without the SQLite performance profile.
+
+Each profile runs in its own process against a fresh temporary database,
+because the profile is applied when connections are opened. Worker threads
+walk the sessions -> exercises -> lines pages and log sets through the
+Django test client.
+
+
+Example:
+    python manage.py bench_concurrency --threads 8 --duration 10 --write-ratio 0.2
+"""
+
+
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from django.conf import settings
+from django.core.management import call_command
+from django.core.management.base import BaseCommand
+from django.db import connections
+from django.test import Client
+from base.benchmarking import percentile, seed_users
+
+
+PROFILES = {'default': False, 'performance': True}
+LINES_PER_EXERCISE = 200
+
+
+class Command(BaseCommand):
+    help = "Compare mixed read/write page throughput with and without the SQLite performance profile."
+
+
+    def add_arguments(self, parser):
+        parser.add_argument('--threads', type=int, default=8, help="Concurrent clients.")
+        parser.add_argument('--duration', type=float, default=5.0, help="Seconds to run each profile.")
+        parser.add_argument('--write-ratio', type=float, default=0.2, help="Fraction of requests that log a set.")
+        parser.add_argument('--users', type=int, default=4, help="Users the clients are spread across.")
+        parser.add_argument('--worker', action='store_true', help="Internal: run against the configured database and print JSON.")
+
+
+    def handle(self, *args, **options):
+        if options['worker']:
+            self.stdout.write(json.dumps(self.run_worker(options)))
+            return
+
+        results = {}
+        for name, enabled in PROFILES.items():
+            with tempfile.TemporaryDirectory() as directory:
+                env = {
+                    **os.environ,
+                    'SQLITE_PERFORMANCE_PROFILE': str(enabled),
+                    'SQLITE_PATH': os.path.join(directory, 'bench.sqlite3'),
+                }
+                env.pop('DB_CONN_MAX_AGE', None)  # Let each profile use its own default
+                command = [
+                    sys.executable, str(settings.BASE_DIR / 'manage.py'), 'bench_concurrency', '--worker',
+                    '--threads', str(options['threads']),
+                    '--duration', str(options['duration']),
+                    '--write-ratio', str(options['write_ratio']),
+                    '--users', str(options['users']),
+                ]
+                output = subprocess.run(command, env=env, check=True, capture_output=True, text=True).stdout
+                results[name] = json.loads(output.strip().splitlines()[-1])
+
+        self.stdout.write(f"{'profile':<12} {'requests':>9} {'req/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'errors':>7}")
+        for name, result in results.items():
+            self.stdout.write(
+                f"{name:<12} {result['requests']:>9} {result['throughput']:>8.1f} "
+                f"{result['p50_ms']:>8.2f} {result['p95_ms']:>8.2f} {result['errors']:>7}"
+            )
+
+        if results['default']['throughput']:
+            ratio = results['performance']['throughput'] / results['default']['throughput']
+            self.stdout.write(self.style.SUCCESS(f"Performance profile throughput: {ratio:.2f}x the default profile"))
+
+
+    def run_worker(self, options):
+        """
+        Migrate and seed the configured database, then drive the pages from several threads.
+
+        Returns:
+            dict: requests, throughput, p50_ms, p95_ms and errors.
+        """
+        call_command('migrate', verbosity=0)
+        settings.ALLOWED_HOSTS = [*settings.ALLOWED_HOSTS, 'testserver']
+        users = seed_users(options['users'], 1, 1, LINES_PER_EXERCISE, prefix='bench')
+
+        latencies = []
+        errors = []
+        lock = threading.Lock()
+        deadline = time.perf_counter() + options['duration']
+
+        def worker(index):
+            client = Client(raise_request_exception=False)
+            client.force_login(users[index % len(users)])
+            pages = ['/sessions/', '/sessions/push-day/', '/sessions/push-day/bench-press/']  # First session and exercise seeded
+
+            try:
+                while time.perf_counter() < deadline:
+                    start = time.perf_counter()
+                    if random.random() < options['write_ratio']:
+                        response = client.post('/sessions/push-day/bench-press/', {'weight': '100', 'reps': '5'})
+                    else:
+                        response = client.get(random.choice(pages))
+                    elapsed = time.perf_counter() - start
+
+                    with lock:
+                        latencies.append(elapsed)
+                        if response.status_code >= 500:
+                            errors.append(response.status_code)
+            finally:
+                connections.close_all()
+
+        threads = [threading.Thread(target=worker, args=(index,)) for index in range(options['threads'])]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        return {
+            'requests': len(latencies),
+            'throughput': len(latencies) / options['duration'],
+            'p50_ms': percentile(latencies, 0.50) * 1000,
+            'p95_ms': percentile(latencies, 0.95) * 1000,
+            'errors': len(errors),
+        }
+
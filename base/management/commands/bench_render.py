@@ -0,0 +1,94 @@
+"""
+Author: Joshua Delos Santos
+Date: 18/10/2026
+
+
+Time rendering base/lines.html with and without its cached table fragment.
+
+Runs against a throwaway test database, so it never touches real data. An
+exercise is seeded with the largest requested number of lines, then a
+page of each size is rendered several times. 'cold' renders bump the
+exercise's lines version first, so the table body is rendered row by row
+as before fragment caching; 'warm' renders take it from the cache. Only
+template rendering is timed, the lines are loaded once beforehand.
+
+
+Example:
+    python manage.py bench_render --rows 50,500,5000 --iterations 30
+"""
+
+
+import time
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.template.loader import render_to_string
+from django.test import RequestFactory
+from base.benchmarking import seed_users, summarize
+from base.data_version import bump_object_versions, LINES_SCOPE
+from base.pagination import paginate_lines
+from base.viewModels.lines_view_model import LinesViewModel
+
+
+class Command(BaseCommand):
+    help = "Report the render time of the lines page for several page sizes, with the table fragment cold and warm."
+
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', default='50,500,5000', help="Comma separated rows per rendered page.")
+        parser.add_argument('--iterations', type=int, default=30, help="Renders per size and mode.")
+
+
+    def handle(self, *args, **options):
+        try:
+            sizes = [int(size) for size in options['rows'].split(',')]
+        except ValueError:
+            raise CommandError("--rows must be a comma separated list of integers.")
+
+        old_name = connection.settings_dict['NAME']
+        connection.creation.create_test_db(verbosity=0, autoclobber=True)
+
+        try:
+            user = seed_users(1, 1, 1, max(sizes), prefix='bench')[0]
+            exercise = user.exercises.select_related('session').get()
+            view_model = LinesViewModel(user)
+            request = RequestFactory().get('/')
+            request.user = user
+
+            self.stdout.write(f"{'rows':>7} {'mode':<5} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8}")
+            for size in sizes:
+                context = self.get_context(view_model, exercise, size)
+                for mode in ('cold', 'warm'):
+                    render_to_string('base/lines.html', context, request)  # Warm up the template and the fragment
+                    latencies = []
+                    for _ in range(options['iterations']):
+                        if mode == 'cold':
+                            bump_object_versions(LINES_SCOPE, [exercise.id])
+                            context['table_version'] = view_model.get_table_version(exercise.session.slug, exercise.slug)
+                        start = time.perf_counter()
+                        render_to_string('base/lines.html', context, request)
+                        latencies.append(time.perf_counter() - start)
+
+                    summary = summarize(latencies)
+                    self.stdout.write(f"{size:>7} {mode:<5} {summary['p50_ms']:>8.2f} {summary['p95_ms']:>8.2f} {summary['p99_ms']:>8.2f}")
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+
+
+    def get_context(self, view_model, exercise, size):
+        """
+        Build the lines page context with a page of the given size, as LinesView does.
+        """
+        session_slug, exercise_slug = exercise.session.slug, exercise.slug
+        page = paginate_lines(view_model.get_lines(session_slug, exercise_slug), page_size=size)
+        records = view_model.get_records(session_slug, exercise_slug)
+
+        return {
+            'exercise': exercise,
+            'lines': page.lines,
+            'cursor': f'bench-{size}',  # Keeps the fragments of each size apart
+            'next_cursor': page.next_cursor,
+            'records': records,
+            'record_line_ids': {record.line_id for record in records},
+            'table_version': view_model.get_table_version(session_slug, exercise_slug),
+            'form': view_model.get_line_form(),
+        }
@@ -0,0 +1,100 @@
+"""
+Author: Joshua Delos Santos
+Date: 18/10/2026
+
+
+Benchmark the sessions, exercises and lines pages at several data sizes.
+
+Runs against a throwaway test database, so it never touches real data.
+For every size a user is seeded with that many lines per exercise, then
+each page is requested through the Django test client. 'cold' requests
+bump the user's data version first, so the listing cache misses; 'warm'
+requests are served from it. Latency percentiles and query counts are
+reported for both, giving a repeatable baseline to catch regressions.
+
+
+Example:
+    python manage.py bench_views --sizes 10,1000,10000 --iterations 50
+"""
+
+
+import time
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+from base.benchmarking import seed_users, summarize
+from base.data_version import bump_data_version
+
+
+class Command(BaseCommand):
+    help = "Report latency percentiles and query counts of SessionsView, ExerciseView and LinesView at several data sizes."
+
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sizes', default='10,100,1000,10000', help="Comma separated lines per exercise to test.")
+        parser.add_argument('--iterations', type=int, default=30, help="Requests per page, size and mode.")
+        parser.add_argument('--sessions', type=int, default=4, help="Sessions of the seeded user.")
+        parser.add_argument('--exercises', type=int, default=5, help="Exercises per session.")
+
+
+    def handle(self, *args, **options):
+        try:
+            sizes = [int(size) for size in options['sizes'].split(',')]
+        except ValueError:
+            raise CommandError("--sizes must be a comma separated list of integers.")
+
+        settings.ALLOWED_HOSTS = [*settings.ALLOWED_HOSTS, 'testserver']
+        old_name = connection.settings_dict['NAME']
+        connection.creation.create_test_db(verbosity=0, autoclobber=True)
+
+        try:
+            self.stdout.write(f"{'lines':>7} {'view':<13} {'mode':<5} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'queries':>8}")
+            for size in sizes:
+                for row in self.bench_size(size, options):
+                    self.stdout.write(
+                        f"{size:>7} {row['view']:<13} {row['mode']:<5} {row['p50_ms']:>8.2f} "
+                        f"{row['p95_ms']:>8.2f} {row['p99_ms']:>8.2f} {row['queries']:>8}"
+                    )
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+
+
+    def bench_size(self, size, options):
+        """
+        Seed a user with the given number of lines per exercise and time each page.
+
+        Returns:
+            list: One dict per view and mode with the latency summary and query count.
+        """
+        user = seed_users(1, options['sessions'], options['exercises'], size, prefix=f'bench{size}_')[0]
+        session = user.sessions.order_by('id').first()
+        exercise = session.exercises.order_by('id').first()
+        pages = {
+            'SessionsView': '/sessions/',
+            'ExerciseView': f'/sessions/{session.slug}/',
+            'LinesView': f'/sessions/{session.slug}/{exercise.slug}/',
+        }
+
+        client = Client()
+        client.force_login(user)
+
+        rows = []
+        for view, url in pages.items():
+            for mode in ('cold', 'warm'):
+                client.get(url)  # Warm up imports, templates and the listing cache
+                latencies = []
+                for _ in range(options['iterations']):
+                    if mode == 'cold':
+                        bump_data_version(user.id)
+                    with CaptureQueriesContext(connection) as queries:
+                        start = time.perf_counter()
+                        response = client.get(url)
+                        latencies.append(time.perf_counter() - start)
+                    if response.status_code != 200:
+                        raise CommandError(f"{url} returned {response.status_code}")
+
+                rows.append({'view': view, 'mode': mode, 'queries': len(queries), **summarize(latencies)})
+
+        return rows
@@ -0,0 +1,71 @@
+"""
+Author: Joshua Delos Santos
+Date: 18/10/2026
+
+
+Import a user's training history from a CSV or JSON Lines file, see base/importer.py.
+
+
+Example:
+    python manage.py import_history alice history.csv
+    python manage.py import_history alice history.jsonl --dry-run
+"""
+
+
+import time
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from base.importer import IMPORT_BATCH_SIZE, IMPORT_FORMATS, import_history, parse_rows
+
+
+class Command(BaseCommand):
+    help = "Import sessions, exercises and lines for a user from a CSV or JSON Lines file."
+
+
+    def add_arguments(self, parser):
+        parser.add_argument('username', help="The user who will own the imported rows.")
+        parser.add_argument('path', help="The file to import.")
+        parser.add_argument('--format', choices=IMPORT_FORMATS, help="File format, guessed from the extension by default.")
+        parser.add_argument('--batch-size', type=int, default=IMPORT_BATCH_SIZE, help="Lines per INSERT and per transaction.")
+        parser.add_argument('--dry-run', action='store_true', help="Validate and count without writing anything.")
+
+
+    def handle(self, *args, **options):
+        try:
+            user = User.objects.get(username=options['username'])
+        except User.DoesNotExist:
+            raise CommandError(f"No user named '{options['username']}'.")
+
+        import_format = options['format'] or options['path'].rsplit('.', 1)[-1].lower()
+        if import_format not in IMPORT_FORMATS:
+            raise CommandError(f"Cannot tell the format of {options['path']}, pass --format.")
+
+        start = time.perf_counter()
+
+        def progress(result):
+            rate = result.rows / max(time.perf_counter() - start, 1e-9)
+            self.stdout.write(f"  {result.rows} records, {result.lines_created} lines ({rate:,.0f} records/s)", ending='\r')
+
+        try:
+            with open(options['path'], encoding='utf-8-sig', newline='') as stream:
+                result = import_history(
+                    user,
+                    parse_rows(stream, import_format),
+                    batch_size=options['batch_size'],
+                    dry_run=options['dry_run'],
+                    progress=progress if options['verbosity'] > 0 else None,
+                )
+        except OSError as error:
+            raise CommandError(error)
+
+        if options['verbosity'] > 0:
+            self.stdout.write('')  # End the progress line
+            for number, message in result.errors:
+                self.stdout.write(self.style.WARNING(f"Record {number}: {message}"))
+
+            verb = "Would import" if result.dry_run else "Imported"
+            self.stdout.write(self.style.SUCCESS(
+                f"{verb} {result.sessions_created} sessions, {result.exercises_created} exercises and "
+                f"{result.lines_created} lines from {result.rows} records in {time.perf_counter() - start:.1f}s. "
+                f"Skipped {result.error_count} invalid records."
+            ))
@@ -0,0 +1,32 @@
+"""
+Author: Joshua Delos Santos
+Date: 18/10/2026
+
+
+Remove soft-deleted sessions and exercises, and their lines, see base/deletion.py.
+
+Meant to run in the background, e.g. from cron, when SOFT_DELETE is on.
+
+
+Example:
+    python manage.py purge_deleted
+    python manage.py purge_deleted --older-than 3600
+"""
+
+
+from datetime import timedelta
+from django.core.management.base import BaseCommand
+from base.deletion import purge_deleted
+
+
+class Command(BaseCommand):
+    help = "Physically delete the sessions and exercises that were soft-deleted."
+
+
+    def add_arguments(self, parser):
+        parser.add_argument('--older-than', type=int, default=0, help="Only purge rows soft-deleted at least this many seconds ago.")
+
+
+    def handle(self, *args, **options):
+        sessions, exercises = purge_deleted(timedelta(seconds=options['older_than']))
+        self.stdout.write(self.style.SUCCESS(f"Purged {sessions} sessions and {exercises} exercises."))
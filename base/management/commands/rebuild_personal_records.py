@@ -0,0 +1,47 @@
+"""
+Author: Joshua Delos Santos
+Date: 18/10/2026
+
+
+Rebuild the personal records table from the lines, see base/personal_records.py.
+
+
+Example:
+    python manage.py rebuild_personal_records
+    python manage.py rebuild_personal_records --user alice
+"""
+
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from base.data_version import notify_data_changed, notify_objects_changed, LINES_SCOPE
+from base.models import Exercise
+from base.personal_records import rebuild_records
+
+
+class Command(BaseCommand):
+    help = "Rebuild the personal records of every user, or of one user, from their lines."
+
+
+    def add_arguments(self, parser):
+        parser.add_argument('--user', help="Only rebuild the records of this username.")
+
+
+    def handle(self, *args, **options):
+        user = None
+        if options['user']:
+            try:
+                user = User.objects.get(username=options['user'])
+            except User.DoesNotExist:
+                raise CommandError(f"No user named '{options['user']}'.")
+
+        count = rebuild_records(user)
+
+        # Cached record listings are stale now
+        user_ids = [user.id] if user else User.objects.values_list('id', flat=True)
+        for user_id in user_ids:
+            notify_data_changed(user_id)
+        exercises = Exercise.all_objects.filter(user=user) if user else Exercise.all_objects.all()
+        notify_objects_changed(LINES_SCOPE, exercises.values_list('id', flat=True))  # Record badges of the lines tables
+
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt {count} personal records."))
@@ -0,0 +1,52 @@
+"""
+Author: Joshua Delos Santos
+Date: 18/10/2026
+
+
+Repair the denormalised counters of exercises and sessions, see base/counters.py.
+
+The counters are kept up to date on every write; this recomputes them
+from the rows and fixes any that drifted, e.g. after editing the database
+by hand. Safe to run at any time, for example nightly from cron.
+
+
+Example:
+    python manage.py reconcile_counters
+    python manage.py reconcile_counters --user alice
+"""
+
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from base.counters import reconcile_counters
+from base.data_version import notify_data_changed, notify_objects_changed, EXERCISES_SCOPE
+from base.models import Session
+
+
+class Command(BaseCommand):
+    help = "Recompute the line and exercise counters of every user, or of one user, and repair any drift."
+
+
+    def add_arguments(self, parser):
+        parser.add_argument('--user', help="Only reconcile the counters of this username.")
+
+
+    def handle(self, *args, **options):
+        user = None
+        if options['user']:
+            try:
+                user = User.objects.get(username=options['user'])
+            except User.DoesNotExist:
+                raise CommandError(f"No user named '{options['user']}'.")
+
+        exercises, sessions = reconcile_counters(user)
+
+        if exercises or sessions:
+            # Cached listings and exercises tables show the counters
+            user_ids = [user.id] if user else User.objects.values_list('id', flat=True)
+            for user_id in user_ids:
+                notify_data_changed(user_id)
+            session_ids = Session.all_objects.filter(user=user) if user else Session.all_objects.all()
+            notify_objects_changed(EXERCISES_SCOPE, session_ids.values_list('id', flat=True))
+
+        self.stdout.write(self.style.SUCCESS(f"Repaired the counters of {exercises} exercises and {sessions} sessions."))
@@ -0,0 +1,56 @@
+"""
+Author: Joshua Delos Santos
+Date: 18/10/2026
+
+
+Seed the database with a realistic synthetic dataset for development and benchmarking.
+
+
+Example:
+    python manage.py seed_data --users 10 --sessions-per-user 4 --exercises-per-session 5 --lines-per-exercise 2000
+"""
+
+
+import time
+from django.core.management.base import BaseCommand
+from base.benchmarking import seed_users, SEED_BATCH_SIZE, SEED_PASSWORD
+
+
+class Command(BaseCommand):
+    help = "Seed users, sessions, exercises and lines with batched inserts."
+
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=5)
+        parser.add_argument('--sessions-per-user', type=int, default=3)
+        parser.add_argument('--exercises-per-session', type=int, default=4)
+        parser.add_argument('--lines-per-exercise', type=int, default=500)
+        parser.add_argument('--prefix', default='seed', help="Username prefix of the created users.")
+        parser.add_argument('--batch-size', type=int, default=SEED_BATCH_SIZE, help="Maximum rows per INSERT.")
+        parser.add_argument('--seed', type=int, default=None, help="Random seed, for a repeatable dataset.")
+
+
+    def handle(self, *args, **options):
+        start = time.perf_counter()
+
+        def progress(users_done, lines_created):
+            self.stdout.write(f"  {users_done}/{options['users']} users, {lines_created} lines", ending='\r')
+
+        users = seed_users(
+            options['users'],
+            options['sessions_per_user'],
+            options['exercises_per_session'],
+            options['lines_per_exercise'],
+            prefix=options['prefix'],
+            batch_size=options['batch_size'],
+            seed=options['seed'],
+            progress=progress if options['verbosity'] > 0 else None,
+        )
+
+        elapsed = time.perf_counter() - start
+        if options['verbosity'] > 0:
+            self.stdout.write('')  # End the progress line
+            self.stdout.write(self.style.SUCCESS(
+                f"Seeded {len(users)} users ({users[0].username if users else '-'} ...) in {elapsed:.1f}s. "
+                f"Password: {SEED_PASSWORD}"
+            ))
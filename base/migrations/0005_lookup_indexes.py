@@ -0,0 +1,43 @@
+# Generated by Django 5.2.18 on 2026-10-18 08:23
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('base', '0004_exercise_user_line_user_session_user'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='exercise',
+            name='name',
+            field=models.CharField(max_length=25),
+        ),
+        migrations.AlterField(
+            model_name='session',
+            name='name',
+            field=models.CharField(max_length=25, unique=True),
+        ),
+        migrations.AlterField(
+            model_name='session',
+            name='user',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='sessions', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddIndex(
+            model_name='exercise',
+            index=models.Index(fields=['session', 'user', 'slug'], name='exercise_session_user_slug_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='line',
+            index=models.Index(fields=['exercise', 'date'], name='line_exercise_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='session',
+            index=models.Index(fields=['user', 'slug'], name='session_user_slug_idx'),
+        ),
+    ]
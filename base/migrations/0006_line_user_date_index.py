@@ -0,0 +1,19 @@
+# Generated by Django 5.2.18 on 2026-10-18 08:24
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('base', '0005_lookup_indexes'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='line',
+            index=models.Index(fields=['user', 'date'], name='line_user_date_idx'),
+        ),
+    ]
@@ -0,0 +1,43 @@
+# Generated by Django 5.2.18 on 2026-10-18 08:29
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+def record_existing_objects(apps, schema_editor):
+    """
+    Seed the change log with every existing object so a first sync (cursor 0) returns all of them.
+    """
+    Change = apps.get_model('base', 'Change')
+    for model_name in ('session', 'exercise', 'line'):
+        model = apps.get_model('base', model_name)
+        Change.objects.bulk_create(
+            [Change(user_id=user_id, model=model_name, object_id=object_id) for object_id, user_id in model.objects.order_by('id').values_list('id', 'user_id')],
+            batch_size=2000,
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('base', '0007_exercise_updated_at_session_updated_at'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Change',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('model', models.CharField(choices=[('session', 'Session'), ('exercise', 'Exercise'), ('line', 'Line')], max_length=25)),
+                ('object_id', models.BigIntegerField()),
+                ('deleted', models.BooleanField(default=False)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='changes', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['user', 'id'], name='change_user_id_idx')],
+            },
+        ),
+        migrations.RunPython(record_existing_objects, migrations.RunPython.noop),
+    ]
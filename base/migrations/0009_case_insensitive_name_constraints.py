@@ -0,0 +1,51 @@
+# Generated by Django 5.2.18 on 2026-10-18 08:33
+
+import django.db.models.functions.text
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('base', '0008_change'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='session',
+            name='session_user_slug_idx',
+        ),
+        migrations.AlterField(
+            model_name='exercise',
+            name='slug',
+            field=models.SlugField(blank=True),
+        ),
+        migrations.AlterField(
+            model_name='session',
+            name='name',
+            field=models.CharField(max_length=25),
+        ),
+        migrations.AlterField(
+            model_name='session',
+            name='slug',
+            field=models.SlugField(blank=True),
+        ),
+        migrations.AddConstraint(
+            model_name='exercise',
+            constraint=models.UniqueConstraint(django.db.models.functions.text.Lower('name'), models.F('session'), models.F('user'), name='exercise_session_name_unique'),
+        ),
+        migrations.AddConstraint(
+            model_name='exercise',
+            constraint=models.UniqueConstraint(fields=('session', 'slug'), name='exercise_session_slug_unique'),
+        ),
+        migrations.AddConstraint(
+            model_name='session',
+            constraint=models.UniqueConstraint(django.db.models.functions.text.Lower('name'), models.F('user'), name='session_user_name_unique'),
+        ),
+        migrations.AddConstraint(
+            model_name='session',
+            constraint=models.UniqueConstraint(fields=('user', 'slug'), name='session_user_slug_unique'),
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 5.2.18 on 2026-10-18 08:35
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('base', '0009_case_insensitive_name_constraints'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='line',
+            name='date',
+            field=models.DateTimeField(default=django.utils.timezone.now, editable=False),
+        ),
+    ]
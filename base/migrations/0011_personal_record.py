@@ -0,0 +1,67 @@
+# Generated by Django 5.2.18 on 2026-10-18 09:02
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import F, Window
+from django.db.models.functions import RowNumber
+
+
+def build_personal_records(apps, schema_editor):
+    """
+    Fill the personal records from the existing lines: the heaviest line of every (exercise, reps), the earliest on a tie.
+    """
+    Line = apps.get_model('base', 'Line')
+    PersonalRecord = apps.get_model('base', 'PersonalRecord')
+    best_lines = Line.objects.annotate(
+        rank=Window(RowNumber(), partition_by=[F('exercise_id'), F('reps')], order_by=[F('weight').desc(), F('date').asc(), F('id').asc()]),
+    ).filter(rank=1).values_list('id', 'exercise_id', 'reps', 'weight', 'date', 'user_id')
+    PersonalRecord.objects.bulk_create(
+        [PersonalRecord(line_id=line_id, exercise_id=exercise_id, reps=reps, weight=weight, date=date, user_id=user_id)
+         for line_id, exercise_id, reps, weight, date, user_id in best_lines],
+        batch_size=2000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('base', '0010_line_date_default'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PersonalRecord',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('reps', models.IntegerField()),
+                ('weight', models.DecimalField(decimal_places=2, max_digits=5)),
+                ('date', models.DateTimeField()),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='line',
+            index=models.Index(fields=['exercise', 'reps', '-weight'], name='line_exercise_reps_weight_idx'),
+        ),
+        migrations.AddField(
+            model_name='personalrecord',
+            name='exercise',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='personal_records', to='base.exercise'),
+        ),
+        migrations.AddField(
+            model_name='personalrecord',
+            name='line',
+            field=models.ForeignKey(null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='base.line'),
+        ),
+        migrations.AddField(
+            model_name='personalrecord',
+            name='user',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='personal_records', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddConstraint(
+            model_name='personalrecord',
+            constraint=models.UniqueConstraint(fields=('exercise', 'reps'), name='personal_record_exercise_reps_unique'),
+        ),
+        migrations.RunPython(build_personal_records, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,58 @@
+# Generated by Django 5.2.18 on 2026-10-18 09:16
+
+import django.db.models.functions.text
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('base', '0011_personal_record'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RemoveConstraint(
+            model_name='exercise',
+            name='exercise_session_name_unique',
+        ),
+        migrations.RemoveConstraint(
+            model_name='exercise',
+            name='exercise_session_slug_unique',
+        ),
+        migrations.RemoveConstraint(
+            model_name='session',
+            name='session_user_name_unique',
+        ),
+        migrations.RemoveConstraint(
+            model_name='session',
+            name='session_user_slug_unique',
+        ),
+        migrations.AddField(
+            model_name='exercise',
+            name='deleted_at',
+            field=models.DateTimeField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='session',
+            name='deleted_at',
+            field=models.DateTimeField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddConstraint(
+            model_name='exercise',
+            constraint=models.UniqueConstraint(django.db.models.functions.text.Lower('name'), models.F('session'), models.F('user'), condition=models.Q(('deleted_at__isnull', True)), name='exercise_session_name_unique'),
+        ),
+        migrations.AddConstraint(
+            model_name='exercise',
+            constraint=models.UniqueConstraint(condition=models.Q(('deleted_at__isnull', True)), fields=('session', 'slug'), name='exercise_session_slug_unique'),
+        ),
+        migrations.AddConstraint(
+            model_name='session',
+            constraint=models.UniqueConstraint(django.db.models.functions.text.Lower('name'), models.F('user'), condition=models.Q(('deleted_at__isnull', True)), name='session_user_name_unique'),
+        ),
+        migrations.AddConstraint(
+            model_name='session',
+            constraint=models.UniqueConstraint(condition=models.Q(('deleted_at__isnull', True)), fields=('user', 'slug'), name='session_user_slug_unique'),
+        ),
+    ]
@@ -0,0 +1,68 @@
+# Generated by Django 5.2.18 on 2026-10-18 09:30
+
+from decimal import Decimal
+from django.db import migrations, models
+from django.db.models import Count, F, Max, OuterRef, Subquery, Sum, Value
+from django.db.models.functions import Coalesce
+
+
+def fill_counters(apps, schema_editor):
+    """
+    Fill the counters of the existing exercises from their lines, then of the sessions from their exercises.
+    """
+    Session = apps.get_model('base', 'Session')
+    Exercise = apps.get_model('base', 'Exercise')
+    Line = apps.get_model('base', 'Line')
+    volume_field = models.DecimalField(max_digits=15, decimal_places=2)
+
+    lines = Line.objects.filter(exercise=OuterRef('pk')).order_by().values('exercise')
+    Exercise.objects.update(
+        line_count=Coalesce(Subquery(lines.annotate(count=Count('id')).values('count')), 0),
+        total_volume=Coalesce(
+            Subquery(lines.annotate(volume=Sum(F('weight') * F('reps'), output_field=volume_field)).values('volume')),
+            Value(Decimal(0)), output_field=volume_field,
+        ),
+        last_performed_at=Subquery(lines.annotate(latest=Max('date')).values('latest')),
+    )
+
+    exercises = Exercise.objects.filter(session=OuterRef('pk'), deleted_at__isnull=True).order_by().values('session')
+    Session.objects.update(
+        exercise_count=Coalesce(Subquery(exercises.annotate(count=Count('id')).values('count')), 0),
+        last_performed_at=Subquery(exercises.annotate(latest=Max('last_performed_at')).values('latest')),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('base', '0012_soft_delete'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='exercise',
+            name='last_performed_at',
+            field=models.DateTimeField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='exercise',
+            name='line_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='exercise',
+            name='total_volume',
+            field=models.DecimalField(decimal_places=2, default=0, editable=False, max_digits=15),
+        ),
+        migrations.AddField(
+            model_name='session',
+            name='exercise_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='session',
+            name='last_performed_at',
+            field=models.DateTimeField(blank=True, editable=False, null=True),
+        ),
+        migrations.RunPython(fill_counters, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,24 @@
+# Generated by Django 5.2.18 on 2026-10-18 09:53
+
+import django.core.validators
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('base', '0013_counters'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='line',
+            name='reps',
+            field=models.IntegerField(validators=[django.core.validators.MinValueValidator(1)]),
+        ),
+        migrations.AlterField(
+            model_name='line',
+            name='weight',
+            field=models.DecimalField(decimal_places=2, max_digits=5, validators=[django.core.validators.MinValueValidator(0)]),
+        ),
+    ]
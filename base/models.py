@@ -5,16 +5,92 @@ Author: Joshua Delos Santos
 Date: 07/10/2024
 """
 
-from django.db import models
+from django.db import models, transaction, IntegrityError
+from django.db.models import Avg, Count, F, Max, Q, Sum
+from django.db.models.functions import Lower
 from django.contrib.auth.models import User
+from django.utils import timezone
 from django.utils.text import slugify
 from django.core.exceptions import ValidationError 
+from django.core.validators import MinValueValidator
 
 
 
 MAX_CHAR_FIELD = 25
 MAX_DIGITS = 5
 NUMBER_DECIMAL_PLACE = 2
+MAX_VOLUME_DIGITS = 15
+
+
+
+def line_stats_expressions(prefix=''):
+    """
+    Build the aggregate expressions used for exercise statistics.
+    
+    Args:
+        prefix (str): Lookup prefix leading to the Line fields, e.g. 'lines__' when
+            annotating exercises or '' when aggregating over lines directly.
+    
+    Returns:
+        dict: Aggregate expressions keyed by statistic name.
+    """
+    return {
+        'average_reps': Avg(f'{prefix}reps'),
+        'total_volume': Sum(
+            F(f'{prefix}weight') * F(f'{prefix}reps'),
+            output_field=models.DecimalField(max_digits=MAX_VOLUME_DIGITS, decimal_places=NUMBER_DECIMAL_PLACE),
+        ),
+        'best_weight': Max(f'{prefix}weight'),
+        'set_count': Count(f'{prefix}id'),
+        'last_performed': Max(f'{prefix}date'),
+    }
+
+
+
+def fields_without_counters(instance):
+    """
+    Names of the fields save() writes for an existing row: all of them but the
+    denormalised counters, which only base/counters.py updates, and deleted_at,
+    which only base/deletion.py sets, so a stale instance never overwrites
+    them or brings a deleted row back.
+    """
+    return [
+        field.name for field in instance._meta.concrete_fields
+        if not field.primary_key and field.name not in instance.COUNTER_FIELDS and field.name != 'deleted_at'
+    ]
+
+
+
+def violates_unique_constraint(error, model):
+    """
+    Whether an IntegrityError comes from one of the model's UniqueConstraints, rather than
+    e.g. a foreign key or NOT NULL failure. PostgreSQL names the constraint; SQLite names the
+    index of an expression constraint, or lists the columns of a field constraint.
+    """
+    constraint_name = getattr(getattr(error.__cause__, 'diag', None), 'constraint_name', None)
+    message = str(error)
+    for constraint in model._meta.constraints:
+        if not isinstance(constraint, models.UniqueConstraint):
+            continue
+        if constraint.name == constraint_name or f"'{constraint.name}'" in message or f'"{constraint.name}"' in message:
+            return True
+        columns = ', '.join(f'{model._meta.db_table}.{model._meta.get_field(name).column}' for name in constraint.fields)
+        if constraint.fields and message.endswith(f'UNIQUE constraint failed: {columns}'):
+            return True
+    return False
+
+
+
+class ActiveManager(models.Manager):
+    """
+    Manager that hides soft-deleted rows, those with a deleted_at date.
+    Use the model's all_objects manager to include them.
+    """
+    def get_queryset(self):
+        """
+        Return only the rows that are not soft-deleted.
+        """
+        return super().get_queryset().filter(deleted_at__isnull=True)
 
 
 
@@ -23,13 +99,35 @@ class Session(models.Model):
     The Session model represents a user-specific session with a unique name and slug.
     
     Attributes:
-        name (CharField): The name of the session, which must be unique.
-        slug (SlugField): A unique slug for the session, automatically generated from the name.
+        name (CharField): The name of the session, unique per user regardless of case.
+        slug (SlugField): A slug unique per user, automatically generated from the name.
         user (ForeignKey): A reference to the User who owns the session.
+        updated_at (DateTimeField): When the session was last saved.
+        deleted_at (DateTimeField): When the session was soft-deleted, None if it was not (see base/deletion.py).
+        exercise_count (PositiveIntegerField): Number of exercises in the session, kept up to date by base/counters.py.
+        last_performed_at (DateTimeField): Date of the latest line in the session, None if it has none.
     """
-    name = models.CharField(max_length=MAX_CHAR_FIELD, unique=True)  # Django will raise an IntegrityError when creating a duplicate.
-    slug = models.SlugField(unique=True, blank=True)
+    COUNTER_FIELDS = ('exercise_count', 'last_performed_at')
+    
+    name = models.CharField(max_length=MAX_CHAR_FIELD)
+    slug = models.SlugField(blank=True)
     user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='sessions')  # Link to User
+    updated_at = models.DateTimeField(auto_now=True)
+    deleted_at = models.DateTimeField(null=True, blank=True, editable=False)
+    exercise_count = models.PositiveIntegerField(default=0, editable=False)
+    last_performed_at = models.DateTimeField(null=True, blank=True, editable=False)
+    
+    objects = ActiveManager()
+    all_objects = models.Manager()
+    
+    
+    class Meta:
+        constraints = [
+            # The database raises an IntegrityError when creating a duplicate, save() turns it into a ValidationError.
+            # Soft-deleted sessions do not count, so their name can be reused before they are purged.
+            models.UniqueConstraint(Lower('name'), 'user', condition=Q(deleted_at__isnull=True), name='session_user_name_unique'),
+            models.UniqueConstraint(fields=['user', 'slug'], condition=Q(deleted_at__isnull=True), name='session_user_slug_unique'),  # Also serves session lookups by owner and slug
+        ]
     
     
     def __str__(self):
@@ -41,17 +139,43 @@ class Session(models.Model):
     
     def save(self, *args, **kwargs):
         """
-        Override the save method to enforce uniqueness of the session name and 
-        automatically set the slug based on the session name.
+        Override the save method to automatically set the slug based on the session name
+        and report a duplicate session name or slug as a ValidationError. Other integrity
+        errors are raised as they are.
         """
-        if Session.objects.filter(name__iexact=self.name, user=self.user).exists() and not self.pk:
-            raise ValidationError(f"A similar session to '{self.name}' already exists.")
-        
         if not self.slug or self.slug != slugify(self.name):
             self.slug = slugify(self.name)
-            
-        super().save(*args, **kwargs)
+        if not self._state.adding and kwargs.get('update_fields') is None:
+            kwargs['update_fields'] = fields_without_counters(self)
+        
+        try:
+            with transaction.atomic():  # Savepoint, so a failed insert leaves any outer transaction usable
+                super().save(*args, **kwargs)
+        except IntegrityError as e:
+            if not violates_unique_constraint(e, type(self)):
+                raise
+            raise ValidationError(f"A similar session to '{self.name}' already exists.") from e
+    
+
+
+class ExerciseQuerySet(models.QuerySet):
+    """
+    QuerySet for exercises with statistics computed by the database.
     
+    Example use:
+        exercises = Exercise.objects.filter(session=session).with_stats()
+        exercises[0].average_reps
+    """
+    def with_stats(self):
+        """
+        Annotate each exercise with average_reps, best_weight, set_count and
+        last_performed in a single grouped query. total_volume is not annotated,
+        the exercise's own total_volume counter already holds it.
+        """
+        stats = line_stats_expressions('lines__')
+        del stats['total_volume']  # Would clash with the field
+        return self.annotate(**stats)
+
 
 
 class Exercise(models.Model):
@@ -59,15 +183,41 @@ class Exercise(models.Model):
     The Exercise model represents an exercise within a session, with a unique name and slug.
     
     Attributes:
-        name (CharField): The name of the exercise.
+        name (CharField): The name of the exercise, unique per session regardless of case.
         session (ForeignKey): A reference to the Session to which the exercise belongs.
-        slug (SlugField): A unique slug for the exercise, automatically generated from the name.
+        slug (SlugField): A slug unique per session, automatically generated from the name.
         user (ForeignKey): A reference to the User who owns the exercise.
+        updated_at (DateTimeField): When the exercise was last saved.
+        deleted_at (DateTimeField): When the exercise, or its session, was soft-deleted, None if it was not.
+        line_count (PositiveIntegerField): Number of lines of the exercise, kept up to date by base/counters.py.
+        total_volume (DecimalField): Sum of weight x reps over the lines of the exercise.
+        last_performed_at (DateTimeField): Date of the latest line of the exercise, None if it has none.
     """
+    COUNTER_FIELDS = ('line_count', 'total_volume', 'last_performed_at')
+    
     name = models.CharField(max_length=MAX_CHAR_FIELD)
     session = models.ForeignKey(Session, on_delete=models.CASCADE, related_name='exercises', null=True)
-    slug = models.SlugField(unique=True, blank=True)
+    slug = models.SlugField(blank=True)
     user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='exercises')
+    updated_at = models.DateTimeField(auto_now=True)
+    deleted_at = models.DateTimeField(null=True, blank=True, editable=False)
+    line_count = models.PositiveIntegerField(default=0, editable=False)
+    total_volume = models.DecimalField(max_digits=MAX_VOLUME_DIGITS, decimal_places=NUMBER_DECIMAL_PLACE, default=0, editable=False)
+    last_performed_at = models.DateTimeField(null=True, blank=True, editable=False)
+    
+    objects = ActiveManager.from_queryset(ExerciseQuerySet)()
+    all_objects = ExerciseQuerySet.as_manager()
+    
+    
+    class Meta:
+        indexes = [
+            models.Index(fields=['session', 'user', 'slug'], name='exercise_session_user_slug_idx'),  # Exercises of a session by owner and slug
+        ]
+        constraints = [
+            # The database raises an IntegrityError when creating a duplicate, save() turns it into a ValidationError.
+            models.UniqueConstraint(Lower('name'), 'session', 'user', condition=Q(deleted_at__isnull=True), name='exercise_session_name_unique'),
+            models.UniqueConstraint(fields=['session', 'slug'], condition=Q(deleted_at__isnull=True), name='exercise_session_slug_unique'),
+        ]
     
     
     def __str__(self):
@@ -79,26 +229,42 @@ class Exercise(models.Model):
     
     def save(self, *args, **kwargs):
         """
-        Override the save method to enforce uniqueness of the exercise name within a session
-        and automatically set the slug based on the exercise name.
+        Override the save method to automatically set the slug based on the exercise name
+        and report a duplicate exercise name or slug within a session as a ValidationError.
+        Other integrity errors are raised as they are.
         """
-        if Exercise.objects.filter(name__iexact=self.name, session=self.session, user=self.user).exists() and not self.pk:
-            raise ValidationError(f"A similar exercise to '{self.name}' already exists.")
-        
         # Automatically generate the slug from the name
         if not self.slug or self.slug != slugify(self.name):
             self.slug = slugify(self.name)
+        if not self._state.adding and kwargs.get('update_fields') is None:
+            kwargs['update_fields'] = fields_without_counters(self)
         
-        super().save(*args, **kwargs)
+        try:
+            with transaction.atomic():  # Savepoint, so a failed insert leaves any outer transaction usable
+                super().save(*args, **kwargs)
+        except IntegrityError as e:
+            if not violates_unique_constraint(e, type(self)):
+                raise
+            raise ValidationError(f"A similar exercise to '{self.name}' already exists.") from e
+    
+    
+    def get_stats(self):
+        """
+        Get the statistics for the exercise using one aggregate query.
+        
+        Returns:
+            dict: average_reps, total_volume, best_weight, set_count and last_performed.
+                  Values are None (0 for set_count) when the exercise has no lines.
+        """
+        return self.lines.aggregate(**line_stats_expressions())
     
     
     def determine_average_reps(self):
         """
         Determine the average number of reps for the exercise.
         """
-        total_reps = sum(line.reps for line in self.lines.all())
-        count = self.lines.count()
-        return total_reps / count if count > 0 else 0
+        average_reps = self.lines.aggregate(average_reps=Avg('reps'))['average_reps']
+        return average_reps if average_reps is not None else 0
     
     
     
@@ -108,22 +274,125 @@ class Line(models.Model):
     
     Attributes:
         exercise (ForeignKey): A reference to the Exercise to which the line belongs.
-        weight (DecimalField): The weight lifted for the set.
-        reps (IntegerField): The number of repetitions performed for the set.
+        weight (DecimalField): The weight lifted for the set, not negative.
+        reps (IntegerField): The number of repetitions performed for the set, at least 1.
         date (DateTimeField): The date and time the set was performed.
         slug (SlugField): A unique slug for the line, automatically generated from the exercise name and date.
         user (ForeignKey): A reference to the User who owns the line.
     """
     exercise = models.ForeignKey(Exercise, on_delete=models.CASCADE, related_name='lines')
-    weight = models.DecimalField(max_digits=MAX_DIGITS, decimal_places=NUMBER_DECIMAL_PLACE)
-    reps = models.IntegerField()
-    date = models.DateTimeField(auto_now_add=True)
+    weight = models.DecimalField(max_digits=MAX_DIGITS, decimal_places=NUMBER_DECIMAL_PLACE, validators=[MinValueValidator(0)])
+    reps = models.IntegerField(validators=[MinValueValidator(1)])
+    date = models.DateTimeField(default=timezone.now, editable=False)  # Not auto_now_add, so bulk inserts can keep a real date
     user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='lines') 
     
     
+    class Meta:
+        indexes = [
+            models.Index(fields=['exercise', 'date'], name='line_exercise_date_idx'),  # Line history of an exercise by date
+            models.Index(fields=['user', 'date'], name='line_user_date_idx'),  # Line history of a user by date
+            models.Index(fields=['exercise', 'reps', '-weight'], name='line_exercise_reps_weight_idx'),  # Best line for a personal record slot
+        ]
+    
+    
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        """
+        Loads a line and remembers its exercise, so an edit that moves the line can update the exercise it left.
+        """
+        line = super().from_db(db, field_names, values)
+        line._loaded_exercise_id = line.__dict__.get('exercise_id')  # Not loaded when deferred
+        return line
+    
+    
+    def save(self, *args, **kwargs):
+        """
+        Saves the line, after which its exercise is the one it was loaded with.
+        """
+        super().save(*args, **kwargs)
+        self._loaded_exercise_id = self.exercise_id
+    
+    
     def __str__(self):
         """
         Returns a string representation of the line.
         """
         return f"{self.weight} for {self.reps} reps at {self.date}"
-    
\ No newline at end of file
+
+
+
+class PersonalRecord(models.Model):
+    """
+    The PersonalRecord model holds the heaviest weight lifted for a number of reps of an exercise.
+
+    There is one row per (exercise, reps), kept up to date as lines are saved and
+    deleted (see base/personal_records.py), so showing records never scans lines.
+    On a tie the earliest line keeps the record.
+
+    Attributes:
+        exercise (ForeignKey): A reference to the Exercise the record belongs to.
+        reps (IntegerField): The number of repetitions the record is for.
+        weight (DecimalField): The record weight.
+        date (DateTimeField): When the record was set.
+        line (ForeignKey): The line that holds the record, None once it is deleted until the slot is recomputed.
+        user (ForeignKey): A reference to the User who owns the record.
+    """
+    exercise = models.ForeignKey(Exercise, on_delete=models.CASCADE, related_name='personal_records')
+    reps = models.IntegerField()
+    weight = models.DecimalField(max_digits=MAX_DIGITS, decimal_places=NUMBER_DECIMAL_PLACE)
+    date = models.DateTimeField()
+    line = models.ForeignKey(Line, on_delete=models.SET_NULL, null=True, related_name='+')
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='personal_records')
+
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['exercise', 'reps'], name='personal_record_exercise_reps_unique'),
+        ]
+
+
+    def __str__(self):
+        """
+        Returns a string representation of the personal record.
+        """
+        return f"{self.weight} for {self.reps} reps"
+
+
+
+class Change(models.Model):
+    """
+    The Change model records that a Session, Exercise or Line of a user was saved or deleted.
+    
+    The auto-incrementing id is the monotonic cursor used by delta sync: a client
+    that has seen every change up to id N only needs the changes with id > N.
+    Deletes are kept as tombstones (deleted=True) so clients can drop the rows.
+    
+    Attributes:
+        user (ForeignKey): A reference to the User who owns the changed object.
+        model (CharField): Which model changed: 'session', 'exercise' or 'line'.
+        object_id (BigIntegerField): The primary key of the changed object.
+        deleted (BooleanField): True if the object was deleted.
+    """
+    SESSION = 'session'
+    EXERCISE = 'exercise'
+    LINE = 'line'
+    MODEL_CHOICES = [(SESSION, 'Session'), (EXERCISE, 'Exercise'), (LINE, 'Line')]
+    
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='changes')
+    model = models.CharField(max_length=MAX_CHAR_FIELD, choices=MODEL_CHOICES)
+    object_id = models.BigIntegerField()
+    deleted = models.BooleanField(default=False)
+    
+    
+    class Meta:
+        indexes = [
+            models.Index(fields=['user', 'id'], name='change_user_id_idx'),  # Changes of a user after a cursor
+        ]
+    
+    
+    def __str__(self):
+        """
+        Returns a string representation of the change.
+        """
+        action = 'deleted' if self.deleted else 'saved'
+        return f"{self.model} {self.object_id} {action}"
@@ -0,0 +1,147 @@
+"""
+Author: Joshua Delos Santos
+Date: 18/10/2026
+
+
+This file defines keyset (cursor) pagination for lines.
+
+Lines are ordered newest first on (date, id). A page is fetched with a
+range condition on that key and a LIMIT, never an OFFSET, so every page
+costs the same no matter how deep the user scrolls.
+
+
+Example:
+    page = paginate_lines(Line.objects.filter(exercise=exercise), request.GET.get('cursor'))
+    page.lines        # The lines on this page
+    page.next_cursor  # Cursor for the next (older) page, or None
+    page = await apaginate_lines(queryset, cursor)  # From async views
+"""
+
+
+import base64
+import binascii
+from datetime import datetime
+from django.db.models import Q
+
+
+LINES_PAGE_SIZE = 50
+CURSOR_SEPARATOR = '_'
+
+
+
+class LinePage:
+    """
+    A single page of lines.
+
+    Attributes:
+        lines (list): The lines on the page, newest first.
+        next_cursor (str): The cursor of the next (older) page, None on the last page.
+    """
+    def __init__(self, lines, next_cursor=None):
+        """
+        Initialise the page with its lines and the cursor of the next page.
+        """
+        self.lines = lines
+        self.next_cursor = next_cursor
+
+
+    @property
+    def has_more(self):
+        """
+        Returns True if there are older lines after this page.
+        """
+        return self.next_cursor is not None
+
+
+
+def encode_cursor(line):
+    """
+    Encode the (date, id) position of a line as an opaque url-safe cursor.
+
+    Args:
+        line: A Line instance, or a values() row holding 'date' and 'id'.
+
+    Returns:
+        str: The cursor pointing just after the given line.
+    """
+    date, line_id = (line['date'], line['id']) if isinstance(line, dict) else (line.date, line.id)
+    position = f"{date.isoformat()}{CURSOR_SEPARATOR}{line_id}"
+    return base64.urlsafe_b64encode(position.encode()).decode().rstrip('=')
+
+
+
+def decode_cursor(cursor):
+    """
+    Decode a cursor produced by encode_cursor.
+
+    Returns:
+        tuple: (date, id) of the last line of the previous page, or None if the cursor is empty or invalid.
+    """
+    if not cursor:
+        return None
+
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        position = base64.urlsafe_b64decode(padded.encode()).decode()
+        date, line_id = position.rsplit(CURSOR_SEPARATOR, 1)
+        return datetime.fromisoformat(date), int(line_id)
+    except (ValueError, binascii.Error):
+        return None
+
+
+
+def paginate_lines(queryset, cursor=None, page_size=LINES_PAGE_SIZE):
+    """
+    Get one page of lines from a line queryset, newest first.
+
+    Args:
+        queryset (QuerySet): The lines to paginate, e.g. the lines of an exercise.
+            values() querysets must include 'date' and 'id'.
+        cursor (str): The cursor returned with the previous page. None for the first page.
+        page_size (int): The maximum number of lines on the page.
+
+    Returns:
+        LinePage: The lines on the page and the cursor of the next page.
+    """
+    lines = list(_page_queryset(queryset, cursor)[:page_size + 1])  # One extra line tells us if there is a next page
+    return _to_page(lines, page_size)
+
+
+
+async def apaginate_lines(queryset, cursor=None, page_size=LINES_PAGE_SIZE):
+    """
+    Async version of paginate_lines, fetching the page with async iteration.
+
+    Returns:
+        LinePage: The lines on the page and the cursor of the next page.
+    """
+    lines = [line async for line in _page_queryset(queryset, cursor)[:page_size + 1]]
+    return _to_page(lines, page_size)
+
+
+
+def _page_queryset(queryset, cursor):
+    """
+    Order the lines newest first and keep only those after the cursor.
+    """
+    queryset = queryset.order_by('-date', '-id')
+    position = decode_cursor(cursor)
+
+    if position is not None:
+        date, line_id = position
+        # (date, id) < (cursor date, cursor id). The date__lte term lets the database seek the index.
+        queryset = queryset.filter(Q(date__lte=date) & (Q(date__lt=date) | Q(id__lt=line_id)))
+
+    return queryset
+
+
+
+def _to_page(lines, page_size):
+    """
+    Build the page from up to page_size + 1 fetched lines.
+    """
+    if len(lines) > page_size:
+        lines = lines[:page_size]
+        return LinePage(lines, encode_cursor(lines[-1]))
+
+    return LinePage(lines)
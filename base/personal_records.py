@@ -0,0 +1,169 @@
+"""
+Author: Joshua Delos Santos
+Date: 18/10/2026
+
+
+This file maintains the personal records table.
+
+A personal record is the heaviest line of an exercise for a number of
+reps, stored in one PersonalRecord row per (exercise, reps) slot. Saving a
+line only has to compare it with the record of its own slot, which is a
+conditional UPDATE and, for a new slot, an INSERT that ignores conflicts,
+so concurrent saves cannot replace a record with a lighter weight.
+A batch of new lines is merged the same way in one statement: an INSERT
+of the best line of every slot whose ON CONFLICT update only applies
+WHERE the new weight is heavier. Deleting the line that holds a record
+recomputes just that slot from the (exercise, reps, weight) index. Paths that write lines without signals,
+such as the importer, rebuild the records of the exercises they touched.
+The table can always be rebuilt from the lines with rebuild_records().
+
+
+Example:
+    record_line(line)
+    rebuild_records(user, exercise_ids=[exercise.id])
+"""
+
+
+from django.db import connection, transaction
+from django.db.models import F, Window
+from django.db.models.functions import RowNumber
+from base.models import Line, PersonalRecord, MAX_DIGITS, NUMBER_DECIMAL_PLACE
+
+
+REBUILD_BATCH_SIZE = 2000
+RECORD_FIELDS = ('weight', 'date', 'line')  # Replaced when a slot gets a new record
+RECORD_COLUMNS = ('exercise', 'reps', 'weight', 'date', 'line', 'user')  # Order of the values of each upserted record
+BEST_LINE_ORDER = (F('weight').desc(), F('date').asc(), F('id').asc())  # Heaviest first, the earliest wins a tie
+
+
+
+def record_line(line):
+    """
+    Make a saved line the record of its slot if it beats the current record or the slot is empty.
+    """
+    beaten = PersonalRecord.objects.filter(exercise_id=line.exercise_id, reps=line.reps, weight__lt=line.weight).update(
+        weight=line.weight, date=line.date, line=line,
+    )
+
+    if not beaten:
+        PersonalRecord.objects.bulk_create([_record_for(line)], ignore_conflicts=True)  # No-op if the slot has an equal or better record
+
+
+
+def record_lines(lines):
+    """
+    Merge a batch of new lines of one user into the records with one guarded upsert, so
+    concurrent batches cannot replace a record with a lighter weight.
+    """
+    best = {}
+    for line in lines:
+        current = best.get((line.exercise_id, line.reps))
+        if current is None or line.weight > current.weight:
+            best[(line.exercise_id, line.reps)] = line
+
+    if not best:
+        return
+
+    quote = connection.ops.quote_name
+    table = quote(PersonalRecord._meta.db_table)
+    column = {name: quote(PersonalRecord._meta.get_field(name).column) for name in RECORD_COLUMNS}
+    updates = ', '.join(f"{column[name]} = excluded.{column[name]}" for name in RECORD_FIELDS)
+    sql = (
+        f"INSERT INTO {table} ({', '.join(column.values())}) VALUES ({', '.join(['%s'] * len(RECORD_COLUMNS))}) "
+        f"ON CONFLICT ({column['exercise']}, {column['reps']}) DO UPDATE SET {updates} "
+        f"WHERE excluded.{column['weight']} > {table}.{column['weight']}"  # Like record_line(), only a heavier line takes the slot
+    )
+
+    adapt_decimal = connection.ops.adapt_decimalfield_value
+    adapt_datetime = connection.ops.adapt_datetimefield_value
+    values = [
+        (line.exercise_id, line.reps, adapt_decimal(line.weight, MAX_DIGITS, NUMBER_DECIMAL_PLACE), adapt_datetime(line.date), line.id, line.user_id)
+        for line in best.values()
+    ]
+    with connection.cursor() as cursor:
+        cursor.executemany(sql, values)
+
+
+
+def line_saved(line, created):
+    """
+    Update the records after a line is saved. An edited line that held a record
+    may no longer deserve it, so its old slot is recomputed first.
+    """
+    if not created:
+        for exercise_id, reps in PersonalRecord.objects.filter(line=line).values_list('exercise_id', 'reps'):
+            recompute_record(exercise_id, reps)
+
+    record_line(line)
+
+
+
+def line_deleted(line):
+    """
+    Recompute the slot of a deleted line if the line held its record. The record
+    lost its line through on_delete=SET_NULL, so only then is the slot orphaned.
+    """
+    if PersonalRecord.objects.filter(exercise_id=line.exercise_id, reps=line.reps, line__isnull=True).exists():
+        recompute_record(line.exercise_id, line.reps)
+
+
+
+def recompute_record(exercise_id, reps):
+    """
+    Set the record of one slot from its best remaining line, or remove it if no line is left.
+    """
+    best = Line.objects.filter(exercise_id=exercise_id, reps=reps).order_by(*BEST_LINE_ORDER).first()
+
+    if best is None:
+        PersonalRecord.objects.filter(exercise_id=exercise_id, reps=reps).delete()
+    else:
+        PersonalRecord.objects.bulk_create(
+            [_record_for(best)], update_conflicts=True, unique_fields=['exercise', 'reps'], update_fields=list(RECORD_FIELDS),
+        )
+
+
+
+def rebuild_records(user=None, exercise_ids=None):
+    """
+    Rebuild records from the lines, picking the best line of every slot with one window query.
+
+    Args:
+        user (User): Only rebuild this user's records. None for every user.
+        exercise_ids (iterable): Only rebuild the records of these exercises. None for all of them.
+
+    Returns:
+        int: The number of records written.
+    """
+    lines = Line.objects.filter(exercise__deleted_at__isnull=True)  # Soft-deleted exercises have no records
+    records = PersonalRecord.objects.all()
+    if user is not None:
+        lines = lines.filter(user=user)
+        records = records.filter(user=user)
+    if exercise_ids is not None:
+        exercise_ids = list(exercise_ids)
+        lines = lines.filter(exercise_id__in=exercise_ids)
+        records = records.filter(exercise_id__in=exercise_ids)
+
+    best_lines = (
+        lines.annotate(rank=Window(RowNumber(), partition_by=[F('exercise_id'), F('reps')], order_by=BEST_LINE_ORDER))
+        .filter(rank=1)
+        .only('exercise_id', 'reps', 'weight', 'date', 'user_id')
+    )
+
+    with transaction.atomic():
+        records.delete()
+        created = PersonalRecord.objects.bulk_create(
+            [_record_for(line) for line in best_lines.iterator(chunk_size=REBUILD_BATCH_SIZE)], batch_size=REBUILD_BATCH_SIZE,
+        )
+
+    return len(created)
+
+
+
+def _record_for(line):
+    """
+    Build the record a line would hold.
+    """
+    return PersonalRecord(
+        exercise_id=line.exercise_id, reps=line.reps, weight=line.weight, date=line.date, line_id=line.id, user_id=line.user_id,
+    )
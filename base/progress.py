@@ -0,0 +1,105 @@
+"""
+Author: Joshua Delos Santos
+Date: 18/10/2026
+
+
+This file builds the per-exercise progress series shown on the statistics page.
+
+Lines are grouped into day, week or month buckets with Trunc* and
+aggregated by the database, so only one row per exercise and bucket comes
+back, never the raw lines. A series is cached per user and bucket size in
+the listing cache, so it is computed once per change of the user's data.
+Each exercise also carries its personal records, read from the records
+table rather than worked out from the lines.
+
+
+Example:
+    progress = get_progress(request.user, 'week')
+    progress['exercises'][0]['series'][0]  # {'period': date(2024, 1, 1), 'max_weight': Decimal('100.00'), ...}
+"""
+
+
+from django.db.models import Avg, DateField, DecimalField, F, Max, Sum
+from django.db.models.functions import TruncDay, TruncMonth, TruncWeek
+from base.listing_cache import listing_cache
+from base.models import Exercise, MAX_VOLUME_DIGITS, NUMBER_DECIMAL_PLACE
+from users.api.app_user import AppUser
+
+
+PROGRESS_BUCKETS = {
+    'day': TruncDay,
+    'week': TruncWeek,  # Weeks start on Monday
+    'month': TruncMonth,
+}
+DEFAULT_BUCKET = 'week'
+PROGRESS_FIELDS = ('period', 'max_weight', 'total_volume', 'average_reps')
+
+
+
+def get_progress(user, bucket=DEFAULT_BUCKET):
+    """
+    Get the progress series of every exercise of a user, served from the listing cache
+    until the user's data changes.
+
+    Args:
+        user (User): The user whose lines are summarised.
+        bucket (str): A key of PROGRESS_BUCKETS.
+
+    Returns:
+        dict: 'bucket' and 'exercises', a list with the id, name, slug and session slug of
+            every exercise that has lines, its 'series': one dict of PROGRESS_FIELDS per
+            bucket, oldest first, and its 'records': reps, weight and date of each personal
+            record, fewest reps first.
+    """
+    if bucket not in PROGRESS_BUCKETS:
+        raise ValueError(f"bucket must be one of: {', '.join(PROGRESS_BUCKETS)}.")
+
+    return listing_cache.get_or_load(user.id, f'progress:{bucket}', lambda: _load_progress(user, bucket))
+
+
+
+def _load_progress(user, bucket):
+    """
+    Compute the progress series with one grouped query for the lines, one for the exercise names
+    and one for the personal records.
+    """
+    app_user = AppUser(user)
+    rows = (
+        app_user.get_user_lines()
+        .annotate(period=PROGRESS_BUCKETS[bucket]('date', output_field=DateField()))
+        .values('exercise_id', 'period')
+        .annotate(
+            max_weight=Max('weight'),
+            total_volume=Sum(
+                F('weight') * F('reps'),
+                output_field=DecimalField(max_digits=MAX_VOLUME_DIGITS, decimal_places=NUMBER_DECIMAL_PLACE),
+            ),
+            average_reps=Avg('reps'),
+        )
+        .order_by('exercise_id', 'period')
+    )
+
+    series = {}
+    for row in rows:
+        row['average_reps'] = round(row['average_reps'], 2)
+        series.setdefault(row.pop('exercise_id'), []).append(row)
+
+    records = {}
+    for record in app_user.get_user_records().values('exercise_id', 'reps', 'weight', 'date'):
+        records.setdefault(record.pop('exercise_id'), []).append(record)
+
+    exercises = (
+        Exercise.objects.filter(id__in=list(series), user=user)
+        .order_by('session__name', 'name')
+        .values('id', 'name', 'slug', 'session__slug')
+    )
+
+    return {
+        'bucket': bucket,
+        'exercises': [
+            {'id': exercise['id'], 'name': exercise['name'], 'slug': exercise['slug'],
+             'session': exercise['session__slug'], 'series': series[exercise['id']],
+             'records': records.get(exercise['id'], [])}
+            for exercise in exercises
+        ],
+    }
@@ -0,0 +1,133 @@
+"""
+Author: Joshua Delos Santos
+Date: 18/10/2026
+
+
+This file defines query budgets: the most queries a view or AppUser method may run.
+
+Budgets are registered in QUERY_BUDGETS and checked with query_budget, a
+context manager that also works as a decorator. When a budget is exceeded
+it raises QueryBudgetExceeded listing every query that ran, so an N+1 loop
+shows up with its SQL. View budgets cover a whole request through the test
+client, including the two queries the authentication middleware makes
+(session and user) for a logged in client, and assume a cold listing cache.
+
+Every budget is the count measured for its view or method, not a ceiling
+with headroom, and the budget tests pass exact=True at several data sizes,
+so a count that grows with the data fails, and so does one that shrinks
+until its budget is tightened to match.
+
+
+Example:
+    with query_budget('LinesView.get'):
+        client.get(url)
+
+    with query_budget('LinesView.get', exact=True):  # Also fails on fewer queries
+        client.get(url)
+
+    @query_budget('AppUser.get_user_sessions')
+    def load():
+        return list(AppUser(user).get_user_sessions())
+"""
+
+
+from contextlib import ContextDecorator
+from django.db import connections, DEFAULT_DB_ALIAS
+from django.test.utils import CaptureQueriesContext
+
+
+QUERY_BUDGETS = {
+    # Views, per request. Writes include the change log insert and, for sessions
+    # and exercises, the savepoint that turns constraint violations into ValidationErrors.
+    # Adding a line also updates its personal record slot (an UPDATE, then an INSERT if not beaten)
+    # and the counters of its exercise and session (an UPDATE each, see base/counters.py).
+    # Adding an exercise updates the exercise count of its session.
+    'SessionsView.get': 3,
+    'SessionsView.post': 6,
+    'ExerciseView.get': 4,
+    'ExerciseView.post': 8,
+    'LinesView.get': 5,
+    'LinesView.post': 9,  # The first line of its record slot, the UPDATE finds nothing and the INSERT runs
+    'LinesView.post_beating_record': 8,  # The UPDATE takes the slot over, no INSERT
+    'ConditionalPage.not_modified': 2,  # A 304 from a matching ETag: only the session and user (base/views/conditional.py)
+    'LoginView.get': 0,
+    'LoginView.post': 9,
+    'RegisterView.get': 0,
+    'RegisterView.post': 11,
+
+    # AppUser methods, including evaluation of the returned QuerySet.
+    'AppUser.get_user_sessions': 1,
+    'AppUser.get_cached_user_sessions': 1,
+    'AppUser.get_user_exercises': 1,
+    'AppUser.get_exercises_by_session_slug': 2,
+    'AppUser.get_session_exercises': 1,
+    'AppUser.get_cached_session_exercises': 1,
+    'AppUser.get_user_lines': 1,
+    'AppUser.get_user_lines_page': 1,
+    'AppUser.get_lines_for_exercise': 2,
+    'AppUser.get_exercise_lines': 1,
+    'AppUser.get_lines_page_for_exercise': 2,
+    'AppUser.get_exercise_lines_page': 1,
+    'AppUser.get_cached_exercise_lines_page': 1,
+    'AppUser.get_exercise_records': 1,
+    'AppUser.get_cached_exercise_records': 1,
+    'AppUser.get_user_records': 1,
+}
+
+
+
+class QueryBudgetExceeded(AssertionError):
+    """
+    Raised when a block runs more queries than its budget allows.
+    """
+
+
+
+class query_budget(ContextDecorator):
+    """
+    Fail if the wrapped block or function runs more queries than its budget.
+
+    Args:
+        name (str): The budget name in QUERY_BUDGETS, also used in the failure message.
+        limit (int): Overrides the registered budget.
+        using (str): The database alias to watch.
+        exact (bool): Also fail if the block runs fewer queries, so the budget stays the measured count.
+    """
+    def __init__(self, name, limit=None, using=DEFAULT_DB_ALIAS, exact=False):
+        """
+        Look up the budget for name unless an explicit limit is given.
+        """
+        self.name = name
+        self.limit = QUERY_BUDGETS[name] if limit is None else limit
+        self.using = using
+        self.exact = exact
+
+
+    def __enter__(self):
+        """
+        Start capturing queries.
+
+        Returns:
+            CaptureQueriesContext: The captured queries, available after the block.
+        """
+        self.queries = CaptureQueriesContext(connections[self.using])
+        return self.queries.__enter__()
+
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        """
+        Stop capturing and raise QueryBudgetExceeded if the block went over budget, or under it when exact.
+        """
+        self.queries.__exit__(exc_type, exc_value, traceback)
+
+        count = len(self.queries)
+        if exc_type is None and (count > self.limit or self.exact and count < self.limit):
+            statements = '\n'.join(
+                f"  {number}. {query['sql']}" for number, query in enumerate(self.queries.captured_queries, start=1)
+            )
+            hint = '' if count > self.limit else ' exactly, tighten the budget'
+            raise QueryBudgetExceeded(
+                f"{self.name} ran {count} queries, its budget is {self.limit}{hint}:\n{statements}"
+            )
+
+        return False
@@ -0,0 +1,251 @@
+"""
+Author: Joshua Delos Santos
+Date: 18/10/2026
+
+
+This file defines and connects the model signals of the base app.
+
+Receivers are connected in BaseConfig.ready(). Deletes that cascade from a
+Session to its Exercises and Lines send post_delete for every object, so
+each of them gets its own tombstone. Deletes that cascade from the owning
+User are not tracked at all: the user's change log, records and counters
+go with it, and writing a row for them would break the user's delete.
+
+bulk_create does not send post_save, so code that bulk creates objects
+sends bulk_created instead, and the same bookkeeping happens once per batch.
+
+Saving or deleting a Line also keeps its exercise's personal records up to
+date (see base/personal_records.py).
+
+Writes also bump the version of the table fragment that shows the object:
+the lines of its exercise, or the exercises of its session. A line edited
+into another exercise bumps, and recounts, the exercise it left as well.
+
+Adding and removing lines and exercises keeps the denormalised counters of
+their exercises and sessions up to date (see base/counters.py).
+"""
+
+
+from django.contrib.auth import get_user_model
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver, Signal
+from base.models import Session, Exercise, Line, Change
+from base.sync import record_change, record_changes
+from base.data_version import notify_data_changed, notify_objects_changed, LINES_SCOPE, EXERCISES_SCOPE
+from base.personal_records import line_saved, line_deleted, record_lines
+from base.counters import lines_added, lines_removed, exercises_added, exercises_removed, reconcile_counters
+
+
+# Sent with sender=<model>, user_id and objects after <model>.objects.bulk_create()
+# for a Session, Exercise or Line batch owned by a single user.
+bulk_created = Signal()
+
+
+# Change log name of each tracked model.
+TRACKED_MODELS = {
+    Session: Change.SESSION,
+    Exercise: Change.EXERCISE,
+    Line: Change.LINE,
+}
+
+
+def owner_deleted(origin):
+    """
+    Whether a post_delete comes from deleting users, whose objects are being removed with them.
+
+    Args:
+        origin: The instance or QuerySet the delete started from, the origin argument of post_delete.
+    """
+    User = get_user_model()
+    return isinstance(origin, User) or getattr(origin, 'model', None) is User
+
+
+
+@receiver(post_save, sender=Session)
+@receiver(post_save, sender=Exercise)
+@receiver(post_save, sender=Line)
+def record_saved(sender, instance, raw=False, **kwargs):
+    """
+    Record a created or updated object in the change log and bump its owner's data version.
+    Fixture loading (raw=True) is not tracked.
+    """
+    if not raw:
+        record_change(instance.user_id, TRACKED_MODELS[sender], instance.pk)
+        notify_data_changed(instance.user_id)
+
+
+@receiver(post_delete, sender=Session)
+@receiver(post_delete, sender=Exercise)
+@receiver(post_delete, sender=Line)
+def record_deleted(sender, instance, **kwargs):
+    """
+    Record a tombstone for a deleted object in the change log and bump its owner's data version.
+    """
+    if owner_deleted(kwargs.get('origin')):
+        return
+    record_change(instance.user_id, TRACKED_MODELS[sender], instance.pk, deleted=True)
+    notify_data_changed(instance.user_id)
+
+
+@receiver(bulk_created, sender=Session)
+@receiver(bulk_created, sender=Exercise)
+@receiver(bulk_created, sender=Line)
+def record_bulk_created(sender, user_id, objects, **kwargs):
+    """
+    Record a bulk created batch in the change log with one insert and bump the data version once.
+    """
+    record_changes(user_id, TRACKED_MODELS[sender], [obj.pk for obj in objects])
+    notify_data_changed(user_id)
+
+
+
+@receiver(post_save, sender=Line)
+def update_personal_records(sender, instance, created, raw=False, **kwargs):
+    """
+    Let a saved line take the personal record of its slot. Fixture loading (raw=True) is not tracked.
+    """
+    if not raw:
+        line_saved(instance, created)
+
+
+@receiver(post_delete, sender=Line)
+def recompute_personal_record(sender, instance, **kwargs):
+    """
+    Recompute the personal record slot of a deleted line if it held the record.
+    """
+    if owner_deleted(kwargs.get('origin')):
+        return
+    line_deleted(instance)
+
+
+@receiver(bulk_created, sender=Line)
+def update_personal_records_in_bulk(sender, user_id, objects, **kwargs):
+    """
+    Merge a bulk created batch of lines into the personal records.
+    """
+    record_lines(objects)
+
+
+
+def line_exercise_ids(line):
+    """
+    Return the exercise id of a saved line, preceded by the one it was loaded with if the save moved it.
+    """
+    loaded = getattr(line, '_loaded_exercise_id', None)
+    return [line.exercise_id] if loaded in (None, line.exercise_id) else [loaded, line.exercise_id]
+
+
+@receiver(post_save, sender=Line)
+@receiver(post_delete, sender=Line)
+def bump_lines_version(sender, instance, **kwargs):
+    """
+    Invalidate the cached lines table of the line's exercise, and of the one it moved from.
+    """
+    notify_objects_changed(LINES_SCOPE, line_exercise_ids(instance))
+
+
+@receiver(post_save, sender=Exercise)
+@receiver(post_delete, sender=Exercise)
+def bump_exercises_version(sender, instance, **kwargs):
+    """
+    Invalidate the cached exercises table of the exercise's session.
+    """
+    notify_objects_changed(EXERCISES_SCOPE, [instance.session_id])
+
+
+@receiver(post_save, sender=Session)
+def bump_session_exercises_version(sender, instance, **kwargs):
+    """
+    Invalidate the cached exercises table of a saved session, whose rows link to it by slug.
+    """
+    notify_objects_changed(EXERCISES_SCOPE, [instance.id])
+
+
+@receiver(bulk_created, sender=Line)
+def bump_lines_versions_in_bulk(sender, user_id, objects, **kwargs):
+    """
+    Invalidate the cached lines tables of the exercises in a bulk created batch.
+    """
+    notify_objects_changed(LINES_SCOPE, [line.exercise_id for line in objects])
+
+
+@receiver(bulk_created, sender=Exercise)
+def bump_exercises_versions_in_bulk(sender, user_id, objects, **kwargs):
+    """
+    Invalidate the cached exercises tables of the sessions in a bulk created batch.
+    """
+    notify_objects_changed(EXERCISES_SCOPE, [exercise.session_id for exercise in objects])
+
+
+
+def line_session_ids(lines):
+    """
+    Return the session ids of the lines' exercises when they are loaded, None to have them looked up.
+    """
+    exercise_field = Line._meta.get_field('exercise')
+    if all(exercise_field.is_cached(line) for line in lines):
+        return [line.exercise.session_id for line in lines]
+    return None
+
+
+@receiver(post_save, sender=Line)
+def count_saved_line(sender, instance, created, raw=False, **kwargs):
+    """
+    Count a new line in its exercise and session, or recompute them for an edited one, along with
+    the exercise and session it moved from. Fixture loading (raw=True) is not tracked.
+    """
+    if raw:
+        return
+    if created:
+        lines_added([(instance.exercise_id, instance.weight, instance.reps, instance.date)], line_session_ids([instance]))
+        return
+
+    exercise_ids = line_exercise_ids(instance)
+    exercises_repaired, _ = reconcile_counters(exercise_ids=exercise_ids)
+    if exercises_repaired:  # Their rows in the exercises tables show the counters
+        notify_objects_changed(EXERCISES_SCOPE, Exercise.all_objects.filter(id__in=exercise_ids).values_list('session_id', flat=True))
+
+
+@receiver(post_delete, sender=Line)
+def count_deleted_line(sender, instance, **kwargs):
+    """
+    Take a deleted line out of the counters of its exercise and session.
+    """
+    if owner_deleted(kwargs.get('origin')):
+        return
+    lines_removed([(instance.exercise_id, instance.weight, instance.reps)], line_session_ids([instance]))
+
+
+@receiver(bulk_created, sender=Line)
+def count_lines_in_bulk(sender, user_id, objects, **kwargs):
+    """
+    Count a bulk created batch of lines with one update per table.
+    """
+    lines_added([(line.exercise_id, line.weight, line.reps, line.date) for line in objects], line_session_ids(objects))
+
+
+@receiver(post_save, sender=Exercise)
+def count_saved_exercise(sender, instance, created, raw=False, **kwargs):
+    """
+    Count a new exercise in its session. Fixture loading (raw=True) is not tracked.
+    """
+    if created and not raw:
+        exercises_added([instance.session_id])
+
+
+@receiver(post_delete, sender=Exercise)
+def count_deleted_exercise(sender, instance, **kwargs):
+    """
+    Take a deleted exercise out of the counters of its session.
+    """
+    if owner_deleted(kwargs.get('origin')):
+        return
+    exercises_removed([instance.session_id])
+
+
+@receiver(bulk_created, sender=Exercise)
+def count_exercises_in_bulk(sender, user_id, objects, **kwargs):
+    """
+    Count a bulk created batch of exercises in their sessions.
+    """
+    exercises_added([exercise.session_id for exercise in objects])
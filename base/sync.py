@@ -0,0 +1,174 @@
+"""
+Author: Joshua Delos Santos
+Date: 18/10/2026
+
+
+This file handles change tracking and delta sync for the mobile client.
+
+Every save or delete of a Session, Exercise or Line appends a Change row
+(see base/signals.py). Paths that skip model signals, such as bulk_create,
+call record_changes() themselves. A client passes the cursor it was last
+given and receives only the rows changed since then, plus tombstones for
+deleted rows, so the cost follows the size of the change rather than the
+size of the user's history.
+
+
+Example:
+    delta = get_changes_since(request.user, cursor=0)
+    delta['cursor']  # Pass this back on the next sync
+"""
+
+
+from django.db import connection
+from base.models import Session, Exercise, Line, Change
+
+
+SYNC_PAGE_SIZE = 500
+
+# Model and values() fields sent for each kind of changed object.
+SYNC_MODELS = {
+    Change.SESSION: (Session, ('id', 'name', 'slug', 'updated_at')),
+    Change.EXERCISE: (Exercise, ('id', 'session_id', 'name', 'slug', 'updated_at')),
+    Change.LINE: (Line, ('id', 'exercise_id', 'weight', 'reps', 'date')),
+}
+
+# Response keys for each kind of changed object.
+SYNC_KEYS = {
+    Change.SESSION: 'sessions',
+    Change.EXERCISE: 'exercises',
+    Change.LINE: 'lines',
+}
+
+
+
+def record_change(user_id, model, object_id, deleted=False):
+    """
+    Record that a single object was saved or deleted.
+
+    Args:
+        user_id (int): The id of the user who owns the object.
+        model (str): Change.SESSION, Change.EXERCISE or Change.LINE.
+        object_id (int): The primary key of the object.
+        deleted (bool): True if the object was deleted.
+    """
+    Change.objects.create(user_id=user_id, model=model, object_id=object_id, deleted=deleted)
+
+
+
+def record_changes(user_id, model, object_ids, deleted=False):
+    """
+    Record that many objects of one model were saved or deleted, in a single insert.
+    Used by paths that bypass model signals, such as bulk_create.
+    """
+    Change.objects.bulk_create([
+        Change(user_id=user_id, model=model, object_id=object_id, deleted=deleted)
+        for object_id in object_ids
+    ])
+
+
+
+def record_created(user_id, model, object_ids):
+    """
+    Record that many objects of one model were created, with one executemany() of a
+    prepared INSERT. Used by raw inserts, for which compiling bulk_create() would cost
+    more than the database work.
+
+    Args:
+        user_id (int): The id of the user who owns the objects.
+        model (str): Change.SESSION, Change.EXERCISE or Change.LINE.
+        object_ids (list): The ids of the new objects.
+    """
+    quote = connection.ops.quote_name
+    columns = ', '.join(quote(Change._meta.get_field(name).column) for name in ('user', 'model', 'object_id', 'deleted'))
+
+    with connection.cursor() as cursor:
+        cursor.executemany(
+            f"INSERT INTO {quote(Change._meta.db_table)} ({columns}) VALUES (%s, %s, %s, %s)",
+            [(user_id, model, object_id, False) for object_id in object_ids],
+        )
+
+
+
+def record_tombstones(user_id, model, queryset):
+    """
+    Record every object of a queryset as deleted with a single INSERT ... SELECT.
+    Used by set-based deletes, which do not send post_delete.
+
+    Args:
+        user_id (int): The id of the user who owns the objects.
+        model (str): Change.SESSION, Change.EXERCISE or Change.LINE.
+        queryset (QuerySet): The objects about to be deleted.
+    """
+    _record_selected(user_id, model, queryset, deleted=True)
+
+
+
+def record_saved(user_id, model, queryset):
+    """
+    Record every object of a queryset as saved with a single INSERT ... SELECT.
+    Used by seeding, which does not send bulk_created for its batches.
+
+    Args:
+        user_id (int): The id of the user who owns the objects.
+        model (str): Change.SESSION, Change.EXERCISE or Change.LINE.
+        queryset (QuerySet): The saved objects.
+    """
+    _record_selected(user_id, model, queryset, deleted=False)
+
+
+
+def _record_selected(user_id, model, queryset, deleted):
+    """
+    Insert a Change row for every object of a queryset, in id order, without loading them.
+    """
+    quote = connection.ops.quote_name
+    columns = ', '.join(quote(Change._meta.get_field(name).column) for name in ('user', 'model', 'object_id', 'deleted'))
+    sql, params = queryset.order_by('id').values_list('id').query.sql_with_params()
+
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"INSERT INTO {quote(Change._meta.db_table)} ({columns}) SELECT %s, %s, {quote('id')}, %s FROM ({sql}) AS selected_rows",
+            [user_id, model, deleted, *params],
+        )
+
+
+
+def get_changes_since(user, cursor=0, page_size=SYNC_PAGE_SIZE):
+    """
+    Get the rows of the user that changed after the given cursor.
+
+    Args:
+        user (User): The user to sync.
+        cursor (int): The cursor returned by the previous sync, 0 for a full sync.
+        page_size (int): The maximum number of changes to consume in one call.
+
+    Returns:
+        dict: 'sessions', 'exercises' and 'lines' hold the current values() rows of changed objects,
+              'deleted' maps the same keys to lists of deleted ids, 'cursor' is the next cursor and
+              'has_more' is True when more changes are waiting after it.
+    """
+    changes = list(
+        Change.objects.filter(user=user, id__gt=cursor)
+        .order_by('id')
+        .values_list('id', 'model', 'object_id', 'deleted')[:page_size + 1]
+    )
+    has_more = len(changes) > page_size
+    changes = changes[:page_size]
+
+    # The last change of each object decides whether it is sent as a row or a tombstone.
+    latest = {}
+    for _, model, object_id, deleted in changes:
+        latest[(model, object_id)] = deleted
+
+    delta = {'deleted': {}}
+    for model, (model_class, fields) in SYNC_MODELS.items():
+        key = SYNC_KEYS[model]
+        saved_ids = [object_id for (kind, object_id), deleted in latest.items() if kind == model and not deleted]
+        delta['deleted'][key] = [object_id for (kind, object_id), deleted in latest.items() if kind == model and deleted]
+        # Objects deleted after this page simply come back as tombstones on the next sync.
+        delta[key] = list(model_class.objects.filter(id__in=saved_ids, user=user).order_by('id').values(*fields)) if saved_ids else []
+
+    delta['cursor'] = changes[-1][0] if changes else cursor
+    delta['has_more'] = has_more
+
+    return delta
@@ -5,9 +5,49 @@ Author: Joshua Delos Santos
 Date: 07/10/2024
 """
 
-from django.test import TestCase
-from .models import Session, Exercise, Line
+import csv
+import gzip
+import io
+import json
+import os
+import tempfile
+import time
+from unittest import mock, skipUnless
+from datetime import date, datetime, timedelta, timezone as dt_timezone
+from decimal import Decimal
+from asgiref.sync import iscoroutinefunction
+from django.conf import settings
+from django.http import HttpResponse
+from django.utils import timezone
+from django.utils.http import http_date
+from django.core.management import call_command
+from django.db import IntegrityError, connection
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import RequestFactory, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from .models import Session, Exercise, Line, PersonalRecord, Change
+from .pagination import paginate_lines
+from .sync import get_changes_since
+from .importer import check_database_support, import_history, parse_rows
+from .forms.line_form import LineForm
+from .progress import get_progress
+from .analytics import ANALYTICS_AVAILABLE, get_analytics, epley, brzycki, load_line_columns, _load_analytics
+from .personal_records import rebuild_records, record_lines
+from .counters import reconcile_counters
+from .deletion import delete_session, delete_exercise, purge_deleted
+from .export import export_rows
+from .listing_cache import listing_cache
+from .query_budget import query_budget, QueryBudgetExceeded
+from .benchmarking import seed_users, SEED_PASSWORD
+from .data_version import check_cache_is_shared, bump_data_version, get_object_version, LINES_SCOPE, EXERCISES_SCOPE
+from .viewModels.sessions_view_model import SessionsViewModel
+from .viewModels.exercises_view_model import ExerciseViewModel
+from .viewModels.lines_view_model import LinesViewModel
 from django.contrib.auth.models import User
+from django.core.exceptions import ImproperlyConfigured, ValidationError
+from users.api.app_user import AppUser
+from replus import static_files
+from replus.profiling import ProfilingMiddleware
 
 
 class SessionModelTests(TestCase):
@@ -35,6 +75,36 @@ class SessionModelTests(TestCase):
         """
         self.assertFalse(self.user2.sessions.filter(id=self.session.id).exists())
 
+    def test_session_names_are_unique_per_user_ignoring_case(self):
+        """
+        Test that a duplicate session name differing only in case raises a ValidationError,
+        while another user may reuse the name.
+        """
+        with self.assertRaisesMessage(ValidationError, "A similar session to 'strength training' already exists."):
+            Session.objects.create(name="strength training", user=self.user1)
+
+        other = Session.objects.create(name="Strength Training", user=self.user2)
+        self.assertEqual(other.slug, self.session.slug)
+
+    def test_only_name_and_slug_clashes_become_validation_errors(self):
+        """
+        Test that a slug clash is reported like a name clash, while any other integrity error is raised as it is.
+        """
+        with self.assertRaisesMessage(ValidationError, "A similar session to 'Strength-Training' already exists."):
+            Session.objects.create(name="Strength-Training", user=self.user1)
+        with self.assertRaises(IntegrityError):
+            Session.objects.create(name="Cardio", user_id=None)
+        with self.assertRaises(IntegrityError):
+            Exercise.objects.create(name="Lunges", session=self.session, user_id=None)
+
+    def test_duplicate_session_insert_runs_no_lookup(self):
+        """
+        Test that saving a session no longer checks for duplicates with a separate query.
+        """
+        with CaptureQueriesContext(connection) as queries:
+            Session.objects.create(name="Cardio", user=self.user1)
+        self.assertFalse(any(query['sql'].startswith('SELECT') for query in queries.captured_queries))
+
 
 class ExerciseModelTests(TestCase):
     """
@@ -64,6 +134,26 @@ class ExerciseModelTests(TestCase):
         average_reps = self.exercise.determine_average_reps()
         self.assertEqual(average_reps, 10)
 
+    def test_exercise_names_are_unique_per_session_ignoring_case(self):
+        """
+        Test that a duplicate exercise name in a session raises a ValidationError,
+        while another session may reuse the name and slug.
+        """
+        with self.assertRaisesMessage(ValidationError, "A similar exercise to 'SQUATS' already exists."):
+            Exercise.objects.create(name="SQUATS", session=self.session, user=self.user1)
+
+        other_session = Session.objects.create(name="Leg Day", user=self.user1)
+        other = Exercise.objects.create(name="Squats", session=other_session, user=self.user1)
+        self.assertEqual(other.slug, self.exercise.slug)
+
+    def test_duplicate_exercise_form_shows_error(self):
+        """
+        Test that the exercises page shows the duplicate name error on the form.
+        """
+        self.client.force_login(self.user1)
+        response = self.client.post(f'/sessions/{self.session.slug}/', {'name': 'squats'})
+        self.assertContains(response, "A similar exercise to &#x27;squats&#x27; already exists.")
+
     def test_user_cannot_access_other_users_exercise(self):
         """
         Test that user2 cannot access exercises created by user1.
@@ -82,6 +172,48 @@ class ExerciseModelTests(TestCase):
         # Total reps = 10 + 15 + 20 = 45; Number of lines = 3
         self.assertEqual(average_reps, 15)  # 45 / 3 = 15
 
+    def test_get_stats_uses_one_query(self):
+        """
+        Test that all exercise statistics are computed in a single aggregate query.
+        """
+        Line.objects.create(exercise=self.exercise, weight=100, reps=10, user=self.user1)
+        Line.objects.create(exercise=self.exercise, weight=150, reps=5, user=self.user1)
+
+        with self.assertNumQueries(1):
+            stats = self.exercise.get_stats()
+
+        self.assertEqual(stats['average_reps'], 7.5)
+        self.assertEqual(stats['total_volume'], Decimal('1750'))  # 100 * 10 + 150 * 5
+        self.assertEqual(stats['best_weight'], Decimal('150'))
+        self.assertEqual(stats['set_count'], 2)
+        self.assertIsNotNone(stats['last_performed'])
+
+    def test_get_stats_with_no_lines(self):
+        """
+        Test the statistics of an exercise without lines.
+        """
+        stats = self.exercise.get_stats()
+        self.assertEqual(stats['set_count'], 0)
+        self.assertIsNone(stats['total_volume'])
+
+    def test_with_stats_annotates_queryset(self):
+        """
+        Test that with_stats annotates every exercise in one query.
+        """
+        bench = Exercise.objects.create(name="Bench", session=self.session, user=self.user1)
+        Line.objects.create(exercise=self.exercise, weight=100, reps=10, user=self.user1)
+        Line.objects.create(exercise=bench, weight=60, reps=8, user=self.user1)
+        Line.objects.create(exercise=bench, weight=70, reps=6, user=self.user1)
+
+        with self.assertNumQueries(1):
+            exercises = {exercise.name: exercise for exercise in Exercise.objects.filter(session=self.session).with_stats()}
+
+        self.assertEqual(exercises["Squats"].set_count, 1)
+        self.assertEqual(exercises["Bench"].set_count, 2)
+        self.assertEqual(exercises["Bench"].average_reps, 7)
+        self.assertEqual(exercises["Bench"].total_volume, Decimal('900'))  # 60 * 8 + 70 * 6
+        self.assertEqual(exercises["Bench"].best_weight, Decimal('70'))
+
 
 class LineModelTests(TestCase):
     """
@@ -102,3 +234,1907 @@ class LineModelTests(TestCase):
         Test that user2 cannot access lines created by user1.
         """
         self.assertFalse(self.user2.lines.filter(id=self.line.id).exists())
+
+    def test_weight_and_reps_have_lower_bounds(self):
+        """
+        Test that a negative weight and fewer than one rep are rejected by the model and so by the line form.
+        """
+        for weight, reps, field in [(-1, 10, 'weight'), (100, 0, 'reps')]:
+            with self.subTest(field=field):
+                with self.assertRaises(ValidationError) as caught:
+                    Line(exercise=self.exercise, weight=weight, reps=reps, user=self.user1).full_clean()
+                self.assertEqual(list(caught.exception.message_dict), [field])
+                self.assertIn(field, LineForm(data={'weight': weight, 'reps': reps}).errors)
+
+        self.assertTrue(LineForm(data={'weight': 0, 'reps': 1}).is_valid())
+
+
+class LinePaginationTests(TestCase):
+    """
+    Test cases for keyset pagination of lines.
+    """
+    def setUp(self):
+        """
+        Set up an exercise with five lines, two of them sharing the same date.
+        """
+        self.user1 = User.objects.create_user(username="testuser1", password="testpass1")
+        self.session = Session.objects.create(name="Strength Training", user=self.user1)
+        self.exercise = Exercise.objects.create(name="Squats", session=self.session, user=self.user1)
+        self.lines = [Line.objects.create(exercise=self.exercise, weight=100, reps=reps, user=self.user1) for reps in range(1, 6)]
+        Line.objects.filter(id__in=[self.lines[1].id, self.lines[2].id]).update(date=self.lines[1].date)
+
+    def test_pages_are_newest_first_without_overlap(self):
+        """
+        Test that walking the cursors returns every line once, newest first.
+        """
+        app_user = AppUser(self.user1)
+        seen = []
+        cursor = None
+        while True:
+            page = app_user.get_lines_page_for_exercise(self.exercise.slug, cursor, page_size=2)
+            seen.extend(page.lines)
+            if not page.has_more:
+                break
+            cursor = page.next_cursor
+
+        self.assertEqual([line.reps for line in seen], [5, 4, 3, 2, 1])
+
+    def test_pages_do_not_use_offset(self):
+        """
+        Test that a deep page is fetched with a range condition rather than OFFSET.
+        """
+        first_page = paginate_lines(Line.objects.filter(exercise=self.exercise), page_size=2)
+        with CaptureQueriesContext(connection) as queries:
+            paginate_lines(Line.objects.filter(exercise=self.exercise), first_page.next_cursor, page_size=2)
+
+        self.assertNotIn('OFFSET', queries.captured_queries[0]['sql'])
+
+    def test_invalid_cursor_returns_first_page(self):
+        """
+        Test that a malformed cursor falls back to the newest page.
+        """
+        page = AppUser(self.user1).get_user_lines_page('not-a-cursor', page_size=2)
+        self.assertEqual([line.reps for line in page.lines], [5, 4])
+
+    def test_lines_view_links_to_older_lines(self):
+        """
+        Test that the lines page shows the newest page and a link to older lines.
+        """
+        Line.objects.bulk_create([Line(exercise=self.exercise, weight=50, reps=1, user=self.user1) for _ in range(60)])
+        self.client.force_login(self.user1)
+
+        response = self.client.get(f'/sessions/{self.session.slug}/{self.exercise.slug}/')
+        self.assertEqual(len(response.context['lines']), 50)
+        self.assertContains(response, 'Load older')
+
+        response = self.client.get(f'/sessions/{self.session.slug}/{self.exercise.slug}/', {'cursor': response.context['next_cursor']})
+        self.assertEqual(len(response.context['lines']), 15)
+        self.assertIsNone(response.context['next_cursor'])
+
+
+class PageQueryCountTests(TestCase):
+    """
+    Test cases checking that each page resolves its objects once.
+    """
+    # Django's session and user lookups made by the authentication middleware.
+    AUTH_QUERIES = 2
+
+    def setUp(self):
+        """
+        Set up a logged in user with a session, two exercises and a few lines.
+        """
+        self.user1 = User.objects.create_user(username="testuser1", password="testpass1")
+        self.session = Session.objects.create(name="Strength Training", user=self.user1)
+        self.exercise = Exercise.objects.create(name="Squats", session=self.session, user=self.user1)
+        Exercise.objects.create(name="Bench", session=self.session, user=self.user1)
+        for reps in range(5):
+            Line.objects.create(exercise=self.exercise, weight=100, reps=reps, user=self.user1)
+        self.client.force_login(self.user1)
+
+    def test_exercise_view_resolves_session_once(self):
+        """
+        Test that the exercises page loads the session and the exercises in one query each.
+        """
+        with self.assertNumQueries(self.AUTH_QUERIES + 2):
+            response = self.client.get(f'/sessions/{self.session.slug}/')
+        self.assertEqual(response.status_code, 200)
+
+    def test_lines_view_resolves_chain_once(self):
+        """
+        Test that the lines page loads exercise and session together, then one page of lines
+        and the personal records.
+        """
+        with self.assertNumQueries(self.AUTH_QUERIES + 3):
+            response = self.client.get(f'/sessions/{self.session.slug}/{self.exercise.slug}/')
+        self.assertEqual(response.status_code, 200)
+
+    def test_resolver_returns_same_instances(self):
+        """
+        Test that the view model hands out the same session and exercise instances within a request.
+        """
+        view_model = LinesViewModel(self.user1)
+        exercise = view_model.get_exercise(self.session.slug, self.exercise.slug)
+
+        with self.assertNumQueries(0):
+            self.assertIs(view_model.get_exercise(self.session.slug, self.exercise.slug), exercise)
+            self.assertIs(view_model.get_session(self.session.slug), exercise.session)
+
+
+class AsyncViewTests(TestCase):
+    """
+    Test cases for the async page views served through the ASGI handler.
+    """
+    def setUp(self):
+        """
+        Set up a logged in async client with a session, an exercise and a line.
+        """
+        self.user1 = User.objects.create_user(username="testuser1", password="testpass1")
+        self.session = Session.objects.create(name="Strength Training", user=self.user1)
+        self.exercise = Exercise.objects.create(name="Squats", session=self.session, user=self.user1)
+        Line.objects.create(exercise=self.exercise, weight=100, reps=5, user=self.user1)
+        self.async_client.force_login(self.user1)
+
+    def test_page_views_are_async(self):
+        """
+        Test that the page views run on the event loop instead of being adapted to sync.
+        """
+        from .views.home_view import HomeView
+        from .views.sessions_view import SessionsView
+        from .views.exercise_view import ExerciseView
+        from .views.lines_view import LinesView
+        from users.views.login_view import LoginView
+        from users.views.register_view import RegisterView
+        from users.views.logout_view import LogoutView
+
+        for view in (HomeView, SessionsView, ExerciseView, LinesView, LoginView, RegisterView, LogoutView):
+            self.assertTrue(view.view_is_async, view.__name__)
+
+    async def test_pages_render_over_asgi(self):
+        """
+        Test that every page renders through the ASGI handler with the user loaded asynchronously.
+        """
+        for url in ['/', '/sessions/', f'/sessions/{self.session.slug}/', f'/sessions/{self.session.slug}/{self.exercise.slug}/']:
+            response = await self.async_client.get(url)
+            self.assertEqual(response.status_code, 200, url)
+
+        response = await self.async_client.get(f'/sessions/{self.session.slug}/{self.exercise.slug}/')
+        self.assertContains(response, 'Squats')
+
+    async def test_writes_over_asgi(self):
+        """
+        Test that adding and deleting through the async views reaches the database.
+        """
+        lines_url = f'/sessions/{self.session.slug}/{self.exercise.slug}/'
+        response = await self.async_client.post(lines_url, {'weight': '110', 'reps': '3'})
+        self.assertEqual(response.status_code, 302)
+        line = await Line.objects.filter(exercise=self.exercise).order_by('-id').afirst()
+        self.assertEqual(line.reps, 3)
+
+        await self.async_client.post(lines_url, {
+            'delete_line': '', 'line_id': line.id, 'session_slug': self.session.slug, 'exercise_slug': self.exercise.slug,
+        })
+        self.assertFalse(await Line.objects.filter(id=line.id).aexists())
+
+    async def test_anonymous_user_is_redirected_to_login(self):
+        """
+        Test that the async login check still redirects anonymous users.
+        """
+        await self.async_client.alogout()
+        response = await self.async_client.get('/sessions/')
+        self.assertEqual(response.status_code, 302)
+        self.assertIn('/login/', response['Location'])
+
+
+class ExportTests(TestCase):
+    """
+    Test cases for the streaming history export.
+    """
+    def setUp(self):
+        """
+        Set up a user with lines on two days, an exercise without lines and an empty session.
+        """
+        self.user1 = User.objects.create_user(username="testuser1", password="testpass1")
+        self.user2 = User.objects.create_user(username="testuser2", password="testpass2")
+        session = Session.objects.create(name="Strength Training", user=self.user1)
+        squats = Exercise.objects.create(name="Squats", session=session, user=self.user1)
+        Exercise.objects.create(name="Bench", session=session, user=self.user1)
+        Session.objects.create(name="Cardio", user=self.user1)
+        Line.objects.create(exercise=squats, weight=100, reps=5, user=self.user1, date=timezone.make_aware(datetime(2024, 1, 1, 9)))
+        Line.objects.create(exercise=squats, weight=Decimal('102.50'), reps=3, user=self.user1, date=timezone.make_aware(datetime(2024, 1, 2, 9)))
+
+        other = Session.objects.create(name="Other", user=self.user2)
+        Line.objects.create(exercise=Exercise.objects.create(name="Other", session=other, user=self.user2), weight=1, reps=1, user=self.user2)
+        self.client.force_login(self.user1)
+
+    def read_csv(self, response):
+        """
+        Parse a streamed CSV response into a list of rows.
+        """
+        return list(csv.reader(b''.join(response.streaming_content).decode().splitlines()))
+
+    def test_csv_export_streams_everything_the_user_owns(self):
+        """
+        Test that the CSV holds every line oldest first, then the empty exercise and session.
+        """
+        response = self.client.get('/export/')
+
+        self.assertTrue(response.streaming)
+        self.assertEqual(response['Content-Type'], 'text/csv')
+        rows = self.read_csv(response)
+        self.assertEqual(rows[0], ['session', 'exercise', 'date', 'weight', 'reps'])
+        self.assertEqual([row[3:] for row in rows[1:3]], [['100.00', '5'], ['102.50', '3']])
+        self.assertEqual(rows[3:], [['Strength Training', 'Bench', '', '', ''], ['Cardio', '', '', '', '']])
+
+    def test_date_range_limits_lines(self):
+        """
+        Test that start and end are inclusive days and leave out rows without a date.
+        """
+        rows = self.read_csv(self.client.get('/export/?start=2024-01-02&end=2024-01-02'))
+        self.assertEqual(len(rows), 2)
+        self.assertEqual(rows[1][4], '3')
+
+    def test_invalid_parameters_are_rejected(self):
+        """
+        Test that an unknown format or a malformed date returns 400.
+        """
+        self.assertEqual(self.client.get('/export/?format=xml').status_code, 400)
+        self.assertEqual(self.client.get('/export/?start=01/02/2024').status_code, 400)
+
+    async def test_jsonl_export_over_asgi(self):
+        """
+        Test that the JSON Lines export streams through an async iterator under ASGI.
+        """
+        await self.async_client.aforce_login(self.user1)
+        response = await self.async_client.get('/export/?format=jsonl&start=2024-01-01')
+
+        self.assertTrue(response.is_async)
+        records = [json.loads(chunk) async for chunk in response.streaming_content]
+        self.assertEqual(len(records), 2)
+        self.assertEqual(records[0], {
+            'session': 'Strength Training', 'exercise': 'Squats',
+            'date': '2024-01-01T09:00:00+00:00', 'weight': '100.00', 'reps': 5,
+        })
+
+
+class ImportTests(TestCase):
+    """
+    Test cases for importing a training history.
+    """
+    def setUp(self):
+        """
+        Set up a user who already has a session and an exercise.
+        """
+        self.user1 = User.objects.create_user(username="testuser1", password="testpass1")
+        self.session = Session.objects.create(name="Strength Training", user=self.user1)
+        self.exercise = Exercise.objects.create(name="Squats", session=self.session, user=self.user1)
+        self.client.force_login(self.user1)
+
+    def import_csv(self, text, **kwargs):
+        """
+        Import CSV text for the user.
+        """
+        return import_history(self.user1, parse_rows(io.StringIO(text), 'csv'), **kwargs)
+
+    def test_lines_are_imported_with_their_dates(self):
+        """
+        Test that existing sessions and exercises are matched ignoring case, new ones are created with slugs,
+        dates are kept and every line is tracked for sync.
+        """
+        result = self.import_csv(
+            "session,exercise,date,weight,reps\n"
+            "strength training,SQUATS,2024-01-01T09:00:00+00:00,100,5\n"
+            "Strength Training,Front Squat,2024-01-02T09:00:00,80.5,3\n"
+            "Push Day,Bench Press,2024-01-03,60,8\n"
+            "Cardio,,,,\n",
+            batch_size=2,
+        )
+
+        self.assertEqual((result.sessions_created, result.exercises_created, result.lines_created), (2, 2, 3))
+        self.assertEqual(self.exercise.lines.get().date, timezone.make_aware(datetime(2024, 1, 1, 9)))
+        bench = Exercise.objects.get(user=self.user1, slug='bench-press')
+        self.assertEqual(bench.session.slug, 'push-day')
+        self.assertEqual(bench.lines.get().weight, Decimal('60.00'))
+        self.assertTrue(Session.objects.filter(user=self.user1, slug='cardio').exists())
+        self.assertEqual(len(get_changes_since(self.user1)['lines']), 3)
+
+    def test_invalid_records_are_skipped_and_reported(self):
+        """
+        Test that invalid records are reported with their number while the rest are imported.
+        """
+        result = self.import_csv(
+            "session,exercise,date,weight,reps\n"
+            "Strength Training,Squats,2024-01-01,heavy,5\n"
+            "Strength Training,Squats,01/02/2024,100,5\n"
+            ",Squats,2024-01-01,100,5\n"
+            "Strength Training,Squats,2024-01-01,100000,5\n"
+            "Strength Training,Squats,2024-01-01,100,5\n"
+        )
+
+        self.assertEqual(result.lines_created, 1)
+        self.assertEqual([number for number, _ in result.errors], [1, 2, 3, 4])
+        self.assertEqual(self.exercise.lines.count(), 1)
+
+    def test_lines_follow_the_rules_of_the_line_form(self):
+        """
+        Test that imported weights and reps are checked like the add line form, which the raw insert skips.
+        """
+        result = self.import_csv(
+            "session,exercise,date,weight,reps\n"
+            "Strength Training,Squats,2024-01-01,-20,5\n"
+            "Strength Training,Squats,2024-01-01,100,0\n"
+            "Strength Training,Squats,2024-01-01,100,99999999999999999999\n"
+            "Strength Training,Squats,2024-01-01,100.125,5\n"
+            "Strength Training,Squats,2024-01-01,0,5\n"
+        )
+
+        self.assertEqual([number for number, _ in result.errors], [1, 2, 3, 4])
+        self.assertTrue(result.errors[0][1].startswith('weight:'))
+        self.assertTrue(result.errors[1][1].startswith('reps:'))
+        form = LineForm({'weight': '-20', 'reps': '0'})
+        self.assertEqual(set(form.errors), {'weight', 'reps'})
+        self.assertEqual(self.exercise.lines.get().weight, 0)
+
+    def test_slug_clashes_are_reported_in_dry_runs_too(self):
+        """
+        Test that a new name whose slug is taken is reported the same way with and without dry_run,
+        and that every inserted line gets its own change log entry.
+        """
+        text = (
+            "session,exercise,date,weight,reps\n"
+            "Strength-Training,Squats,2024-01-01,100,5\n"
+            "Strength Training,Squats!,2024-01-01,100,5\n"
+            "Push Day,Bench,2024-01-01,60,8\n"
+            "Push-Day,Bench,2024-01-01,60,8\n"
+        )
+        dry_run = self.import_csv(text, dry_run=True)
+        result = self.import_csv(text, batch_size=1)
+
+        for outcome in (dry_run, result):
+            self.assertEqual([number for number, _ in outcome.errors], [1, 2, 4])
+            self.assertEqual((outcome.sessions_created, outcome.lines_created), (1, 1))
+        self.assertIn("A similar session to 'Strength-Training' already exists.", dry_run.errors[0][1])
+        self.assertEqual(Change.objects.filter(model=Change.LINE).count(), 1)
+
+    def test_names_are_folded_like_the_unique_constraints(self):
+        """
+        Test that on SQLite only ASCII letters are folded when matching names, as LOWER() does,
+        so a name the database would tell apart is treated as a new one, and that an older
+        SQLite without RETURNING is refused.
+        """
+        Session.objects.create(name="Élan", user=self.user1)
+        result = self.import_csv(
+            "session,exercise,date,weight,reps\n"
+            "ÉLAN,Rowing,2024-01-01,50,10\n"
+            "élan,Rowing,2024-01-01,50,10\n"
+        )
+
+        self.assertEqual((result.sessions_created, result.lines_created), (0, 1))
+        self.assertEqual(result.errors, [(2, "A similar session to 'élan' already exists.")])
+        with mock.patch.object(type(connection.features), 'can_return_rows_from_bulk_insert', False):
+            self.assertRaises(ImproperlyConfigured, check_database_support)
+
+    def test_dry_run_writes_nothing(self):
+        """
+        Test that a dry run counts what would be created without writing it.
+        """
+        with self.assertNumQueries(2):  # Loading the existing sessions and exercises
+            result = import_history(self.user1, parse_rows(io.StringIO(
+                '{"session": "Push Day", "exercise": "Bench", "date": "2024-01-01", "weight": 60, "reps": 8}\n'
+                'not json\n'
+            ), 'jsonl'), dry_run=True)
+
+        self.assertEqual((result.sessions_created, result.exercises_created, result.lines_created, result.error_count), (1, 1, 1, 1))
+        self.assertFalse(Session.objects.filter(name='Push Day').exists())
+
+    def test_exported_history_imports_into_another_account(self):
+        """
+        Test that the export of one user can be uploaded by another.
+        """
+        Line.objects.create(exercise=self.exercise, weight=100, reps=5, user=self.user1)
+        export = b''.join(self.client.get('/export/').streaming_content)
+
+        user2 = User.objects.create_user(username="testuser2", password="testpass2")
+        self.client.force_login(user2)
+        response = self.client.post('/import/', {'file': SimpleUploadedFile('history.csv', export)})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context['result'].lines_created, 1)
+        self.assertEqual(Line.objects.get(user=user2).date, self.exercise.lines.get().date)
+
+    def test_upload_of_unknown_format_is_rejected(self):
+        """
+        Test that the upload form only accepts CSV and JSON Lines files.
+        """
+        response = self.client.post('/import/', {'file': SimpleUploadedFile('history.xlsx', b'data')})
+        self.assertIsNone(response.context['result'])
+        self.assertTrue(response.context['form'].errors)
+
+    def test_import_command(self):
+        """
+        Test that the command imports a JSON Lines file and honours --dry-run.
+        """
+        with tempfile.NamedTemporaryFile('w', suffix='.jsonl', delete=False) as handle:
+            handle.write('{"session": "Strength Training", "exercise": "Squats", "weight": "100", "reps": 5}\n')
+        self.addCleanup(os.remove, handle.name)
+
+        call_command('import_history', 'testuser1', handle.name, dry_run=True, verbosity=0)
+        self.assertEqual(self.exercise.lines.count(), 0)
+        call_command('import_history', 'testuser1', handle.name, verbosity=0)
+        self.assertEqual(self.exercise.lines.count(), 1)
+
+
+class ProgressTests(TestCase):
+    """
+    Test cases for the bucketed progress series.
+    """
+    def setUp(self):
+        """
+        Set up lines on Monday and Tuesday of one week and on a day of the next month.
+        """
+        self.user1 = User.objects.create_user(username="testuser1", password="testpass1")
+        session = Session.objects.create(name="Strength Training", user=self.user1)
+        self.exercise = Exercise.objects.create(name="Squats", session=session, user=self.user1)
+        Exercise.objects.create(name="Bench", session=session, user=self.user1)  # No lines, no series
+        for day, weight, reps in [(1, 100, 5), (1, 110, 3), (2, 120, 1), (40, 90, 10)]:
+            date = timezone.make_aware(datetime(2024, 1, 1, 9)) + timedelta(days=day - 1)
+            Line.objects.create(exercise=self.exercise, weight=weight, reps=reps, user=self.user1, date=date)
+        self.client.force_login(self.user1)
+
+    def test_lines_are_aggregated_per_bucket(self):
+        """
+        Test the max weight, total volume and average reps of each bucket size.
+        """
+        week = get_progress(self.user1, 'week')
+        self.assertEqual([exercise['name'] for exercise in week['exercises']], ['Squats'])
+        self.assertEqual(week['exercises'][0]['series'][0], {
+            'period': date(2024, 1, 1), 'max_weight': Decimal('120.00'), 'total_volume': Decimal('950.00'), 'average_reps': 3.0,
+        })
+
+        days = get_progress(self.user1, 'day')['exercises'][0]['series']
+        self.assertEqual([point['period'] for point in days], [date(2024, 1, 1), date(2024, 1, 2), date(2024, 2, 9)])
+
+        months = get_progress(self.user1, 'month')['exercises'][0]['series']
+        self.assertEqual([(point['period'], point['max_weight']) for point in months], [(date(2024, 1, 1), 120), (date(2024, 2, 1), 90)])
+
+    def test_series_is_cached_until_data_changes(self):
+        """
+        Test that a series costs three queries once, then none until a line is added.
+        """
+        with self.assertNumQueries(3):
+            get_progress(self.user1, 'month')
+        with self.assertNumQueries(0):
+            get_progress(self.user1, 'month')
+
+        Line.objects.create(exercise=self.exercise, weight=200, reps=1, user=self.user1, date=timezone.make_aware(datetime(2024, 2, 10)))
+        self.assertEqual(get_progress(self.user1, 'month')['exercises'][0]['series'][-1]['max_weight'], 200)
+
+    def test_statistics_page_and_api(self):
+        """
+        Test that the statistics page and the API serve the series and reject unknown buckets.
+        """
+        response = self.client.get('/statistics/?bucket=month')
+        self.assertContains(response, 'Squats')
+        self.assertContains(response, 'id="progress-data"')
+        self.assertEqual(self.client.get('/statistics/?bucket=year').status_code, 400)
+
+        payload = self.client.get('/api/v1/progress/?bucket=day').json()
+        self.assertEqual(payload['exercises'][0]['series'][0]['period'], '2024-01-01')
+        self.assertEqual(self.client.get('/api/v1/progress/?bucket=year').status_code, 400)
+
+
+@skipUnless(ANALYTICS_AVAILABLE, "NumPy is not installed")
+class AnalyticsTests(TestCase):
+    """
+    Test cases for the NumPy training analytics.
+    """
+    def setUp(self):
+        """
+        Set up lines on Monday and Tuesday of one week and on a Friday 39 days later.
+        """
+        self.user1 = User.objects.create_user(username="testuser1", password="testpass1")
+        session = Session.objects.create(name="Strength Training", user=self.user1)
+        self.exercise = Exercise.objects.create(name="Squats", session=session, user=self.user1)
+        for day, weight, reps in [(1, 100, 5), (1, 110, 3), (2, 120, 1), (40, 90, 10)]:
+            date = timezone.make_aware(datetime(2024, 1, 1, 9)) + timedelta(days=day - 1)
+            Line.objects.create(exercise=self.exercise, weight=weight, reps=reps, user=self.user1, date=date)
+        self.client.force_login(self.user1)
+
+    def test_one_rep_max_formulas(self):
+        """
+        Test Epley and Brzycki, including singles and sets the formulas cannot estimate.
+        """
+        import numpy as np
+        weights = np.array([100.0, 120.0, 100.0, 0.0, 50.0])
+        reps = np.array([5, 1, 0, 5, 40])
+
+        self.assertEqual(np.round(epley(weights, reps), 2)[:2].tolist(), [116.67, 120.0])
+        self.assertTrue(np.isnan(epley(weights, reps)[2:4]).all())
+        self.assertEqual(np.round(brzycki(weights, reps), 2)[:2].tolist(), [112.5, 120.0])
+        self.assertTrue(np.isnan(brzycki(weights, reps)[2:]).all())
+
+    def test_analytics_of_a_history(self):
+        """
+        Test the best estimates, intensity, weekly volume and workload ratio of the seeded lines.
+        """
+        with self.assertNumQueries(2):
+            analytics = get_analytics(self.user1)
+        with self.assertNumQueries(0):
+            get_analytics(self.user1)
+
+        squats = analytics['exercises'][0]
+        self.assertEqual((squats['name'], squats['epley_1rm'], squats['brzycki_1rm'], squats['intensity']), ('Squats', 121.0, 120.0, 0.74))
+        self.assertEqual(squats['weekly_volume'], [
+            {'week': date(2024, 1, 1), 'volume': 950.0}, {'week': date(2024, 2, 5), 'volume': 900.0},
+        ])
+
+        workload = analytics['workload']
+        self.assertEqual(len(workload['series']), 40)
+        self.assertIsNone(workload['series'][26]['ratio'])  # Less than 28 days of history
+        self.assertEqual((workload['acute'], workload['chronic'], workload['ratio']), (128.57, 32.14, 4.0))
+
+    def test_days_and_weeks_follow_the_current_time_zone(self):
+        """
+        Test that lines are bucketed in the current time zone, like the progress series, across a DST change.
+        """
+        Line.objects.create(exercise=self.exercise, weight=50, reps=10, user=self.user1, date=datetime(2024, 3, 10, 12, tzinfo=dt_timezone.utc))
+        with timezone.override('America/New_York'):
+            columns = load_line_columns(self.user1)
+            analytics = _load_analytics(self.user1)
+
+        self.assertEqual(str(columns.dates[0]), '2024-01-01T04:00:00.000000')
+        self.assertEqual(str(columns.dates[-1]), '2024-03-10T08:00:00.000000')  # EDT since 07:00 UTC that day
+        self.assertEqual(analytics['exercises'][0]['weekly_volume'][-1], {'week': date(2024, 3, 4), 'volume': 500.0})
+
+    def test_statistics_page_and_api(self):
+        """
+        Test that the statistics page and the API serve the analytics, and the API answers 501 without NumPy.
+        """
+        response = self.client.get('/statistics/')
+        self.assertContains(response, 'Training Load')
+        self.assertContains(response, 'id="analytics-data"')
+
+        payload = self.client.get('/api/v1/analytics/').json()
+        self.assertEqual(payload['exercises'][0]['weekly_volume'][0]['week'], '2024-01-01')
+        with mock.patch('base.api.analytics_api_view.ANALYTICS_AVAILABLE', False):
+            self.assertEqual(self.client.get('/api/v1/analytics/').status_code, 501)
+
+
+class PersonalRecordTests(TestCase):
+    """
+    Test cases for the incrementally maintained personal records.
+    """
+    def setUp(self):
+        """
+        Set up a logged in user with a session and an exercise.
+        """
+        self.user1 = User.objects.create_user(username="testuser1", password="testpass1")
+        self.session = Session.objects.create(name="Strength Training", user=self.user1)
+        self.exercise = Exercise.objects.create(name="Squats", session=self.session, user=self.user1)
+        self.client.force_login(self.user1)
+
+    def add(self, weight, reps):
+        """
+        Create a line of the exercise.
+        """
+        return Line.objects.create(exercise=self.exercise, weight=weight, reps=reps, user=self.user1)
+
+    def records(self):
+        """
+        Return the exercise's records as {reps: (weight, line id)}.
+        """
+        return {record.reps: (record.weight, record.line_id) for record in self.exercise.personal_records.all()}
+
+    def test_saved_lines_update_their_slot(self):
+        """
+        Test that a heavier line takes the record of its reps, while a lighter or equal one does not.
+        """
+        first = self.add(100, 5)
+        self.add(90, 5)
+        self.add(100, 5)  # A tie keeps the first line
+        triple = self.add(120, 3)
+        self.assertEqual(self.records(), {5: (100, first.id), 3: (120, triple.id)})
+
+        heavier = self.add(105, 5)
+        self.assertEqual(self.records()[5], (105, heavier.id))
+
+    def test_deleting_the_record_line_recomputes_its_slot(self):
+        """
+        Test that deleting the record holder promotes the next best line and deleting the last line clears the slot.
+        """
+        runner_up = self.add(100, 5)
+        record = self.add(110, 5)
+        other = self.add(50, 8)
+
+        runner_up_of_other = self.add(40, 8)
+        runner_up_of_other.delete()  # Not the record, the slot is left alone
+        self.assertEqual(self.records()[8], (50, other.id))
+
+        record.delete()
+        self.assertEqual(self.records()[5], (100, runner_up.id))
+        runner_up.delete()
+        self.assertNotIn(5, self.records())
+
+    def test_editing_the_record_line_recomputes_its_slot(self):
+        """
+        Test that lowering the weight of the record holder gives the record back to the best line.
+        """
+        runner_up = self.add(100, 5)
+        record = self.add(110, 5)
+
+        record.weight = 90
+        record.save()
+        self.assertEqual(self.records()[5], (100, runner_up.id))
+
+        record.reps = 3
+        record.save()
+        self.assertEqual(self.records(), {5: (100, runner_up.id), 3: (90, record.id)})
+
+    def test_bulk_and_imported_lines_match_a_rebuild(self):
+        """
+        Test that lines from the bulk view and the importer leave the same records as a rebuild from scratch.
+        """
+        self.add(100, 5)
+        self.client.post(
+            f'/sessions/{self.session.slug}/lines/bulk/',
+            json.dumps({'lines': [{'exercise': self.exercise.slug, 'weight': weight, 'reps': 5} for weight in ('90', '130', '120')]}),
+            content_type='application/json',
+        )
+        import_history(self.user1, parse_rows(io.StringIO(
+            "session,exercise,date,weight,reps\n"
+            "Strength Training,Squats,2024-01-01,140,3\n"
+            "Strength Training,Squats,2024-01-02,135,3\n"
+            "Strength Training,Deadlift,2024-01-02,180,1\n"
+        ), 'csv'))
+
+        incremental = {(record.exercise_id, record.reps): (record.weight, record.line_id) for record in PersonalRecord.objects.all()}
+        self.assertEqual(self.records()[5][0], 130)
+        self.assertEqual(self.records()[3][0], 140)
+
+        PersonalRecord.objects.all().delete()
+        self.assertEqual(rebuild_records(), 3)
+        rebuilt = {(record.exercise_id, record.reps): (record.weight, record.line_id) for record in PersonalRecord.objects.all()}
+        self.assertEqual(incremental, rebuilt)
+
+    def test_bulk_merge_never_lowers_a_record(self):
+        """
+        Test that a batch merged after a heavier record was written leaves it alone, in a single
+        statement that does not read the records first.
+        """
+        record = self.add(150, 5)
+        lighter, heavier = Line.objects.bulk_create([
+            Line(exercise=self.exercise, weight=Decimal('130'), reps=5, user=self.user1),
+            Line(exercise=self.exercise, weight=Decimal('80'), reps=12, user=self.user1),
+        ])
+
+        with CaptureQueriesContext(connection) as queries:
+            record_lines([lighter, heavier])
+        self.assertEqual(len(queries), 1)
+        self.assertEqual(self.records(), {5: (150, record.id), 12: (80, heavier.id)})
+
+        heaviest = Line.objects.bulk_create([Line(exercise=self.exercise, weight=Decimal('160'), reps=5, user=self.user1)])
+        record_lines(heaviest)
+        self.assertEqual(self.records()[5], (160, heaviest[0].id))
+
+    def test_rebuild_command(self):
+        """
+        Test that the command restores lost records, for every user or for one.
+        """
+        line = self.add(100, 5)
+        PersonalRecord.objects.all().delete()
+
+        call_command('rebuild_personal_records', user='testuser1', stdout=io.StringIO())
+        self.assertEqual(self.records(), {5: (100, line.id)})
+        call_command('rebuild_personal_records', stdout=io.StringIO())
+        self.assertEqual(self.records(), {5: (100, line.id)})
+
+    def test_records_on_lines_and_statistics_pages(self):
+        """
+        Test that the lines page, the statistics page and the progress API show the records.
+        """
+        self.add(100, 5)
+        self.add(120, 3)
+
+        response = self.client.get(f'/sessions/{self.session.slug}/{self.exercise.slug}/')
+        self.assertContains(response, 'Personal Records')
+        self.assertContains(response, 'class="record-badge"', count=2)
+        self.assertEqual([record.reps for record in response.context['records']], [3, 5])
+
+        self.assertContains(self.client.get('/statistics/'), '3 x 120.00')
+        records = self.client.get('/api/v1/progress/').json()['exercises'][0]['records']
+        self.assertEqual([(record['reps'], record['weight']) for record in records], [(3, '120.00'), (5, '100.00')])
+
+
+class DeletionTests(TestCase):
+    """
+    Test cases for the set-based and soft deletes of sessions and exercises.
+    """
+    def setUp(self):
+        """
+        Set up a logged in user with a session holding two exercises with lines.
+        """
+        self.user1 = User.objects.create_user(username="testuser1", password="testpass1")
+        self.session = Session.objects.create(name="Strength Training", user=self.user1)
+        self.squats = Exercise.objects.create(name="Squats", session=self.session, user=self.user1)
+        self.bench = Exercise.objects.create(name="Bench", session=self.session, user=self.user1)
+        self.lines = [Line.objects.create(exercise=exercise, weight=100, reps=5, user=self.user1) for exercise in (self.squats, self.bench)]
+        self.client.force_login(self.user1)
+
+    def add_lines(self, count):
+        """
+        Add count lines to the squats.
+        """
+        Line.objects.bulk_create(Line(exercise=self.squats, weight=60, reps=reps, user=self.user1) for reps in range(count))
+
+    def tombstones(self, cursor):
+        """
+        Return the deleted ids in the change log after cursor.
+        """
+        return get_changes_since(self.user1, cursor)['deleted']
+
+    def test_session_delete_removes_everything_and_records_tombstones(self):
+        """
+        Test that deleting a session removes its exercises, lines and records and syncs tombstones for all of them.
+        """
+        cursor = get_changes_since(self.user1)['cursor']
+        self.client.post('/sessions/', {'delete_session': '', 'session_slug': self.session.slug})
+
+        self.assertFalse(Session.all_objects.exists())
+        self.assertFalse(Exercise.all_objects.exists())
+        self.assertFalse(Line.objects.exists())
+        self.assertFalse(PersonalRecord.objects.exists())
+        self.assertEqual(self.tombstones(cursor), {
+            'sessions': [self.session.id],
+            'exercises': sorted([self.squats.id, self.bench.id]),
+            'lines': sorted(line.id for line in self.lines),
+        })
+
+    def test_delete_runs_constant_queries(self):
+        """
+        Test that the number of queries of a delete does not grow with the number of lines.
+        """
+        other = Session.objects.create(name="Cardio", user=self.user1)
+        Exercise.objects.create(name="Rowing", session=other, user=self.user1)
+        with CaptureQueriesContext(connection) as small:
+            delete_session(other)
+
+        self.add_lines(200)
+        with CaptureQueriesContext(connection) as large:
+            delete_session(self.session)
+
+        self.assertEqual(len(small), len(large))
+        self.assertEqual(Change.objects.filter(deleted=True, model=Change.LINE).count(), 202)
+
+    def test_exercise_delete_keeps_the_rest_of_the_session(self):
+        """
+        Test that deleting an exercise leaves the other exercises and their records alone and bumps the data version.
+        """
+        self.assertEqual(self.client.get('/sessions/').status_code, 200)
+        hits = listing_cache.stats()['hits']
+        delete_exercise(self.squats)
+
+        self.assertEqual(list(Exercise.objects.values_list('name', flat=True)), ["Bench"])
+        self.assertEqual(list(Line.objects.all()), [self.lines[1]])
+        self.assertEqual(list(PersonalRecord.objects.values_list('exercise', flat=True)), [self.bench.id])
+        self.client.get('/sessions/')
+        self.assertEqual(listing_cache.stats()['hits'], hits)  # The cached listing was dropped
+
+    def test_soft_delete_hides_rows_until_purged(self):
+        """
+        Test that a soft-deleted session disappears at once, frees its name, and is removed by the purge command.
+        """
+        cursor = get_changes_since(self.user1)['cursor']
+        delete_session(self.session, soft=True)
+
+        self.assertFalse(Session.objects.exists())
+        self.assertFalse(Exercise.objects.exists())
+        self.assertFalse(AppUser(self.user1).get_user_lines().exists())
+        self.assertFalse(PersonalRecord.objects.exists())
+        self.assertEqual(len(self.tombstones(cursor)['lines']), 2)
+        self.assertEqual(Line.objects.count(), 2)  # Still on disk
+
+        Session.objects.create(name="strength training", user=self.user1)  # The name can be reused
+        call_command('purge_deleted', stdout=io.StringIO())
+
+        self.assertEqual(Session.all_objects.count(), 1)
+        self.assertFalse(Exercise.all_objects.exists())
+        self.assertFalse(Line.objects.exists())
+
+    def test_stale_instance_does_not_bring_a_deleted_exercise_back(self):
+        """
+        Test that saving an instance loaded before a soft delete keeps the row deleted, and the
+        session then counts as empty in the export.
+        """
+        stale = Exercise.objects.get(id=self.bench.id)
+        delete_exercise(self.squats, soft=True)
+        delete_exercise(self.bench, soft=True)
+
+        stale.name = "Bench Press"
+        stale.save()
+
+        self.assertIsNotNone(Exercise.all_objects.get(id=self.bench.id).deleted_at)
+        self.assertEqual(list(export_rows(self.user1).empty[1]), [("Strength Training",)])
+
+    @override_settings(SOFT_DELETE=True)
+    def test_soft_delete_setting_and_purge_age(self):
+        """
+        Test that SOFT_DELETE makes the views soft-delete and that the purge leaves recent deletions alone.
+        """
+        self.client.post(f'/sessions/{self.session.slug}/', {'delete_exercise': '', 'exercise_slug': self.squats.slug, 'session_slug': self.session.slug})
+        self.assertIsNotNone(Exercise.all_objects.get(id=self.squats.id).deleted_at)
+
+        self.assertEqual(purge_deleted(timedelta(hours=1)), (0, 0))
+        delete_session(self.session)
+        self.assertEqual(purge_deleted(), (1, 2))
+        self.assertFalse(Line.objects.exists())
+
+
+class FragmentCacheTests(TestCase):
+    """
+    Test cases for the versioned table fragments of the sessions, exercises and lines pages.
+    """
+    def setUp(self):
+        """
+        Set up a logged in user with a session holding two exercises, one with a line.
+        """
+        self.user1 = User.objects.create_user(username="testuser1", password="testpass1")
+        self.session = Session.objects.create(name="Strength Training", user=self.user1)
+        self.squats = Exercise.objects.create(name="Squats", session=self.session, user=self.user1)
+        self.bench = Exercise.objects.create(name="Bench", session=self.session, user=self.user1)
+        self.line = Line.objects.create(exercise=self.squats, weight=100, reps=5, user=self.user1)
+        self.url = f'/sessions/{self.session.slug}/{self.squats.slug}/'
+        self.client.force_login(self.user1)
+
+    def test_writes_bump_only_their_own_version(self):
+        """
+        Test that a line bumps its exercise's lines version but not another exercise's, and an exercise its session's only.
+        """
+        other = Session.objects.create(name="Cardio", user=self.user1)
+        squats, bench = get_object_version(LINES_SCOPE, self.squats.id), get_object_version(LINES_SCOPE, self.bench.id)
+        exercises, other_exercises = get_object_version(EXERCISES_SCOPE, self.session.id), get_object_version(EXERCISES_SCOPE, other.id)
+
+        Line.objects.create(exercise=self.squats, weight=110, reps=5, user=self.user1)
+        self.assertNotEqual(get_object_version(LINES_SCOPE, self.squats.id), squats)
+        self.assertEqual(get_object_version(LINES_SCOPE, self.bench.id), bench)
+        self.assertNotEqual(get_object_version(EXERCISES_SCOPE, self.session.id), exercises)  # Its counters are shown
+
+        exercises = get_object_version(EXERCISES_SCOPE, self.session.id)
+        delete_exercise(self.bench)
+        self.assertNotEqual(get_object_version(EXERCISES_SCOPE, self.session.id), exercises)
+        self.assertEqual(get_object_version(EXERCISES_SCOPE, other.id), other_exercises)
+
+    def test_cached_rows_are_replaced_after_a_write(self):
+        """
+        Test that the lines table is served from the cache until a line is added or imported.
+        """
+        row = '<td class="main-section">100.00 <span class="record-badge">'
+        self.assertContains(self.client.get(self.url), row)
+        Line.objects.filter(id=self.line.id).update(weight=105)  # Sends no signals, so no version changes
+        bump_data_version(self.user1.id)  # The listing is reloaded, the fragment is not
+        self.assertContains(self.client.get(self.url), row)
+
+        self.client.post(self.url, {'weight': 110, 'reps': 5})
+        response = self.client.get(self.url)
+        self.assertContains(response, 'name="line_id"', count=2)
+        self.assertContains(response, '<td class="main-section">105.00</td>')
+
+        import_history(self.user1, [{'session': self.session.name, 'exercise': self.squats.name, 'weight': '90', 'reps': '8'}])
+        self.assertContains(self.client.get(self.url), 'name="line_id"', count=3)
+
+    def test_one_csrf_token_per_table(self):
+        """
+        Test that each page has one token for its delete form, whatever the number of rows, besides the add and logout forms.
+        """
+        Line.objects.create(exercise=self.squats, weight=110, reps=5, user=self.user1)
+        for url in ('/sessions/', f'/sessions/{self.session.slug}/', self.url):
+            self.assertContains(self.client.get(url), 'csrfmiddlewaretoken', count=3)
+
+    def test_table_forms_delete_the_submitted_row(self):
+        """
+        Test that the single table forms delete the row whose button was pressed, with CSRF checks on.
+        """
+        client = self.client_class(enforce_csrf_checks=True)
+        client.force_login(self.user1)
+        response = client.get(self.url)
+        token = response.context['csrf_token']
+
+        response = client.post(self.url, {
+            'csrfmiddlewaretoken': token, 'delete_line': 'true', 'line_id': self.line.id,
+            'session_slug': self.session.slug, 'exercise_slug': self.squats.slug,
+        })
+        self.assertEqual(response.status_code, 302)
+        self.assertFalse(Line.objects.exists())
+
+        client.post(f'/sessions/{self.session.slug}/', {
+            'csrfmiddlewaretoken': token, 'delete_exercise': 'true', 'session_slug': self.session.slug, 'exercise_slug': self.bench.slug,
+        })
+        self.assertEqual(list(Exercise.objects.values_list('name', flat=True)), ["Squats"])
+        self.assertNotContains(client.get(f'/sessions/{self.session.slug}/'), 'value="bench"')
+
+
+class PartialResponseTests(TestCase):
+    """
+    Test cases for the partial responses of the add and delete forms.
+    """
+    def setUp(self):
+        """
+        Set up a logged in user with a session, an exercise and a line.
+        """
+        self.user1 = User.objects.create_user(username="testuser1", password="testpass1")
+        self.session = Session.objects.create(name="Strength Training", user=self.user1)
+        self.exercise = Exercise.objects.create(name="Squats", session=self.session, user=self.user1)
+        self.line = Line.objects.create(exercise=self.exercise, weight=100, reps=5, user=self.user1)
+        self.lines_url = f'/sessions/{self.session.slug}/{self.exercise.slug}/'
+        self.client.force_login(self.user1)
+
+    def post(self, url, data, mode):
+        """
+        POST a form asking for a partial response.
+        """
+        return self.client.post(url, data, headers={'X-Partial': mode})
+
+    def test_added_line_returns_its_row_or_a_json_diff(self):
+        """
+        Test that adding a line returns only its row, or its JSON row with the record holders, within the view's budget.
+        """
+        with query_budget('LinesView.post'):
+            response = self.post(self.lines_url, {'weight': '110', 'reps': '5'}, 'row')
+        line = Line.objects.latest('id')
+        self.assertEqual(response.status_code, 201)
+        self.assertContains(response, f'<tr id="line-{line.id}">', status_code=201)
+        self.assertContains(response, 'class="record-badge"', status_code=201)
+        self.assertNotContains(response, '<html', status_code=201)
+
+        response = self.post(self.lines_url, {'weight': '90', 'reps': '8'}, 'json')
+        body = response.json()
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual([(row['weight'], row['reps']) for row in body['added']], [('90.00', 8)])
+        self.assertEqual(body['record_line_ids'], [line.id, body['added'][0]['id']])
+
+    def test_deleted_line_returns_no_content_or_a_json_diff(self):
+        """
+        Test that deleting a line returns 204 for a row client and the removed id and record holders for a JSON one.
+        """
+        runner_up = Line.objects.create(exercise=self.exercise, weight=90, reps=5, user=self.user1)
+        data = {'delete_line': 'true', 'session_slug': self.session.slug, 'exercise_slug': self.exercise.slug}
+
+        response = self.post(self.lines_url, {**data, 'line_id': self.line.id}, 'json')
+        self.assertEqual(response.json(), {'removed': [{'id': self.line.id}], 'record_line_ids': [runner_up.id]})
+
+        response = self.post(self.lines_url, {**data, 'line_id': runner_up.id}, 'row')
+        self.assertEqual(response.status_code, 204)
+        self.assertFalse(Line.objects.exists())
+
+    def test_invalid_add_returns_the_errors(self):
+        """
+        Test that an invalid add answers 400 with the form errors instead of the page.
+        """
+        response = self.post(self.lines_url, {'weight': '110', 'reps': 'many'}, 'json')
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('reps', response.json()['errors'])
+
+        response = self.post('/sessions/', {'name': 'strength training'}, 'row')
+        self.assertContains(response, 'errorlist', status_code=400)
+
+    def test_sessions_and_exercises_return_their_rows(self):
+        """
+        Test that sessions and exercises are added and deleted with partial responses too.
+        """
+        response = self.post('/sessions/', {'name': 'Cardio'}, 'row')
+        self.assertContains(response, 'id="session-cardio"', status_code=201)
+        response = self.post('/sessions/', {'delete_session': 'true', 'session_slug': 'cardio'}, 'json')
+        self.assertEqual(response.json()['removed'][0]['slug'], 'cardio')
+
+        exercises_url = f'/sessions/{self.session.slug}/'
+        response = self.post(exercises_url, {'name': 'Bench'}, 'json')
+        self.assertEqual(response.json()['added'][0]['slug'], 'bench')
+        response = self.post(exercises_url, {'delete_exercise': 'true', 'session_slug': self.session.slug, 'exercise_slug': 'bench'}, 'row')
+        self.assertEqual(response.status_code, 204)
+        self.assertEqual(list(Exercise.objects.values_list('slug', flat=True)), ['squats'])
+
+    def test_requests_without_the_header_are_redirected(self):
+        """
+        Test that plain form posts keep the redirect, including an unknown X-Partial value.
+        """
+        self.assertEqual(self.client.post(self.lines_url, {'weight': '110', 'reps': '5'}).status_code, 302)
+        self.assertEqual(self.post('/sessions/', {'name': 'Cardio'}, 'fragment').status_code, 302)
+        self.assertEqual(self.client.post('/sessions/', {'delete_session': 'true', 'session_slug': 'cardio'}).status_code, 302)
+
+
+class CounterTests(TestCase):
+    """
+    Test cases for the denormalised counters of exercises and sessions.
+    """
+    def setUp(self):
+        """
+        Set up a logged in user with a session holding an exercise.
+        """
+        self.user1 = User.objects.create_user(username="testuser1", password="testpass1")
+        self.session = Session.objects.create(name="Strength Training", user=self.user1)
+        self.exercise = Exercise.objects.create(name="Squats", session=self.session, user=self.user1)
+        self.client.force_login(self.user1)
+
+    def counters(self):
+        """
+        Return the stored counters as ((line_count, total_volume, last_performed_at), (exercise_count, last_performed_at)).
+        """
+        exercise = Exercise.all_objects.get(id=self.exercise.id)
+        session = Session.all_objects.get(id=self.session.id)
+        return (exercise.line_count, exercise.total_volume, exercise.last_performed_at), (session.exercise_count, session.last_performed_at)
+
+    def test_lines_move_the_counters(self):
+        """
+        Test that adding and deleting lines moves the counts, the volume and the latest dates.
+        """
+        older = Line.objects.create(exercise=self.exercise, weight=100, reps=5, user=self.user1, date=timezone.now() - timedelta(days=3))
+        newer = Line.objects.create(exercise=self.exercise, weight=80, reps=10, user=self.user1)
+        self.assertEqual(self.counters(), ((2, Decimal('1300'), newer.date), (1, newer.date)))
+
+        newer.delete()
+        self.assertEqual(self.counters(), ((1, Decimal('500'), older.date), (1, older.date)))
+        older.delete()
+        self.assertEqual(self.counters(), ((0, Decimal('0'), None), (1, None)))
+
+    def test_line_moved_to_another_exercise_updates_both(self):
+        """
+        Test that editing a line into an exercise of another session recounts and invalidates the exercise and session it left.
+        """
+        cardio = Session.objects.create(name="Cardio", user=self.user1)
+        rowing = Exercise.objects.create(name="Rowing", session=cardio, user=self.user1)
+        line = Line.objects.create(exercise=self.exercise, weight=100, reps=5, user=self.user1)
+        versions = (get_object_version(LINES_SCOPE, self.exercise.id), get_object_version(EXERCISES_SCOPE, self.session.id))
+
+        line = Line.objects.get(id=line.id)
+        line.exercise = rowing
+        line.save()
+
+        self.assertEqual(self.counters(), ((0, Decimal('0'), None), (1, None)))
+        self.assertEqual(Exercise.objects.get(id=rowing.id).line_count, 1)
+        self.assertEqual(Session.objects.get(id=cardio.id).last_performed_at, line.date)
+        self.assertNotEqual(get_object_version(LINES_SCOPE, self.exercise.id), versions[0])
+        self.assertNotEqual(get_object_version(EXERCISES_SCOPE, self.session.id), versions[1])
+        self.assertEqual(list(PersonalRecord.objects.values_list('exercise_id', flat=True)), [rowing.id])
+
+    def test_bulk_paths_move_the_counters(self):
+        """
+        Test that the bulk lines endpoint and the importer update the counters with the rest of their batch.
+        """
+        bench = Exercise.objects.create(name="Bench", session=self.session, user=self.user1)
+        self.client.post(
+            f'/sessions/{self.session.slug}/lines/bulk/',
+            json.dumps({'lines': [
+                {'exercise': 'squats', 'weight': '100', 'reps': 5},
+                {'exercise': 'squats', 'weight': '110', 'reps': 3},
+                {'exercise': 'bench', 'weight': '60', 'reps': 8},
+            ]}),
+            content_type='application/json',
+        )
+        import_history(self.user1, [
+            {'session': 'Strength Training', 'exercise': 'Squats', 'date': '2026-01-01T10:00:00', 'weight': '50', 'reps': '10'},
+            {'session': 'Cardio', 'exercise': 'Rowing', 'date': '2026-01-02T10:00:00', 'weight': '0', 'reps': '1'},
+        ])
+
+        (line_count, volume, _), (exercise_count, _) = self.counters()
+        self.assertEqual((line_count, volume, exercise_count), (3, Decimal('1330'), 2))
+        self.assertEqual(Exercise.objects.get(id=bench.id).line_count, 1)
+        cardio = Session.objects.get(name="Cardio")
+        self.assertEqual((cardio.exercise_count, cardio.last_performed_at.date()), (1, date(2026, 1, 2)))
+
+    def test_deleting_exercises_updates_the_session(self):
+        """
+        Test that hard and soft deleted exercises leave the session's count and latest date.
+        """
+        bench = Exercise.objects.create(name="Bench", session=self.session, user=self.user1)
+        line = Line.objects.create(exercise=self.exercise, weight=100, reps=5, user=self.user1, date=timezone.now() - timedelta(days=1))
+        Line.objects.create(exercise=bench, weight=60, reps=8, user=self.user1)
+
+        delete_exercise(bench, soft=True)
+        self.assertEqual(self.counters()[1], (1, line.date))
+        delete_exercise(self.exercise)
+        session = Session.objects.get(id=self.session.id)
+        self.assertEqual((session.exercise_count, session.last_performed_at), (0, None))
+
+    def test_saving_a_stale_instance_keeps_the_counters(self):
+        """
+        Test that renaming through an instance loaded before a line was added does not overwrite the counters.
+        """
+        stale = Exercise.objects.get(id=self.exercise.id)
+        Line.objects.create(exercise=self.exercise, weight=100, reps=5, user=self.user1)
+        stale.name = "Back Squats"
+        stale.save()
+
+        exercise = Exercise.objects.get(id=self.exercise.id)
+        self.assertEqual((exercise.name, exercise.line_count), ("Back Squats", 1))
+
+    def test_reconcile_repairs_drift(self):
+        """
+        Test that the reconcile command fixes counters that drifted and leaves correct ones alone.
+        """
+        line = Line.objects.create(exercise=self.exercise, weight=100, reps=5, user=self.user1)
+        Exercise.objects.update(line_count=7, total_volume=1)
+        Session.objects.update(exercise_count=0)
+
+        out = io.StringIO()
+        call_command('reconcile_counters', user='testuser1', stdout=out)
+        self.assertIn("1 exercises and 1 sessions", out.getvalue())
+        self.assertEqual(self.counters(), ((1, Decimal('500'), line.date), (1, line.date)))
+
+        out = io.StringIO()
+        call_command('reconcile_counters', stdout=out)
+        self.assertIn("0 exercises and 0 sessions", out.getvalue())
+
+    def test_listing_pages_show_the_counters(self):
+        """
+        Test that the sessions and exercises pages show the counters within their query budgets.
+        """
+        Line.objects.create(exercise=self.exercise, weight=100, reps=5, user=self.user1)
+        Line.objects.create(exercise=self.exercise, weight=100, reps=5, user=self.user1)
+
+        with query_budget('SessionsView.get'):
+            self.assertContains(self.client.get('/sessions/'), '1 exercise, last trained')
+        with query_budget('ExerciseView.get'):
+            self.assertContains(self.client.get(f'/sessions/{self.session.slug}/'), '2 sets, volume 1000, last trained')
+
+
+class BulkLinesViewTests(TestCase):
+    """
+    Test cases for logging a batch of lines in one request.
+    """
+    def setUp(self):
+        """
+        Set up a logged in user with a session holding two exercises.
+        """
+        self.user1 = User.objects.create_user(username="testuser1", password="testpass1")
+        self.session = Session.objects.create(name="Strength Training", user=self.user1)
+        self.squats = Exercise.objects.create(name="Squats", session=self.session, user=self.user1)
+        self.bench = Exercise.objects.create(name="Bench", session=self.session, user=self.user1)
+        self.url = f'/sessions/{self.session.slug}/lines/bulk/'
+        self.client.force_login(self.user1)
+
+    def post_lines(self, lines):
+        """
+        POST a batch of lines as JSON.
+        """
+        return self.client.post(self.url, json.dumps({'lines': lines}), content_type='application/json')
+
+    def test_valid_rows_are_saved_and_invalid_rows_reported(self):
+        """
+        Test that valid rows are saved while invalid rows come back with their errors.
+        """
+        response = self.post_lines([
+            {'exercise': self.squats.slug, 'weight': '100', 'reps': 5},
+            {'exercise': self.bench.slug, 'weight': '60', 'reps': 'many'},
+            {'exercise': 'deadlift', 'weight': '140', 'reps': 3},
+            {'exercise': self.bench.slug, 'weight': '60', 'reps': 8},
+        ])
+
+        self.assertEqual(response.status_code, 201)
+        body = response.json()
+        self.assertEqual([row['index'] for row in body['created']], [0, 3])
+        self.assertTrue(all(row['id'] for row in body['created']))
+        self.assertEqual([row['index'] for row in body['errors']], [1, 2])
+        self.assertIn('reps', body['errors'][0]['errors'])
+        self.assertIn('exercise', body['errors'][1]['errors'])
+        self.assertEqual(self.squats.lines.count(), 1)
+        self.assertEqual(self.bench.lines.get().user, self.user1)
+
+    def test_non_string_exercise_is_a_row_error(self):
+        """
+        Test that an exercise that is not a slug string is reported for its row, not a server error.
+        """
+        response = self.post_lines([
+            {'exercise': ['squats'], 'weight': '100', 'reps': 5},
+            {'exercise': {}, 'weight': '100', 'reps': 5},
+            {'exercise': self.squats.slug, 'weight': '100', 'reps': 5},
+        ])
+
+        self.assertEqual(response.status_code, 201)
+        body = response.json()
+        self.assertEqual([row['index'] for row in body['created']], [2])
+        self.assertEqual([(row['index'], list(row['errors'])) for row in body['errors']], [(0, ['exercise']), (1, ['exercise'])])
+
+    def test_batch_is_written_with_constant_queries(self):
+        """
+        Test that the number of queries does not grow with the size of the batch.
+        """
+        lines = [{'exercise': self.squats.slug, 'weight': '100', 'reps': reps} for reps in range(1, 26)]
+        with CaptureQueriesContext(connection) as small:
+            self.post_lines(lines[:2])
+        with CaptureQueriesContext(connection) as large:
+            self.post_lines(lines)
+
+        self.assertEqual(len(small), len(large))
+        self.assertEqual(self.squats.lines.count(), 27)
+
+    def test_malformed_body_is_rejected(self):
+        """
+        Test that a body without a lines list is rejected.
+        """
+        response = self.client.post(self.url, 'not json', content_type='application/json')
+        self.assertEqual(response.status_code, 400)
+
+
+class ApiTests(TestCase):
+    """
+    Test cases for the JSON API and its conditional GET support.
+    """
+    def setUp(self):
+        """
+        Set up a logged in user with a session, an exercise and three lines.
+        """
+        self.user1 = User.objects.create_user(username="testuser1", password="testpass1")
+        self.session = Session.objects.create(name="Strength Training", user=self.user1)
+        self.exercise = Exercise.objects.create(name="Squats", session=self.session, user=self.user1)
+        for reps in range(1, 4):
+            Line.objects.create(exercise=self.exercise, weight=100, reps=reps, user=self.user1)
+        self.client.force_login(self.user1)
+
+    def test_list_resources_return_compact_rows(self):
+        """
+        Test that sessions, exercises and lines are listed as compact rows.
+        """
+        sessions = self.client.get('/api/v1/sessions/').json()['sessions']
+        self.assertEqual([session['slug'] for session in sessions], [self.session.slug])
+
+        exercises = self.client.get(f'/api/v1/sessions/{self.session.slug}/exercises/').json()['exercises']
+        self.assertEqual(set(exercises[0]), {'id', 'name', 'slug', 'updated_at'})
+
+        lines = self.client.get(f'/api/v1/sessions/{self.session.slug}/exercises/{self.exercise.slug}/lines/').json()
+        self.assertEqual([line['reps'] for line in lines['lines']], [3, 2, 1])
+        self.assertIsNone(lines['next_cursor'])
+
+    def test_matching_etag_returns_not_modified(self):
+        """
+        Test that a matching If-None-Match is answered with a 304 until the data changes.
+        """
+        response = self.client.get('/api/v1/sessions/')
+        self.assertIn('ETag', response.headers)
+
+        response = self.client.get('/api/v1/sessions/', HTTP_IF_NONE_MATCH=response.headers['ETag'])
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.content, b'')
+
+        Session.objects.create(name="Cardio", user=self.user1)
+        response = self.client.get('/api/v1/sessions/', HTTP_IF_NONE_MATCH=response.headers['ETag'])
+        self.assertEqual(response.status_code, 200)
+
+    def test_deleted_row_is_not_answered_with_not_modified(self):
+        """
+        Test that Last-Modified is the time of the last change, so a listing that lost a row is sent again.
+        """
+        with mock.patch('time.time', return_value=1_700_000_000.5):
+            Session.objects.create(name="Cardio", user=self.user1)
+        with mock.patch('time.time', return_value=1_700_000_010.0):
+            response = self.client.get('/api/v1/sessions/')
+        self.assertEqual(response.headers['Last-Modified'], http_date(1_700_000_000))
+        headers = {'HTTP_IF_NONE_MATCH': response.headers['ETag'], 'HTTP_IF_MODIFIED_SINCE': response.headers['Last-Modified']}
+
+        with mock.patch('time.time', return_value=1_700_000_020.0):
+            Session.objects.get(name="Cardio").delete()
+        for name, value in headers.items():
+            response = self.client.get('/api/v1/sessions/', **{name: value})
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(len(response.json()['sessions']), 1)
+
+    def test_not_modified_is_answered_before_the_view_runs(self):
+        """
+        Test that a 304 costs only the session and user lookups, and that a change in the current
+        second is sent without Last-Modified.
+        """
+        url = f'/api/v1/sessions/{self.session.slug}/exercises/{self.exercise.slug}/lines/'
+        response = self.client.get(url)
+        self.assertNotIn('Last-Modified', response.headers)
+
+        with self.assertNumQueries(2):
+            response = self.client.get(url, HTTP_IF_NONE_MATCH=response.headers['ETag'])
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.headers['Cache-Control'], 'private, no-cache')
+        self.assertNotEqual(self.client.get(url + '?cursor=x').headers['ETag'], response.headers['ETag'])
+
+    def test_unauthenticated_request_is_rejected(self):
+        """
+        Test that the API answers anonymous requests with a 401.
+        """
+        self.client.logout()
+        self.assertEqual(self.client.get('/api/v1/sessions/').status_code, 401)
+
+
+class SyncTests(TestCase):
+    """
+    Test cases for change tracking and delta sync.
+    """
+    def setUp(self):
+        """
+        Set up a user with a session, an exercise and a line, and a second user with their own session.
+        """
+        self.user1 = User.objects.create_user(username="testuser1", password="testpass1")
+        self.user2 = User.objects.create_user(username="testuser2", password="testpass2")
+        self.session = Session.objects.create(name="Strength Training", user=self.user1)
+        self.exercise = Exercise.objects.create(name="Squats", session=self.session, user=self.user1)
+        self.line = Line.objects.create(exercise=self.exercise, weight=100, reps=10, user=self.user1)
+        Session.objects.create(name="Cardio", user=self.user2)
+
+    def test_full_sync_returns_only_own_rows(self):
+        """
+        Test that a sync from cursor 0 returns everything the user owns and nothing else.
+        """
+        delta = get_changes_since(self.user1)
+        self.assertEqual([row['id'] for row in delta['sessions']], [self.session.id])
+        self.assertEqual([row['id'] for row in delta['exercises']], [self.exercise.id])
+        self.assertEqual([row['id'] for row in delta['lines']], [self.line.id])
+        self.assertFalse(delta['has_more'])
+
+    def test_delta_contains_only_new_changes(self):
+        """
+        Test that a sync from the previous cursor returns only what changed since.
+        """
+        cursor = get_changes_since(self.user1)['cursor']
+        new_line = Line.objects.create(exercise=self.exercise, weight=110, reps=8, user=self.user1)
+
+        delta = get_changes_since(self.user1, cursor)
+        self.assertEqual(delta['sessions'], [])
+        self.assertEqual([row['id'] for row in delta['lines']], [new_line.id])
+        self.assertEqual(get_changes_since(self.user1, delta['cursor'])['lines'], [])
+
+    def test_cascading_delete_returns_tombstones(self):
+        """
+        Test that deleting a session sends tombstones for its exercises and lines too.
+        """
+        cursor = get_changes_since(self.user1)['cursor']
+        session_id = self.session.id
+        self.session.delete()
+
+        delta = get_changes_since(self.user1, cursor)
+        self.assertEqual(delta['deleted'], {
+            'sessions': [session_id],
+            'exercises': [self.exercise.id],
+            'lines': [self.line.id],
+        })
+        self.assertEqual(delta['lines'], [])
+
+    def test_deleting_a_user_removes_their_data(self):
+        """
+        Test that deleting a user with sessions, exercises, lines and records leaves nothing of
+        theirs behind, and no change log rows pointing at them.
+        """
+        user_id = self.user1.id
+        self.user1.delete()
+        connection.check_constraints()  # Foreign keys are only checked at commit
+
+        self.assertFalse(User.objects.filter(id=user_id).exists())
+        self.assertFalse(Change.objects.filter(user_id=user_id).exists())
+        self.assertFalse(PersonalRecord.objects.filter(exercise_id=self.exercise.id).exists())
+        self.assertFalse(Line.objects.filter(user_id=user_id).exists())
+        self.assertEqual(Session.objects.filter(user=self.user2).count(), 1)
+
+    def test_bulk_created_lines_are_tracked(self):
+        """
+        Test that lines saved through the bulk endpoint show up in the next sync.
+        """
+        cursor = get_changes_since(self.user1)['cursor']
+        self.client.force_login(self.user1)
+        self.client.post(
+            f'/sessions/{self.session.slug}/lines/bulk/',
+            json.dumps({'lines': [{'exercise': self.exercise.slug, 'weight': '90', 'reps': 12}]}),
+            content_type='application/json',
+        )
+
+        response = self.client.get('/api/v1/sync/', {'cursor': cursor})
+        self.assertEqual([row['reps'] for row in response.json()['lines']], [12])
+
+
+class ListingCacheTests(TestCase):
+    """
+    Test cases for the per-user versioned listing cache.
+    """
+    def setUp(self):
+        """
+        Set up a logged in user with a session, an exercise and a line.
+        """
+        self.user1 = User.objects.create_user(username="testuser1", password="testpass1")
+        self.session = Session.objects.create(name="Strength Training", user=self.user1)
+        self.exercise = Exercise.objects.create(name="Squats", session=self.session, user=self.user1)
+        Line.objects.create(exercise=self.exercise, weight=100, reps=10, user=self.user1)
+        self.client.force_login(self.user1)
+        listing_cache.reset_stats()
+
+    def test_repeated_get_is_served_from_cache(self):
+        """
+        Test that the second GET of each page skips its listing queries.
+        """
+        # The lines page lists the lines and the personal records
+        pages = [('/sessions/', 1), (f'/sessions/{self.session.slug}/', 1), (f'/sessions/{self.session.slug}/{self.exercise.slug}/', 2)]
+        for url, listings in pages:
+            with CaptureQueriesContext(connection) as first:
+                self.client.get(url)
+            with CaptureQueriesContext(connection) as second:
+                self.client.get(url)
+            self.assertEqual(len(second), len(first) - listings)
+
+        self.assertEqual(listing_cache.stats(), {'hits': 4, 'misses': 4})
+
+    def test_write_invalidates_listing(self):
+        """
+        Test that saving or deleting a line is visible on the next GET.
+        """
+        url = f'/sessions/{self.session.slug}/{self.exercise.slug}/'
+        self.assertEqual(len(self.client.get(url).context['lines']), 1)
+
+        line = Line.objects.create(exercise=self.exercise, weight=110, reps=8, user=self.user1)
+        self.assertEqual(len(self.client.get(url).context['lines']), 2)
+
+        line.delete()
+        self.assertEqual(len(self.client.get(url).context['lines']), 1)
+
+    @override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache', 'LOCATION': tempfile.mkdtemp()}})
+    def test_file_based_backend(self):
+        """
+        Test that the listing cache works with the file-based cache backend.
+        """
+        self.client.get('/sessions/')
+        self.client.get('/sessions/')
+        Session.objects.create(name="Cardio", user=self.user1)
+
+        self.assertEqual(len(self.client.get('/sessions/').context['sessions']), 2)
+        self.assertEqual(listing_cache.stats(), {'hits': 1, 'misses': 2})
+
+    def test_several_workers_need_a_shared_cache(self):
+        """
+        Test that several workers are refused with a per-process cache and accepted with a shared one.
+        """
+        with override_settings(WEB_CONCURRENCY=4):
+            with self.assertRaisesMessage(ImproperlyConfigured, 'LocMemCache'):
+                check_cache_is_shared()
+            with override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.redis.RedisCache', 'LOCATION': 'redis://127.0.0.1:6379'}}):
+                check_cache_is_shared()
+        check_cache_is_shared()  # A single worker may keep its versions in local memory
+
+
+    def test_cache_without_atomic_increments_is_refused(self):
+        """
+        Test that the file-based and database caches are refused, even with a single worker.
+        """
+        for backend, location in [
+            ('django.core.cache.backends.filebased.FileBasedCache', tempfile.mkdtemp()),
+            ('django.core.cache.backends.db.DatabaseCache', 'replus_cache'),
+        ]:
+            with self.subTest(backend=backend), override_settings(CACHES={'default': {'BACKEND': backend, 'LOCATION': location}}):
+                with self.assertRaisesMessage(ImproperlyConfigured, 'get followed by a set'):
+                    check_cache_is_shared()
+
+
+class SeedDataTests(TestCase):
+    """
+    Test cases for the seed_data management command.
+    """
+    def test_seed_data_creates_requested_rows(self):
+        """
+        Test that the requested numbers of rows are created and tracked for sync, with their records and counters.
+        """
+        call_command('seed_data', users=2, sessions_per_user=2, exercises_per_session=3, lines_per_exercise=10, seed=1, verbosity=0)
+
+        user = User.objects.get(username='seed0')
+        self.assertEqual(user.sessions.count(), 2)
+        self.assertEqual(user.exercises.count(), 6)
+        self.assertEqual(Line.objects.count(), 120)
+        self.assertEqual(len(get_changes_since(user)['lines']), 60)
+        records = user.personal_records.count()
+        self.assertGreater(records, 0)
+        self.assertEqual(rebuild_records(user), records)  # Already in place
+        self.assertEqual(reconcile_counters(user), (0, 0))
+
+        dates = list(user.lines.order_by('date').values_list('date', flat=True))
+        self.assertLess(dates[0], dates[-1])  # Dates are spread back in time
+
+
+class QueryBudgetTests(TestCase):
+    """
+    Test cases checking every view and AppUser method against its query budget at several data sizes.
+    """
+    SIZES = [1, 4, 12]
+
+    def seed(self, size):
+        """
+        Seed a user with size sessions, size exercises per session and 3 * size lines per exercise.
+        """
+        user = seed_users(1, size, size, 3 * size, prefix=f'budget{size}_')[0]
+        session = user.sessions.order_by('id').first()
+        return user, session, session.exercises.order_by('id').first()
+
+    def test_views_stay_within_budget(self):
+        """
+        Test that no view's query count exceeds its budget or grows with the data.
+        """
+        for size in self.SIZES:
+            with self.subTest(size=size):
+                user, session, exercise = self.seed(size)
+                lines_url = f'/sessions/{session.slug}/{exercise.slug}/'
+                self.client.force_login(user)
+
+                for name, url in [('SessionsView', '/sessions/'), ('ExerciseView', f'/sessions/{session.slug}/'), ('LinesView', lines_url)]:
+                    bump_data_version(user.id)  # Cold listing cache
+                    with query_budget(f'{name}.get', exact=True):
+                        self.assertEqual(self.client.get(url).status_code, 200)
+
+                # The seed never uses 20 reps, so the first line opens its record slot and the second beats it
+                with query_budget('LinesView.post', exact=True):
+                    self.assertEqual(self.client.post(lines_url, {'weight': '100', 'reps': '20'}).status_code, 302)
+                with query_budget('LinesView.post_beating_record', exact=True):
+                    self.assertEqual(self.client.post(lines_url, {'weight': '105', 'reps': '20'}).status_code, 302)
+                with query_budget('ExerciseView.post', exact=True):
+                    self.assertEqual(self.client.post(f'/sessions/{session.slug}/', {'name': 'Budget Exercise'}).status_code, 302)
+                with query_budget('SessionsView.post', exact=True):
+                    self.assertEqual(self.client.post('/sessions/', {'name': 'Budget Session'}).status_code, 302)
+
+                self.client.logout()
+                with query_budget('LoginView.get', exact=True):
+                    self.client.get('/users/login/')
+                with query_budget('LoginView.post', exact=True):
+                    self.assertEqual(self.client.post('/users/login/', {'username': user.username, 'password': SEED_PASSWORD}).status_code, 302)
+
+                self.client.logout()
+                with query_budget('RegisterView.get', exact=True):
+                    self.client.get('/users/register/')
+                with query_budget('RegisterView.post', exact=True):
+                    self.assertEqual(self.client.post('/users/register/', {'username': f'new{size}', 'password1': 'Xyzzy-12345!', 'password2': 'Xyzzy-12345!'}).status_code, 302)
+
+    def test_app_user_methods_stay_within_budget(self):
+        """
+        Test that no AppUser method's query count exceeds its budget or grows with the data.
+        """
+        for size in self.SIZES:
+            with self.subTest(size=size):
+                user, session, exercise = self.seed(size)
+                app_user = AppUser(user)
+                calls = {
+                    'get_user_sessions': lambda: list(app_user.get_user_sessions()),
+                    'get_cached_user_sessions': app_user.get_cached_user_sessions,
+                    'get_user_exercises': lambda: list(app_user.get_user_exercises()),
+                    'get_exercises_by_session_slug': lambda: list(app_user.get_exercises_by_session_slug(session.slug)),
+                    'get_session_exercises': lambda: list(app_user.get_session_exercises(session)),
+                    'get_cached_session_exercises': lambda: app_user.get_cached_session_exercises(session),
+                    'get_user_lines': lambda: list(app_user.get_user_lines()),
+                    'get_user_lines_page': app_user.get_user_lines_page,
+                    'get_lines_for_exercise': lambda: list(app_user.get_lines_for_exercise(exercise.slug, session.slug)),
+                    'get_exercise_lines': lambda: list(app_user.get_exercise_lines(exercise)),
+                    'get_lines_page_for_exercise': lambda: app_user.get_lines_page_for_exercise(exercise.slug, session_slug=session.slug),
+                    'get_exercise_lines_page': lambda: app_user.get_exercise_lines_page(exercise),
+                    'get_cached_exercise_lines_page': lambda: app_user.get_cached_exercise_lines_page(exercise),
+                    'get_exercise_records': lambda: list(app_user.get_exercise_records(exercise)),
+                    'get_cached_exercise_records': lambda: app_user.get_cached_exercise_records(exercise),
+                    'get_user_records': lambda: list(app_user.get_user_records()),
+                }
+                for method, call in calls.items():
+                    with query_budget(f'AppUser.{method}', exact=True):
+                        call()
+
+    def test_exceeded_budget_reports_sql(self):
+        """
+        Test that going over budget fails with the offending SQL in the message.
+        """
+        user, session, exercise = self.seed(2)
+
+        with self.assertRaisesMessage(QueryBudgetExceeded, 'FROM "base_session"'):
+            with query_budget('N+1', limit=1):
+                for exercise in Exercise.objects.filter(user=user):
+                    exercise.session.name
+
+        @query_budget('AppUser.get_user_sessions')
+        def load_sessions():
+            return list(AppUser(user).get_user_sessions())
+
+        self.assertEqual(len(load_sessions()), 2)
+
+    def test_exact_budget_fails_under_budget(self):
+        """
+        Test that an exact budget also fails when fewer queries run, so it is kept at the measured count.
+        """
+        user, session, exercise = self.seed(1)
+
+        with self.assertRaisesMessage(QueryBudgetExceeded, 'Exact ran 1 queries, its budget is 2 exactly'):
+            with query_budget('Exact', limit=2, exact=True):
+                list(AppUser(user).get_user_sessions())
+
+
+class ProfilingMiddlewareTests(TestCase):
+    """
+    Test cases for the per-request profiling middleware.
+    """
+    def setUp(self):
+        """
+        Set up a logged in user with a session.
+        """
+        self.user1 = User.objects.create_user(username="testuser1", password="testpass1")
+        Session.objects.create(name="Strength Training", user=self.user1)
+        self.client.force_login(self.user1)
+
+    @override_settings(PROFILING_ENABLED=True, PROFILING_SAMPLE_RATE=1.0)
+    def test_sampled_request_gets_server_timing_and_log_line(self):
+        """
+        Test that a sampled request reports database, template and total timings.
+        """
+        with self.assertLogs('replus.profiling', level='INFO') as logs:
+            response = self.client.get('/sessions/')
+
+        timing = response.headers['Server-Timing']
+        for metric in ('db;dur=', 'tpl;dur=', 'view;dur=', 'total;dur='):
+            self.assertIn(metric, timing)
+        self.assertIn('desc="3 queries"', timing)
+
+        line = json.loads(logs.records[0].getMessage())
+        self.assertEqual(line['path'], '/sessions/')
+        self.assertEqual(line['db_queries'], 3)
+        self.assertGreater(line['tpl_ms'], 0)
+
+    @override_settings(PROFILING_ENABLED=True, PROFILING_SAMPLE_RATE=1.0)
+    async def test_async_request_is_profiled_on_the_event_loop(self):
+        """
+        Test that under ASGI the middleware stays async and still sees the queries run in threads.
+        """
+        async def get_response(request):
+            return HttpResponse()
+        self.assertTrue(iscoroutinefunction(ProfilingMiddleware(get_response)))
+
+        await self.async_client.aforce_login(self.user1)
+        with self.assertLogs('replus.profiling', level='INFO') as logs:
+            response = await self.async_client.get('/sessions/')
+
+        self.assertIn('desc="3 queries"', response.headers['Server-Timing'])
+        self.assertGreater(json.loads(logs.records[0].getMessage())['tpl_ms'], 0)
+
+    @override_settings(PROFILING_ENABLED=True, PROFILING_SAMPLE_RATE=0.0)
+    def test_unsampled_request_is_not_profiled(self):
+        """
+        Test that requests outside the sample get no header.
+        """
+        self.assertNotIn('Server-Timing', self.client.get('/sessions/').headers)
+
+    @override_settings(PROFILING_ENABLED=False, PROFILING_SAMPLE_RATE=1.0)
+    def test_disabled_middleware_is_removed(self):
+        """
+        Test that a disabled middleware is dropped from the chain.
+        """
+        self.assertNotIn('Server-Timing', self.client.get('/sessions/').headers)
+
+
+class ConditionalPageTests(TestCase):
+    """
+    Test cases for the data-version ETags of the listing pages.
+    """
+    def setUp(self):
+        """
+        Set up a logged in user with a session, an exercise and a line, and the page URLs.
+        """
+        self.user1 = User.objects.create_user(username="testuser1", password="testpass1")
+        self.session = Session.objects.create(name="Strength Training", user=self.user1)
+        self.exercise = Exercise.objects.create(name="Squats", session=self.session, user=self.user1)
+        Line.objects.create(exercise=self.exercise, weight=100, reps=5, user=self.user1)
+        self.client.force_login(self.user1)
+        self.urls = ['/sessions/', f'/sessions/{self.session.slug}/', f'/sessions/{self.session.slug}/{self.exercise.slug}/']
+
+    def etag(self, url):
+        """
+        Load a page once to get a CSRF cookie, then return the ETag of the page.
+        """
+        self.client.get(url)
+        response = self.client.get(url)
+        self.assertEqual(response['Cache-Control'], 'private, no-cache')
+        return response['ETag']
+
+    def test_matching_etag_is_answered_before_any_listing_query(self):
+        """
+        Test that every page answers a matching If-None-Match with 304, running only the auth queries.
+        """
+        for url in self.urls:
+            etag = self.etag(url)
+            self.assertTrue(etag.startswith('W/"'))
+            with query_budget('ConditionalPage.not_modified'):
+                response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+            self.assertEqual((response.status_code, response.content), (304, b''))
+            self.assertEqual(response['ETag'], etag)
+
+    def test_writes_change_the_etag(self):
+        """
+        Test that adding a line gives every page a new ETag and a full response.
+        """
+        etags = [self.etag(url) for url in self.urls]
+        self.client.post(self.urls[2], {'weight': 110, 'reps': 5})
+
+        for url, etag in zip(self.urls, etags):
+            response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+            self.assertEqual(response.status_code, 200)
+            self.assertNotEqual(response['ETag'], etag)
+
+    def test_etag_depends_on_user_and_csrf_secret(self):
+        """
+        Test that another user or a new CSRF secret does not match, and a first visit gets no ETag.
+        """
+        etag = self.etag('/sessions/')
+
+        self.client.cookies.pop(settings.CSRF_COOKIE_NAME)
+        response = self.client.get('/sessions/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn('ETag', response)
+        self.assertNotEqual(self.etag('/sessions/'), etag)
+
+        etag = self.etag('/sessions/')
+        user2 = User.objects.create_user(username="testuser2", password="testpass2")
+        self.client.force_login(user2)
+        response = self.client.get('/sessions/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+
+
+class StaticPipelineTests(TestCase):
+    """
+    Test cases for the hashed, precompressed static files and their middleware.
+    """
+    def setUp(self):
+        """
+        Collect the static files into a temporary STATIC_ROOT with the pipeline turned on.
+        """
+        root = tempfile.mkdtemp()
+        pipeline = override_settings(
+            STATIC_PIPELINE=True,
+            STATIC_ROOT=root,
+            STORAGES={
+                'default': {'BACKEND': 'django.core.files.storage.FileSystemStorage'},
+                'staticfiles': {'BACKEND': 'replus.static_files.PrecompressedManifestStaticFilesStorage'},
+            },
+        )
+        pipeline.enable()
+        self.addCleanup(pipeline.disable)
+        with mock.patch.object(static_files, 'logger'):  # The brotli warning has its own test
+            call_command('collectstatic', interactive=False, verbosity=0)
+
+        with open(os.path.join(root, 'staticfiles.json')) as manifest:
+            self.style = json.load(manifest)['paths']['css/style.css']
+        self.root = root
+
+    def test_collectstatic_writes_hashed_and_compressed_files(self):
+        """
+        Test that the hashed file gets a smaller gzip variant that decompresses to it.
+        """
+        self.assertRegex(self.style, r'^css/style\.[0-9a-f]{12}\.css$')
+        with open(os.path.join(self.root, self.style), 'rb') as original, open(os.path.join(self.root, self.style + '.gz'), 'rb') as variant:
+            data, compressed = original.read(), variant.read()
+        self.assertLess(len(compressed), len(data))
+        self.assertEqual(gzip.decompress(compressed), data)
+
+    def test_pages_link_hashed_names(self):
+        """
+        Test that {% static %} points the pages at the hashed names.
+        """
+        self.assertContains(self.client.get('/'), f'/static/{self.style}')
+
+    def test_hashed_file_is_immutable_and_negotiated(self):
+        """
+        Test that a hashed file is cached for a year and sent compressed only to clients accepting it.
+        """
+        response = self.client.get(f'/static/{self.style}', HTTP_ACCEPT_ENCODING='gzip, deflate')
+        self.assertEqual(response['Cache-Control'], 'public, max-age=31536000, immutable')
+        self.assertEqual((response['Content-Encoding'], response['Content-Type'], response['Vary']), ('gzip', 'text/css', 'Accept-Encoding'))
+        with open(os.path.join(self.root, self.style + '.gz'), 'rb') as variant:
+            self.assertEqual(b''.join(response.streaming_content), variant.read())
+
+        for accept_encoding in ('', 'gzip;q=0', 'identity'):
+            response = self.client.get(f'/static/{self.style}', HTTP_ACCEPT_ENCODING=accept_encoding)
+            self.assertNotIn('Content-Encoding', response)
+            self.assertEqual(response['Vary'], 'Accept-Encoding')
+
+    async def test_async_chain_is_not_adapted_to_sync(self):
+        """
+        Test that in an async chain the middleware is a coroutine function, passing other requests
+        straight on and serving static files itself.
+        """
+        async def get_response(request):
+            return HttpResponse('page')
+
+        middleware = static_files.StaticFilesMiddleware(get_response)
+        self.assertTrue(iscoroutinefunction(middleware))
+
+        response = await middleware(RequestFactory().get('/sessions/'))
+        self.assertEqual(response.content, b'page')
+        response = await middleware(RequestFactory().get(f'/static/{self.style}', HTTP_ACCEPT_ENCODING='gzip'))
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        response.close()
+
+        response = await self.async_client.get(f'/static/{self.style}')
+        self.assertEqual(response['Cache-Control'], 'public, max-age=31536000, immutable')
+
+    @skipUnless(static_files.brotli is not None, "brotli is not installed")
+    def test_brotli_is_preferred(self):
+        """
+        Test that clients accepting brotli get the brotli variant.
+        """
+        response = self.client.get(f'/static/{self.style}', HTTP_ACCEPT_ENCODING='gzip, br')
+        self.assertEqual(response['Content-Encoding'], 'br')
+
+    def test_missing_brotli_is_logged(self):
+        """
+        Test that collectstatic warns when only gzip variants can be written.
+        """
+        with mock.patch.object(static_files, 'brotli', None), self.assertLogs('replus.static_files', level='WARNING') as logs:
+            call_command('collectstatic', interactive=False, verbosity=0)
+        self.assertIn('brotli is not installed', logs.output[0])
+
+    def test_unhashed_and_missing_files(self):
+        """
+        Test that an unhashed name is revalidated, answered with a 304 carrying the same caching headers
+        when unchanged, and that unknown names and paths outside STATIC_ROOT fall through to a 404.
+        """
+        response = self.client.get('/static/css/style.css')
+        self.assertEqual(response['Cache-Control'], 'no-cache')
+        self.assertNotIn('Content-Disposition', response)
+        response.close()
+        headers = {name: response[name] for name in ('Cache-Control', 'Vary', 'Last-Modified')}
+
+        response = self.client.get('/static/css/style.css', HTTP_IF_MODIFIED_SINCE=response['Last-Modified'])
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual({name: response[name] for name in headers}, headers)
+
+        self.assertEqual(self.client.get('/static/css/missing.css').status_code, 404)
+        self.assertEqual(self.client.get('/static/../staticfiles.json').status_code, 404)
+
+
+class QueryPlanTests(TestCase):
+    """
+    Test cases checking that the AppUser and view model queries are served by indexes.
+    """
+    def setUp(self):
+        """
+        Set up a user with a session, an exercise and a line to query.
+        """
+        self.user1 = User.objects.create_user(username="testuser1", password="testpass1")
+        self.session = Session.objects.create(name="Strength Training", user=self.user1)
+        self.exercise = Exercise.objects.create(name="Squats", session=self.session, user=self.user1)
+        self.line = Line.objects.create(exercise=self.exercise, weight=100, reps=10, user=self.user1)
+
+    def assertNoFullTableScan(self, func):
+        """
+        Run func, then EXPLAIN QUERY PLAN every query it executed and fail on a full table scan.
+        """
+        with CaptureQueriesContext(connection) as queries:
+            result = func()
+            if hasattr(result, 'query'):
+                list(result)  # Evaluate lazy QuerySets
+
+        self.assertTrue(queries.captured_queries)
+        with connection.cursor() as cursor:
+            for query in queries.captured_queries:
+                cursor.execute(f"EXPLAIN QUERY PLAN {query['sql']}")
+                for row in cursor.fetchall():
+                    detail = row[-1]
+                    if detail.startswith('SCAN') and 'INDEX' not in detail and 'CONSTANT' not in detail:
+                        self.fail(f"Full table scan ({detail}) in: {query['sql']}")
+
+    def test_app_user_queries_use_indexes(self):
+        """
+        Test that every AppUser query avoids full table scans.
+        """
+        app_user = AppUser(self.user1)
+        self.assertNoFullTableScan(app_user.get_user_sessions)
+        self.assertNoFullTableScan(app_user.get_user_exercises)
+        self.assertNoFullTableScan(lambda: app_user.get_exercises_by_session_slug(self.session.slug))
+        self.assertNoFullTableScan(app_user.get_user_lines)
+        self.assertNoFullTableScan(lambda: app_user.get_lines_for_exercise(self.exercise.slug))
+        self.assertNoFullTableScan(app_user.get_user_lines_page)
+        self.assertNoFullTableScan(lambda: app_user.get_lines_page_for_exercise(self.exercise.slug))
+
+    def test_view_model_queries_use_indexes(self):
+        """
+        Test that every view model query avoids full table scans.
+        """
+        sessions_view_model = SessionsViewModel(self.user1)
+        exercise_view_model = ExerciseViewModel(self.user1)
+        lines_view_model = LinesViewModel(self.user1)
+
+        self.assertNoFullTableScan(sessions_view_model.get_sessions)
+        self.assertNoFullTableScan(lambda: exercise_view_model.get_session(self.session.slug))
+        self.assertNoFullTableScan(lambda: exercise_view_model.get_exercises(self.session.slug))
+        self.assertNoFullTableScan(lambda: lines_view_model.get_session(self.session.slug))
+        self.assertNoFullTableScan(lambda: lines_view_model.get_exercise(self.session.slug, self.exercise.slug))
+        self.assertNoFullTableScan(lambda: lines_view_model.get_lines(self.session.slug, self.exercise.slug))
+        self.assertNoFullTableScan(lambda: lines_view_model.get_lines_page(self.session.slug, self.exercise.slug))
+        self.assertNoFullTableScan(lambda: lines_view_model.delete_line(self.session.slug, self.exercise.slug, self.line.id))
+        self.assertNoFullTableScan(lambda: exercise_view_model.delete_exercise(self.exercise.slug, self.session.slug))
+        self.assertNoFullTableScan(lambda: sessions_view_model.delete_session_using_slug(self.session.slug))
@@ -11,10 +11,18 @@ from .views.home_view import HomeView
 from .views.sessions_view import SessionsView
 from .views.exercise_view import ExerciseView
 from .views.lines_view import LinesView
+from .views.bulk_lines_view import BulkLinesView
+from .views.export_view import ExportView
+from .views.import_view import ImportView
+from .views.statistics_view import StatisticsView
 
 urlpatterns = [
     path('', HomeView.as_view(), name="home"),
     path('sessions/', SessionsView.as_view(), name="sessions"),
     path('sessions/<slug:session_slug>/', ExerciseView.as_view(), name='exercises'),
     path('sessions/<slug:session_slug>/<slug:exercise_slug>/', LinesView.as_view(), name='lines'),
+    path('sessions/<slug:session_slug>/lines/bulk/', BulkLinesView.as_view(), name='bulk_lines'),
+    path('export/', ExportView.as_view(), name='export'),
+    path('import/', ImportView.as_view(), name='import'),
+    path('statistics/', StatisticsView.as_view(), name='statistics'),
 ]
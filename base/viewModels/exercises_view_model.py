@@ -3,10 +3,14 @@ Author:  Joshua Delos Santos
 Date:    06/11/2024
 """
     
-from base.models import Exercise, Session
+from asgiref.sync import sync_to_async
+from base.models import Exercise
+from base.deletion import delete_exercise
+from base.data_version import get_object_version, aget_object_version, EXERCISES_SCOPE
 from users.api.app_user import AppUser
 from base.forms.exercise_form import ExerciseForm
-from django.shortcuts import get_object_or_404
+from base.viewModels.page_resolver import PageResolver
+from django.shortcuts import get_object_or_404, aget_object_or_404
 
 class ExerciseViewModel:
     """
@@ -16,32 +20,68 @@ class ExerciseViewModel:
         view_model = ExerciseViewModel(request.user)
         exercises = view_model.get_exercises(session_slug)
     """
-    def __init__(self, user):
+    def __init__(self, user, resolver=None):
         """
         Initialize the view model with the authenticated user.
+        resolver = None: a new request-scoped PageResolver is created
         """
         self.user = user
+        self.resolver = resolver or PageResolver(user)
         
         
     def get_session(self, session_slug):
         """
         Get the session for the given slug.
+        Resolved once per request.
         
         Returns:
             session: The session if found
         """
-        return get_object_or_404(Session, slug=session_slug, user=self.user)
+        return self.resolver.get_session(session_slug)
+    
+    
+    async def aget_session(self, session_slug):
+        """
+        Async version of get_session.
+        """
+        return await self.resolver.aget_session(session_slug)
     
     
     def get_exercises(self, session_slug):
         """
         Get the list of exercises for the given session.
+        Served from the listing cache until the user's data changes.
         
         Returns:
             exercises: The list of exercises for the session
         """
         user = AppUser(self.user)
-        return user.get_exercises_by_session_slug(session_slug)
+        return user.get_cached_session_exercises(self.get_session(session_slug))
+    
+    
+    async def aget_exercises(self, session_slug):
+        """
+        Async version of get_exercises.
+        """
+        user = AppUser(self.user)
+        return await user.aget_cached_session_exercises(await self.aget_session(session_slug))
+    
+    
+    def get_table_version(self, session_slug):
+        """
+        Get the version of the session's exercises, which keys the cached exercises table.
+        
+        Returns:
+            version: Changes whenever an exercise of the session is written
+        """
+        return get_object_version(EXERCISES_SCOPE, self.get_session(session_slug).id)
+    
+    
+    async def aget_table_version(self, session_slug):
+        """
+        Async version of get_table_version.
+        """
+        return await aget_object_version(EXERCISES_SCOPE, (await self.aget_session(session_slug)).id)
     
     
     def get_exercise_form(self, data=None):
@@ -72,7 +112,24 @@ class ExerciseViewModel:
     def delete_exercise(self, exercise_slug, session_slug):
         """
         Delete an exercise for the authenticated user using the exercise slug.
+        Its lines go with it in a few set-based statements, see base/deletion.py.
+        
+        Returns:
+            exercise: The deleted exercise
         """
         session = self.get_session(session_slug)
         exercise = get_object_or_404(Exercise, session=session, slug=exercise_slug, user=self.user)
-        exercise.delete()
\ No newline at end of file
+        delete_exercise(exercise)
+        self.resolver.forget_exercise(session_slug, exercise_slug)
+        return exercise
+    
+    
+    async def adelete_exercise(self, exercise_slug, session_slug):
+        """
+        Async version of delete_exercise.
+        """
+        session = await self.aget_session(session_slug)
+        exercise = await aget_object_or_404(Exercise, session=session, slug=exercise_slug, user=self.user)
+        await sync_to_async(delete_exercise)(exercise)
+        self.resolver.forget_exercise(session_slug, exercise_slug)
+        return exercise
@@ -4,13 +4,20 @@ Date:    13/11/2024
 """
 
 
-from base.models import Exercise, Session
+from base.models import Exercise
 from users.api.app_user import AppUser
 from base.forms.line_form import LineForm
-from django.shortcuts import get_object_or_404
+from base.viewModels.page_resolver import PageResolver
+from base.signals import bulk_created
+from base.data_version import get_object_version, aget_object_version, LINES_SCOPE
+from django.db import transaction
+from django.shortcuts import get_object_or_404, aget_object_or_404
 from base.models import Line
 
 
+MAX_BULK_LINES = 500
+
+
 class LinesViewModel:
     """
     View model for the lines view.
@@ -19,31 +26,42 @@ class LinesViewModel:
         view_model = LinesViewModel(request.user)
         lines = view_model.get_lines(session_slug, exercise_slug)
     """
-    def __init__(self, user):
+    def __init__(self, user, resolver=None):
         """
         Initialize the view model with the authenticated user.
+        resolver = None: a new request-scoped PageResolver is created
         """
         self.user = user
+        self.resolver = resolver or PageResolver(user)
         
         
     def get_session(self, session_slug):
         """
         Get the session for the given slug.
+        Resolved once per request.
         
         Returns:
             session: The session if found
         """
-        return get_object_or_404(Session, slug=session_slug, user=self.user)
+        return self.resolver.get_session(session_slug)
     
     
     def get_exercise(self, session_slug, exercise_slug):
         """
         Get the exercise for the given session and exercise slug.
+        Resolved once per request, together with its session.
         
         Returns:
             exercise: The exercise if found
         """
-        return get_object_or_404(Exercise, slug=exercise_slug, session__slug=session_slug, user=self.user)
+        return self.resolver.get_exercise(session_slug, exercise_slug)
+    
+    
+    async def aget_exercise(self, session_slug, exercise_slug):
+        """
+        Async version of get_exercise.
+        """
+        return await self.resolver.aget_exercise(session_slug, exercise_slug)
     
     
     def get_lines(self, session_slug, exercise_slug):
@@ -54,7 +72,65 @@ class LinesViewModel:
             lines: The list of lines for the exercise
         """
         user = AppUser(self.user)
-        return user.get_lines_for_exercise(exercise_slug)
+        return user.get_exercise_lines(self.get_exercise(session_slug, exercise_slug))
+    
+    
+    def get_lines_page(self, session_slug, exercise_slug, cursor=None):
+        """
+        Get one page of lines for the given exercise, newest first.
+        Served from the listing cache until the user's data changes.
+        cursor = None: first page
+        
+        Returns:
+            page: The LinePage holding the lines and the cursor of the next (older) page
+        """
+        user = AppUser(self.user)
+        return user.get_cached_exercise_lines_page(self.get_exercise(session_slug, exercise_slug), cursor)
+    
+    
+    async def aget_lines_page(self, session_slug, exercise_slug, cursor=None):
+        """
+        Async version of get_lines_page.
+        """
+        user = AppUser(self.user)
+        return await user.aget_cached_exercise_lines_page(await self.aget_exercise(session_slug, exercise_slug), cursor)
+    
+    
+    def get_records(self, session_slug, exercise_slug):
+        """
+        Get the personal records of the given exercise, one per number of reps.
+        Served from the listing cache until the user's data changes.
+        
+        Returns:
+            records: The list of PersonalRecords, fewest reps first
+        """
+        user = AppUser(self.user)
+        return user.get_cached_exercise_records(self.get_exercise(session_slug, exercise_slug))
+    
+    
+    async def aget_records(self, session_slug, exercise_slug):
+        """
+        Async version of get_records.
+        """
+        user = AppUser(self.user)
+        return await user.aget_cached_exercise_records(await self.aget_exercise(session_slug, exercise_slug))
+    
+    
+    def get_table_version(self, session_slug, exercise_slug):
+        """
+        Get the version of the exercise's lines, which keys the cached lines table.
+        
+        Returns:
+            version: Changes whenever a line of the exercise is written
+        """
+        return get_object_version(LINES_SCOPE, self.get_exercise(session_slug, exercise_slug).id)
+    
+    
+    async def aget_table_version(self, session_slug, exercise_slug):
+        """
+        Async version of get_table_version.
+        """
+        return await aget_object_version(LINES_SCOPE, (await self.aget_exercise(session_slug, exercise_slug)).id)
     
     
     def get_line_form(self, data=None):
@@ -79,6 +155,54 @@ class LinesViewModel:
         return line
     
     
+    def create_lines_in_bulk(self, session_slug, rows):
+        """
+        Validate many sets across the exercises of a session and save the valid ones together.
+        
+        Each row is a dict with 'exercise' (the exercise slug), 'weight' and 'reps'.
+        Valid rows are written with a single bulk_create in one transaction, invalid
+        rows are reported back without rejecting the rest of the batch.
+        
+        Args:
+            session_slug: Slug of the session the exercises belong to
+            rows: List of dicts, one per set
+        
+        Returns:
+            tuple: (lines, errors) where lines is a list of (row index, saved line) and
+                   errors is a list of (row index, dict of field errors)
+        """
+        session = self.get_session(session_slug)
+        slugs = {row.get('exercise') for row in rows if isinstance(row, dict) and isinstance(row.get('exercise'), str)}
+        exercises = {
+            exercise.slug: exercise
+            for exercise in Exercise.objects.filter(session=session, user=self.user, slug__in=slugs)
+        }
+        
+        pending = []
+        errors = []
+        for index, row in enumerate(rows):
+            if not isinstance(row, dict):
+                errors.append((index, {'__all__': ['Expected an object with exercise, weight and reps.']}))
+                continue
+            
+            slug = row.get('exercise')
+            exercise = exercises.get(slug) if isinstance(slug, str) else None  # Client values may be unhashable
+            form = self.get_line_form(row)
+            if exercise is None:
+                errors.append((index, {'exercise': ['No exercise with this slug in the session.']}))
+            elif not form.is_valid():
+                errors.append((index, {field: list(field_errors) for field, field_errors in form.errors.items()}))
+            else:
+                pending.append((index, self.create_line(form, exercise)))
+        
+        if pending:
+            with transaction.atomic():
+                lines = Line.objects.bulk_create([line for _, line in pending])
+                bulk_created.send(sender=Line, user_id=self.user.id, objects=lines)  # bulk_create skips post_save
+        
+        return pending, errors
+    
+    
     def delete_line(self, session_slug, exercise_slug, line_id):
         """
         Delete a line for the authenticated user using the line ID.
@@ -87,6 +211,9 @@ class LinesViewModel:
             session_slug: Slug of the session
             exercise_slug: Slug of the exercise
             line_id: ID of the line to delete
+        
+        Returns:
+            id: The ID of the deleted line
         """
         exercise = self.get_exercise(session_slug, exercise_slug)
         line = get_object_or_404(Line, 
@@ -94,4 +221,17 @@ class LinesViewModel:
             exercise=exercise,
             user=self.user
         )
-        line.delete()
\ No newline at end of file
+        deleted_id = line.id  # delete() clears it
+        line.delete()
+        return deleted_id
+    
+    
+    async def adelete_line(self, session_slug, exercise_slug, line_id):
+        """
+        Async version of delete_line.
+        """
+        exercise = await self.aget_exercise(session_slug, exercise_slug)
+        line = await aget_object_or_404(Line, id=line_id, exercise=exercise, user=self.user)
+        deleted_id = line.id
+        await line.adelete()
+        return deleted_id
@@ -0,0 +1,131 @@
+"""
+Author: Joshua Delos Santos
+Date: 18/10/2026
+
+
+This file defines the request-scoped resolver shared by the view models.
+
+It is an identity map for the objects a page is built from: each session
+and exercise is loaded at most once per request, exercises come with their
+session through select_related, and the same instances are handed to the
+view, the view model and the template.
+
+
+Example:
+    resolver = PageResolver(request.user)
+    exercise = resolver.get_exercise(session_slug, exercise_slug)  # 1 query
+    session = resolver.get_session(session_slug)                   # 0 queries, exercise.session
+    exercise = await resolver.aget_exercise(session_slug, exercise_slug)  # From async views
+"""
+
+
+from django.shortcuts import get_object_or_404, aget_object_or_404
+from base.models import Session, Exercise
+
+
+class PageResolver:
+    """
+    Resolve sessions and exercises for one request, caching every instance it loads.
+
+    Attributes:
+        user (User): The authenticated user who owns the objects.
+    """
+    def __init__(self, user):
+        """
+        Initialise the resolver with the authenticated user.
+        """
+        self.user = user
+        self._sessions = {}
+        self._exercises = {}
+
+
+    def get_session(self, session_slug):
+        """
+        Get the session for the given slug.
+
+        Returns:
+            session: The session if found, otherwise raises Http404
+        """
+        if session_slug not in self._sessions:
+            self._sessions[session_slug] = get_object_or_404(Session, slug=session_slug, user=self.user)
+
+        return self._sessions[session_slug]
+
+
+    def get_exercise(self, session_slug, exercise_slug):
+        """
+        Get the exercise for the given session and exercise slug, with its session loaded.
+
+        Returns:
+            exercise: The exercise if found, otherwise raises Http404
+        """
+        key = (session_slug, exercise_slug)
+
+        if key not in self._exercises:
+            queryset = Exercise.objects.select_related('session')
+            session = self._sessions.get(session_slug)
+
+            if session is not None:
+                exercise = get_object_or_404(queryset, slug=exercise_slug, session=session, user=self.user)
+                exercise.session = session  # Keep a single session instance per request
+            else:
+                exercise = get_object_or_404(queryset, slug=exercise_slug, session__slug=session_slug, user=self.user)
+                self._sessions[session_slug] = exercise.session
+
+            self._exercises[key] = exercise
+
+        return self._exercises[key]
+
+
+    async def aget_session(self, session_slug):
+        """
+        Async version of get_session, sharing the same identity map.
+
+        Returns:
+            session: The session if found, otherwise raises Http404
+        """
+        if session_slug not in self._sessions:
+            self._sessions[session_slug] = await aget_object_or_404(Session, slug=session_slug, user=self.user)
+
+        return self._sessions[session_slug]
+
+
+    async def aget_exercise(self, session_slug, exercise_slug):
+        """
+        Async version of get_exercise, sharing the same identity map.
+
+        Returns:
+            exercise: The exercise if found, otherwise raises Http404
+        """
+        key = (session_slug, exercise_slug)
+
+        if key not in self._exercises:
+            queryset = Exercise.objects.select_related('session')
+            session = self._sessions.get(session_slug)
+
+            if session is not None:
+                exercise = await aget_object_or_404(queryset, slug=exercise_slug, session=session, user=self.user)
+                exercise.session = session
+            else:
+                exercise = await aget_object_or_404(queryset, slug=exercise_slug, session__slug=session_slug, user=self.user)
+                self._sessions[session_slug] = exercise.session
+
+            self._exercises[key] = exercise
+
+        return self._exercises[key]
+
+
+    def forget_exercise(self, session_slug, exercise_slug):
+        """
+        Remove a deleted exercise from the identity map.
+        """
+        self._exercises.pop((session_slug, exercise_slug), None)
+
+
+    def forget_session(self, session_slug):
+        """
+        Remove a deleted session, and the exercises resolved through it, from the identity map.
+        """
+        self._sessions.pop(session_slug, None)
+        for key in [key for key in self._exercises if key[0] == session_slug]:
+            del self._exercises[key]
@@ -11,12 +11,16 @@ It handles data acquisition for the sessions view.
 Example:
     view_model = SessionsViewModel(request.user)
     sessions = view_model.get_sessions()
+    sessions = await view_model.aget_sessions()  # From async views
     form = view_model.get_session_form(data=request.POST)
     
 """
 
 
+from asgiref.sync import sync_to_async
 from base.models import Session
+from base.deletion import delete_session
+from base.data_version import get_data_version, aget_data_version
 from users.api.app_user import AppUser
 from base.forms.session_form import SessionForm
 
@@ -41,9 +45,32 @@ class SessionsViewModel:
     def get_sessions(self):
         """
         Get the list of sessions for the authenticated user.
+        Served from the listing cache until the user's data changes.
         """
         user = AppUser(self.user)
-        return user.get_user_sessions()
+        return user.get_cached_user_sessions()
+    
+    
+    async def aget_sessions(self):
+        """
+        Async version of get_sessions.
+        """
+        user = AppUser(self.user)
+        return await user.aget_cached_user_sessions()
+    
+    
+    def get_table_version(self):
+        """
+        Get the version that keys the cached sessions table: the user's data version.
+        """
+        return get_data_version(self.user.id)
+    
+    
+    async def aget_table_version(self):
+        """
+        Async version of get_table_version.
+        """
+        return await aget_data_version(self.user.id)
     
     
     def get_session_form(self, data=None):
@@ -71,8 +98,22 @@ class SessionsViewModel:
     def delete_session_using_slug(self, session_slug):
         """
         Delete a session for the authenticated user using the session slug.
+        Its exercises and lines go with it in a few set-based statements, see base/deletion.py.
+        
+        Returns:
+            session: The deleted session
         """
         session = Session.objects.get(slug=session_slug, user=self.user)
-        session.delete()
+        delete_session(session)
+        return session
+    
+    
+    async def adelete_session_using_slug(self, session_slug):
+        """
+        Async version of delete_session_using_slug.
+        """
+        session = await Session.objects.aget(slug=session_slug, user=self.user)
+        await sync_to_async(delete_session)(session)
+        return session
         
         
\ No newline at end of file
@@ -0,0 +1,52 @@
+"""
+Author: Joshua Delos Santos
+Date: 18/10/2026
+"""
+
+import json
+from django.contrib.auth.mixins import LoginRequiredMixin
+from django.http import JsonResponse
+from django.views import View
+from base.viewModels.lines_view_model import LinesViewModel, MAX_BULK_LINES
+
+
+class BulkLinesView(LoginRequiredMixin, View):
+    """
+    A class-based view for logging many sets of a session in one request.
+
+    Expects a JSON body such as:
+        {"lines": [{"exercise": "squats", "weight": "100", "reps": 5}, ...]}
+
+    Responds with the ids of the saved lines and the errors of the rejected rows,
+    both keyed by the row index in the request.
+    """
+    def setup(self, request, *args, **kwargs):
+        """
+        Initialize view_model before dispatch.
+        Called by Django for each request.
+        """
+        super().setup(request, *args, **kwargs)
+        self.view_model = LinesViewModel(request.user)
+
+
+    def post(self, request, session_slug):
+        """
+        Handle POST requests to validate and save a batch of lines.
+        """
+        try:
+            rows = json.loads(request.body).get('lines')
+        except (ValueError, AttributeError):
+            return JsonResponse({'error': 'Expected a JSON object with a "lines" list.'}, status=400)
+
+        if not isinstance(rows, list):
+            return JsonResponse({'error': 'Expected a JSON object with a "lines" list.'}, status=400)
+
+        if len(rows) > MAX_BULK_LINES:
+            return JsonResponse({'error': f'A batch can hold at most {MAX_BULK_LINES} lines.'}, status=400)
+
+        lines, errors = self.view_model.create_lines_in_bulk(session_slug, rows)
+
+        return JsonResponse({
+            'created': [{'index': index, 'id': line.id} for index, line in lines],
+            'errors': [{'index': index, 'errors': row_errors} for index, row_errors in errors],
+        }, status=201 if lines else 200)
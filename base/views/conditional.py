@@ -0,0 +1,88 @@
+"""
+Author: Joshua Delos Santos
+Date: 18/10/2026
+
+
+This file answers repeated page loads with 304 Not Modified.
+
+The sessions, exercises and lines pages only change when the user's data
+does, and every write bumps the user's data version (see
+base/data_version.py). ConditionalPageMixin builds an ETag from that
+version before the handler runs, which costs one cache read and no query,
+and if the browser's If-None-Match matches it returns 304 without loading
+a listing or rendering a template. Otherwise the page is rendered as usual
+and sent with the ETag.
+
+Besides the data version the ETag covers everything else the page shows
+or depends on:
+
+    - the user, so another login on the same browser never matches
+    - the CSRF secret, as the page's forms carry tokens made from it; a
+      request without one gets no ETag, as rendering creates the secret
+    - the static manifest hash, so a deploy with new CSS links misses
+
+The ETag is weak, since the masked CSRF tokens differ between renders.
+The version is read before rendering, so a write that lands during a
+render can only make the ETag older than the page, which costs one extra
+render on the next load, never a stale 304. Pages are sent with
+Cache-Control: private, no-cache, so the browser always revalidates and
+shared caches never store them.
+
+
+Example:
+    class SessionsView(AsyncLoginRequiredMixin, ConditionalPageMixin, View):
+        ...
+"""
+
+
+import hashlib
+from django.contrib.staticfiles.storage import staticfiles_storage
+from django.utils.cache import get_conditional_response, patch_cache_control
+from base.data_version import aget_data_version
+
+
+
+async def apage_etag(request):
+    """
+    Build the ETag of a page for the request's user.
+
+    Returns:
+        str: The quoted weak ETag, None for anonymous users and requests without a CSRF secret.
+    """
+    csrf_secret = request.META.get('CSRF_COOKIE')
+    if not request.user.is_authenticated or not csrf_secret:
+        return None
+
+    version = await aget_data_version(request.user.id)
+    manifest_hash = getattr(staticfiles_storage, 'manifest_hash', '')
+    digest = hashlib.sha256(f'{request.user.id}:{version}:{csrf_secret}:{manifest_hash}'.encode()).hexdigest()
+
+    return f'W/"{digest[:32]}"'
+
+
+
+class ConditionalPageMixin:
+    """
+    Answer GET and HEAD requests whose If-None-Match matches the page's data-version ETag with 304.
+    Goes after the user mixin, so request.user is loaded.
+    """
+    async def dispatch(self, request, *args, **kwargs):
+        """
+        Return 304 before the handler runs when the page has not changed, otherwise tag the response.
+        """
+        if request.method not in ('GET', 'HEAD'):
+            return await super().dispatch(request, *args, **kwargs)
+
+        etag = await apage_etag(request)
+        if etag is None:
+            return await super().dispatch(request, *args, **kwargs)
+
+        response = get_conditional_response(request, etag=etag)
+        if response is None:
+            response = await super().dispatch(request, *args, **kwargs)
+
+        if response.status_code in (200, 304):
+            response.headers['ETag'] = etag
+            patch_cache_control(response, private=True, no_cache=True)
+
+        return response
@@ -3,64 +3,71 @@ Author: Joshua Delos Santos
 Date: 31/10/2024
 """
 
-from django.shortcuts import render, redirect, get_object_or_404
+from django.shortcuts import render, redirect
 from django.views import View
-from base.forms.exercise_form import ExerciseForm
+from base.views.mixins import AsyncUserMixin
+from base.views.conditional import ConditionalPageMixin
 from base.viewModels.exercises_view_model import ExerciseViewModel
 from django.core.exceptions import ValidationError
+from base.api.exercises_api_view import EXERCISE_FIELDS
+from base.views.partial import partial_mode, partial_added, partial_removed, partial_errors, as_row
 
-class ExerciseView(View):
+class ExerciseView(AsyncUserMixin, ConditionalPageMixin, View):
     """
     A class-based view for displaying details of an Exercise.
+    Async, so it runs on the event loop under ASGI.
+    Unchanged pages are answered with 304, see base/views/conditional.py.
     """
-    def setup(self, request, *args, **kwargs):
+    def setup_for_user(self, request):
         """
-        Initialize view_model before dispatch.
-        Called by Django for each request.
+        Initialize view_model once the user is loaded.
+        Called by the mixin for each request, before the handler.
         """
-        super().setup(request, *args, **kwargs)
         self.view_model = ExerciseViewModel(request.user)
         
         
-    def get(self, request, session_slug):
+    async def get(self, request, session_slug):
         """
         Handle GET requests to display the details of exercises in a session.
         """
-        context = self._get_context(session_slug)
+        context = await self._get_context(session_slug)
         
         return render(request, 'base/exercises.html', context)
     
     
-    def post(self, request, session_slug):
+    async def post(self, request, session_slug):
         """
-        Handle POST requests to process the form to add a new exercise.
+        Handle POST requests to process the form to add a new exercise or delete one.
+        Clients sending X-Partial get only the changed row, see base/views/partial.py.
         """
         if 'delete_exercise' in request.POST:
-            return self._handle_delete_exercise(request)
+            return await self._handle_delete_exercise(request)
         else:
-            session = self.view_model.get_session(session_slug)
-            return self._handle_add_exercise(request, session)
+            session = await self.view_model.aget_session(session_slug)
+            return await self._handle_add_exercise(request, session)
     
     
-    def _get_context(self, session_slug):
+    async def _get_context(self, session_slug):
         """
         Get the context for the view.
         
         Returns:
             dict: The context for the view.
         """
-        exercises = self.view_model.get_exercises(session_slug)
-        session = self.view_model.get_session(session_slug)
+        exercises = await self.view_model.aget_exercises(session_slug)
+        session = await self.view_model.aget_session(session_slug)
+        table_version = await self.view_model.aget_table_version(session_slug)
         form = self.view_model.get_exercise_form()
         
         return {
             'exercises': exercises,
             'session': session,
+            'table_version': table_version,
             'form': form
         }
     
     
-    def _handle_add_exercise(self, request, session):
+    async def _handle_add_exercise(self, request, session):
         """
         Handle adding an exercise.
         
@@ -73,26 +80,37 @@ class ExerciseView(View):
             try:
                 # Using form data, create a new session for user.
                 exercise = self.view_model.create_exercise(form, session)
-                exercise.save()
+                await exercise.asave()
+                if partial_mode(request):
+                    return partial_added(
+                        request, 'base/exercise_row.html', {'session': session, 'exercise': exercise}, as_row(exercise, EXERCISE_FIELDS),
+                    )
                 return redirect('exercises', session_slug=session.slug)
             except ValidationError as e:
                 form.add_error('name', e)
         
+        if partial_mode(request):
+            return partial_errors(request, form)
+        
         # If form is invalid, display the form with the errors.
         context = {
-            'exercises': self.view_model.get_exercises(session.slug),
+            'exercises': await self.view_model.aget_exercises(session.slug),
             'session': session,
+            'table_version': await self.view_model.aget_table_version(session.slug),
             'form': form
         }
         
         return render(request, 'base/exercises.html', context)
     
     
-    def _handle_delete_exercise(self, request):
+    async def _handle_delete_exercise(self, request):
         """
         Handle the deletion of an exercise.
         """
         exercise_slug = request.POST.get('exercise_slug')
         session_slug = request.POST.get('session_slug')
-        self.view_model.delete_exercise(exercise_slug, session_slug)
+        exercise = await self.view_model.adelete_exercise(exercise_slug, session_slug)
+        
+        if partial_mode(request):
+            return partial_removed(request, {'id': exercise.id, 'slug': exercise.slug})
         return redirect('exercises', session_slug=session_slug)
\ No newline at end of file
@@ -0,0 +1,57 @@
+"""
+Author: Joshua Delos Santos
+Date: 18/10/2026
+"""
+
+from datetime import date
+from django.core.handlers.asgi import ASGIRequest
+from django.http import HttpResponseBadRequest, StreamingHttpResponse
+from django.views import View
+from base.export import EXPORT_FORMATS, export_rows, stream_export, astream_export
+from base.views.mixins import AsyncLoginRequiredMixin
+
+
+class ExportView(AsyncLoginRequiredMixin, View):
+    """
+    A class-based view for downloading the authenticated user's training history.
+
+    Query parameters:
+        format: 'csv' (default) or 'jsonl'
+        start, end: Optional first and last day to include, as YYYY-MM-DD
+
+    The file is streamed row by row, see base/export.py.
+    """
+    async def get(self, request):
+        """
+        Handle GET requests: stream the export in the requested format.
+        """
+        export_format = request.GET.get('format', 'csv')
+        if export_format not in EXPORT_FORMATS:
+            return HttpResponseBadRequest(f"format must be one of: {', '.join(EXPORT_FORMATS)}.")
+
+        try:
+            start = self._parse_day(request.GET.get('start'))
+            end = self._parse_day(request.GET.get('end'))
+        except ValueError:
+            return HttpResponseBadRequest("start and end must be dates as YYYY-MM-DD.")
+
+        rows = export_rows(request.user, start, end)
+        # Match the iterator to the server, otherwise Django buffers the whole file
+        if isinstance(request, ASGIRequest):
+            content = astream_export(rows, export_format)
+        else:
+            content = stream_export(rows, export_format)
+
+        response = StreamingHttpResponse(content, content_type=EXPORT_FORMATS[export_format])
+        response['Content-Disposition'] = f'attachment; filename="replus-history.{export_format}"'
+        return response
+
+
+    def _parse_day(self, value):
+        """
+        Parse an optional YYYY-MM-DD query parameter.
+
+        Returns:
+            date: The day, None if the parameter is missing or empty.
+        """
+        return date.fromisoformat(value) if value else None
@@ -4,10 +4,10 @@ Date: 28/10/2024
 """
 
 from django.shortcuts import render
-from django.http import HttpResponse
 from django.views import View
+from base.views.mixins import AsyncUserMixin
 
-class HomeView(View):
+class HomeView(AsyncUserMixin, View):
     """
     HomeView handles displaying the homepage with the logged-in user's name.
 
@@ -16,7 +16,7 @@ class HomeView(View):
     
     The username is provided to 'base/home.html' as 'name' for personalized display.
     """
-    def get(self, request):
+    async def get(self, request):
         """
         Return the homepage.
         """
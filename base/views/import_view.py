@@ -0,0 +1,46 @@
+"""
+Author: Joshua Delos Santos
+Date: 18/10/2026
+"""
+
+import csv
+import io
+from django.contrib.auth.mixins import LoginRequiredMixin
+from django.shortcuts import render
+from django.views import View
+from base.forms.import_form import ImportForm
+from base.importer import import_history, parse_rows
+
+
+class ImportView(LoginRequiredMixin, View):
+    """
+    A class-based view for importing a training history file, see base/importer.py.
+
+    The upload is parsed as a stream and written in batches, so large files
+    are fine. Batches written before a decoding error stay imported.
+    """
+    def get(self, request):
+        """
+        Handle GET requests: display the upload form.
+        """
+        return render(request, 'base/import.html', {'form': ImportForm()})
+
+
+    def post(self, request):
+        """
+        Handle POST requests: import the uploaded file and display what was imported.
+        """
+        form = ImportForm(request.POST, request.FILES)
+        result = None
+
+        if form.is_valid():
+            upload = form.cleaned_data['file']
+            stream = io.TextIOWrapper(upload.file, encoding='utf-8-sig', newline='')
+            try:
+                result = import_history(
+                    request.user, parse_rows(stream, ImportForm.get_format(upload)), dry_run=form.cleaned_data['dry_run']
+                )
+            except (UnicodeDecodeError, csv.Error):
+                form.add_error('file', "The file could not be read, check it is UTF-8 CSV or JSON Lines.")
+
+        return render(request, 'base/import.html', {'form': form, 'result': result})
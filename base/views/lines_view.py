@@ -3,67 +3,78 @@ Author: Joshua Delos Santos
 Date: 31/10/2024
 """
 
-from django.shortcuts import render, get_object_or_404, redirect
+from django.shortcuts import render, redirect
 from django.views import View
 from django.core.exceptions import ValidationError
-from base.models import Exercise, Line
-from base.forms.line_form import LineForm
-from users.api.app_user import AppUser
 from base.viewModels.lines_view_model import LinesViewModel
+from base.views.mixins import AsyncUserMixin
+from base.views.conditional import ConditionalPageMixin
+from base.api.lines_api_view import LINE_FIELDS
+from base.views.partial import partial_mode, partial_added, partial_removed, partial_errors, as_row, JSON
 
-class LinesView(View):
+class LinesView(AsyncUserMixin, ConditionalPageMixin, View):
     """
     A class-based view for displaying and adding lines to an exercise.
+    Async, so it runs on the event loop under ASGI.
+    Unchanged pages are answered with 304, see base/views/conditional.py.
     """
-    def setup(self, request, *args, **kwargs):
+    def setup_for_user(self, request):
         """
-        Initialize view_model before dispatch.
-        Called by Django for each request.
+        Initialize view_model once the user is loaded.
+        Called by the mixin for each request, before the handler.
         """
-        super().setup(request, *args, **kwargs)
         self.view_model = LinesViewModel(request.user)
     
     
-    def get(self, request, session_slug, exercise_slug):
+    async def get(self, request, session_slug, exercise_slug):
         """
         Handle GET requests to display the details of lines in an exercise.
         """
-        context = self._get_context(session_slug, exercise_slug)
+        context = await self._get_context(session_slug, exercise_slug, request.GET.get('cursor'))
         
         return render(request, 'base/lines.html', context)
     
     
-    def post(self, request, session_slug, exercise_slug):
+    async def post(self, request, session_slug, exercise_slug):
         """
-        Handle POST requests to process the form to add a new line.
+        Handle POST requests to process the form to add a new line or delete one.
+        Clients sending X-Partial get only the changed row, see base/views/partial.py.
         """
         if 'delete_line' in request.POST:
-            return self._handle_delete_line(request)
+            return await self._handle_delete_line(request)
         else:
-            exercise = self.view_model.get_exercise(session_slug, exercise_slug)
-            return self._handle_add_line(request, exercise)
+            exercise = await self.view_model.aget_exercise(session_slug, exercise_slug)
+            return await self._handle_add_line(request, exercise)
         
     
     
-    def _get_context(self, session_slug, exercise_slug):
+    async def _get_context(self, session_slug, exercise_slug, cursor=None):
         """
         Get the context for the view.
+        cursor = None: newest page of lines
         
         Returns:
             dict: The context for the view.
         """
-        exercise = self.view_model.get_exercise(session_slug, exercise_slug)
-        lines = self.view_model.get_lines(session_slug, exercise_slug)
+        exercise = await self.view_model.aget_exercise(session_slug, exercise_slug)
+        page = await self.view_model.aget_lines_page(session_slug, exercise_slug, cursor)
+        records = await self.view_model.aget_records(session_slug, exercise_slug)
+        table_version = await self.view_model.aget_table_version(session_slug, exercise_slug)
         form = self.view_model.get_line_form()
         
         return {
             'exercise': exercise,
-            'lines': lines,
+            'lines': page.lines,
+            'cursor': cursor,
+            'next_cursor': page.next_cursor,
+            'table_version': table_version,
+            'records': records,
+            'record_line_ids': {record.line_id for record in records},
             'form': form
         }
         
     
-    def _handle_add_line(self, request, exercise):
+    async def _handle_add_line(self, request, exercise):
         """
         Handle adding a line.
         
@@ -77,22 +88,35 @@ class LinesView(View):
             try:
                 # Using form data, create a new line for user.
                 line = self.view_model.create_line(form, exercise)
-                line.save()
+                await line.asave()
+                if partial_mode(request):
+                    return await self._partial_added_line(request, exercise, line)
                 return redirect('lines', session_slug=session.slug, exercise_slug=exercise.slug)
             except ValidationError as e:
                 form.add_error(None, e)
         
+        if partial_mode(request):
+            return partial_errors(request, form)
+        
         # If form is invalid, display the form with the errors.
+        page = await self.view_model.aget_lines_page(session.slug, exercise.slug)
+        records = await self.view_model.aget_records(session.slug, exercise.slug)
+        table_version = await self.view_model.aget_table_version(session.slug, exercise.slug)
         context = {
             'exercise': exercise,
-            'lines': self.view_model.get_lines(session.slug, exercise.slug),
+            'lines': page.lines,
+            'cursor': None,
+            'next_cursor': page.next_cursor,
+            'table_version': table_version,
+            'records': records,
+            'record_line_ids': {record.line_id for record in records},
             'form': form
         }
         
         return render(request, 'base/lines.html', context)
     
     
-    def _handle_delete_line(self, request):
+    async def _handle_delete_line(self, request):
         """
         Handle deleting a line.
         """
@@ -100,7 +124,42 @@ class LinesView(View):
         exercise_slug = request.POST.get('exercise_slug')
         session_slug = request.POST.get('session_slug')
         
-        self.view_model.delete_line(session_slug, exercise_slug, line_id)
+        deleted_id = await self.view_model.adelete_line(session_slug, exercise_slug, line_id)
         
+        if partial_mode(request):
+            return await self._partial_removed_line(request, session_slug, exercise_slug, deleted_id)
         return redirect('lines', session_slug=session_slug, exercise_slug=exercise_slug)
+    
+    
+    async def _partial_added_line(self, request, exercise, line):
+        """
+        Respond to an added line with its row. The JSON diff also lists the lines holding
+        a personal record, as the new line may have taken one from a line already shown.
+        """
+        record_line_ids = await self._get_record_line_ids(exercise.session.slug, exercise.slug)
+        
+        return partial_added(
+            request, 'base/line_row.html', {'line': line, 'record_line_ids': record_line_ids}, as_row(line, LINE_FIELDS),
+            record_line_ids=sorted(record_line_ids - {None}),
+        )
+    
+    
+    async def _partial_removed_line(self, request, session_slug, exercise_slug, line_id):
+        """
+        Respond to a deleted line. The JSON diff also lists the lines holding a personal
+        record, as a line already shown may have taken over the deleted line's record.
+        """
+        if partial_mode(request) == JSON:
+            record_line_ids = await self._get_record_line_ids(session_slug, exercise_slug)
+            return partial_removed(request, {'id': line_id}, record_line_ids=sorted(record_line_ids - {None}))
+        
+        return partial_removed(request, {'id': line_id})
+    
+    
+    async def _get_record_line_ids(self, session_slug, exercise_slug):
+        """
+        Get the ids of the lines holding a personal record of the exercise.
+        """
+        records = await self.view_model.aget_records(session_slug, exercise_slug)
+        return {record.line_id for record in records}
         
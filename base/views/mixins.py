@@ -0,0 +1,64 @@
+"""
+Author: Joshua Delos Santos
+Date: 18/10/2026
+
+
+This file defines the mixins shared by the async views.
+
+request.user is a lazy object that loads the user with the sync ORM the
+first time it is used, which raises SynchronousOnlyOperation inside an
+async view (and the templates use it through user.is_authenticated).
+These mixins resolve the user once with request.auser() before the
+handler runs and put the loaded user back on request.user. Views set up
+anything that needs the user, such as their view model, in
+setup_for_user(), which runs once the user is loaded.
+
+
+Example:
+    class SessionsView(AsyncLoginRequiredMixin, View):
+        def setup_for_user(self, request):
+            self.view_model = SessionsViewModel(request.user)
+
+        async def get(self, request):
+            ...
+"""
+
+
+from django.contrib.auth.mixins import AccessMixin
+
+
+class AsyncUserMixin:
+    """
+    Resolve request.user with the async auth API before dispatching to an async handler.
+    """
+    async def dispatch(self, request, *args, **kwargs):
+        """
+        Load the user, then dispatch as usual.
+        """
+        request.user = await request.auser()
+        self.setup_for_user(request)
+        return await super().dispatch(request, *args, **kwargs)
+
+
+    def setup_for_user(self, request):
+        """
+        Initialise per-request state that needs the loaded user. Does nothing by default.
+        """
+
+
+
+class AsyncLoginRequiredMixin(AccessMixin, AsyncUserMixin):
+    """
+    Async counterpart of LoginRequiredMixin: redirect anonymous users to the login page.
+    """
+    async def dispatch(self, request, *args, **kwargs):
+        """
+        Load the user and reject anonymous requests before dispatching.
+        """
+        request.user = await request.auser()
+
+        if not request.user.is_authenticated:
+            return self.handle_no_permission()
+
+        self.setup_for_user(request)
+        return await super(AsyncUserMixin, self).dispatch(request, *args, **kwargs)
@@ -0,0 +1,93 @@
+"""
+Author: Joshua Delos Santos
+Date: 18/10/2026
+
+
+This file builds the partial responses of the add and delete forms.
+
+By default an add or delete ends in a redirect and the browser loads the
+whole page again. A client that updates the page in place sends the
+X-Partial header instead and gets only what changed:
+
+    X-Partial: row     the HTML of the added row (201), nothing for a
+                       removed one (204), the form errors as HTML (400)
+    X-Partial: json    a JSON diff, {"added": [row]} (201) or
+                       {"removed": [row]} (200), {"errors": {...}} (400)
+
+Requests without the header, such as plain form posts, keep the redirect.
+
+
+Example:
+    if partial_mode(request):
+        return partial_added(request, 'base/line_row.html', {'line': line}, {'id': line.id})
+    return redirect('lines', session_slug=session.slug, exercise_slug=exercise.slug)
+"""
+
+
+from django.http import HttpResponse, JsonResponse
+from django.template.loader import render_to_string
+
+
+PARTIAL_HEADER = 'X-Partial'
+ROW = 'row'
+JSON = 'json'
+
+
+
+def partial_mode(request):
+    """
+    Return the partial mode the client asked for, ROW or JSON, None for a full page flow.
+    """
+    mode = request.headers.get(PARTIAL_HEADER, '').strip().lower()
+    return mode if mode in (ROW, JSON) else None
+
+
+
+def as_row(obj, fields):
+    """
+    Return the given fields of a model instance as a JSON row, shaped like the API's values() rows.
+    """
+    return {field: getattr(obj, field) for field in fields}
+
+
+
+def partial_added(request, template, context, row, **extra):
+    """
+    Respond to an add with the rendered row or a JSON diff.
+
+    Args:
+        template (str): The template of one table row.
+        context (dict): The context of the row template.
+        row (dict): The added object as JSON.
+        extra: More keys of the JSON diff.
+    """
+    if partial_mode(request) == JSON:
+        return JsonResponse({'added': [row], **extra}, status=201)
+
+    return HttpResponse(render_to_string(template, context, request), status=201)
+
+
+
+def partial_removed(request, row, **extra):
+    """
+    Respond to a delete with no content or a JSON diff.
+
+    Args:
+        row (dict): Identifies the removed object, e.g. {'id': 3}.
+        extra: More keys of the JSON diff.
+    """
+    if partial_mode(request) == JSON:
+        return JsonResponse({'removed': [row], **extra})
+
+    return HttpResponse(status=204)
+
+
+
+def partial_errors(request, form):
+    """
+    Respond to an invalid add with the form errors.
+    """
+    if partial_mode(request) == JSON:
+        return JsonResponse({'errors': form.errors.get_json_data()}, status=400)
+
+    return HttpResponse(form.errors.as_ul(), status=400)
@@ -3,71 +3,78 @@ Author: Joshua Delos Santos
 Date: 28/10/2024
 """
 
-from django.shortcuts import render, redirect, get_object_or_404
-from django.contrib.auth.mixins import LoginRequiredMixin
+from django.shortcuts import render, redirect
 from django.views import View
+from base.views.mixins import AsyncLoginRequiredMixin
+from base.views.conditional import ConditionalPageMixin
 from base.viewModels.sessions_view_model import SessionsViewModel
 from django.core.exceptions import ValidationError
+from base.api.sessions_api_view import SESSION_FIELDS
+from base.views.partial import partial_mode, partial_added, partial_removed, partial_errors, as_row
 
 
-class SessionsView(LoginRequiredMixin, View):
+class SessionsView(AsyncLoginRequiredMixin, ConditionalPageMixin, View):
     """
     View to display and add sessions for the authenticated user.
+    Async, so it runs on the event loop under ASGI.
+    Unchanged pages are answered with 304, see base/views/conditional.py.
     """
-    def setup(self, request, *args, **kwargs):
+    def setup_for_user(self, request):
         """
-        Initialize view_model before dispatch.
-        Called by Django for each request.
+        Initialize view_model once the user is loaded.
+        Called by the mixin for each request, before the handler.
         """
-        super().setup(request, *args, **kwargs)
         self.view_model = SessionsViewModel(request.user)
         
         
-    def get(self, request):
+    async def get(self, request):
         """
         Handle GET requests: display the list of sessions and the form to add a new session.
         """ 
-        context = self._get_context()
+        context = await self._get_context()
         
         return render(request, 'base/sessions.html', context)
     
     
-    def post(self, request):
+    async def post(self, request):
         """
         Handle POST requests: process the form to add a new session or delete a session.
+        Clients sending X-Partial get only the changed row, see base/views/partial.py.
         """
         if 'delete_session' in request.POST:
-            self._handle_delete_session(request)
+            return await self._handle_delete_session(request)
         else:
-            return self._handle_add_session(request)
-        
-        context = self._get_context()
-        return render(request, 'base/sessions.html', context)
+            return await self._handle_add_session(request)
 
 
-    def _handle_delete_session(self, request):
+    async def _handle_delete_session(self, request):
         """
         Handle the deletion of a session.
         """
         session_slug = request.POST.get('session_slug')
-        self.view_model.delete_session_using_slug(session_slug)
+        session = await self.view_model.adelete_session_using_slug(session_slug)
+        
+        if partial_mode(request):
+            return partial_removed(request, {'id': session.id, 'slug': session.slug})
         return redirect('sessions')
     
     
-    def _get_context(self):
+    async def _get_context(self):
         """
         Get the context for the view.
         """
-        sessions = self.view_model.get_sessions()
+        sessions = await self.view_model.aget_sessions()
+        table_version = await self.view_model.aget_table_version()
         form = self.view_model.get_session_form()
         
         return {
             'sessions': sessions,
+            'table_version': table_version,
             'form': form
         }
     
     
-    def _handle_add_session(self, request):
+    async def _handle_add_session(self, request):
         """
         Handle adding a session.
         
@@ -81,14 +88,20 @@ class SessionsView(LoginRequiredMixin, View):
             try:
                 # Using form data, create a new session for user.
                 new_session = self.view_model.create_session(form)
-                new_session.save()
+                await new_session.asave()
+                if partial_mode(request):
+                    return partial_added(request, 'base/session_row.html', {'session': new_session}, as_row(new_session, SESSION_FIELDS))
                 return redirect('sessions')
             except ValidationError as e:
                 form.add_error('name', e)
         
+        if partial_mode(request):
+            return partial_errors(request, form)
+        
         # If form is invalid, display the form with the errors.
         context = {
-            'sessions': self.view_model.get_sessions(),
+            'sessions': await self.view_model.aget_sessions(),
+            'table_version': await self.view_model.aget_table_version(),
             'form': form
         }
         
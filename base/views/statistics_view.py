@@ -0,0 +1,34 @@
+"""
+Author: Joshua Delos Santos
+Date: 18/10/2026
+"""
+
+from django.contrib.auth.mixins import LoginRequiredMixin
+from django.http import HttpResponseBadRequest
+from django.shortcuts import render
+from django.views import View
+from base.analytics import ANALYTICS_AVAILABLE, get_analytics
+from base.progress import DEFAULT_BUCKET, PROGRESS_BUCKETS, get_progress
+
+
+class StatisticsView(LoginRequiredMixin, View):
+    """
+    A class-based view for displaying the progress of every exercise of the authenticated user,
+    and its training analytics when NumPy is installed.
+
+    Query parameters:
+        bucket: 'day', 'week' (default) or 'month'
+    """
+    def get(self, request):
+        """
+        Handle GET requests: display the progress series for the requested bucket size.
+        """
+        bucket = request.GET.get('bucket', DEFAULT_BUCKET)
+        if bucket not in PROGRESS_BUCKETS:
+            return HttpResponseBadRequest(f"bucket must be one of: {', '.join(PROGRESS_BUCKETS)}.")
+
+        return render(request, 'statistics.html', {
+            'progress': get_progress(request.user, bucket),
+            'buckets': PROGRESS_BUCKETS,
+            'analytics': get_analytics(request.user) if ANALYTICS_AVAILABLE else None,
+        })
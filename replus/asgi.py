@@ -3,6 +3,14 @@ ASGI config for replus project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
 
+The page views are async and use the async ORM, so under an ASGI server
+(e.g. uvicorn replus.asgi:application) they run on the event loop. Each
+ASGI request gets its own database thread, so persistent connections
+would be left open in threads that never serve another request.
+DB_CONN_MAX_AGE therefore defaults to 0 here, closing connections at the
+end of the request, whatever the settings default for WSGI is. An
+explicit DB_CONN_MAX_AGE in the environment still wins.
+
 For more information on this file, see
 https://docs.djangoproject.com/en/5.1/howto/deployment/asgi/
 """
@@ -12,5 +20,6 @@ import os
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'replus.settings')
+os.environ.setdefault('DB_CONN_MAX_AGE', '0')  # Before the settings are read, see above
 
 application = get_asgi_application()
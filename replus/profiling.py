@@ -0,0 +1,225 @@
+"""
+Per-request profiling middleware
+
+Author: Joshua Delos Santos
+Date: 18/10/2026
+
+
+Measures, for a sample of requests, the number of SQL queries and the time
+spent in them, the time spent rendering templates and the total time of
+the request. The figures are sent in a Server-Timing header, which browser
+dev tools display, and written as one JSON log line to 'replus.profiling'.
+
+Enabled with PROFILING_ENABLED. When disabled the middleware raises
+MiddlewareNotUsed, so Django drops it from the chain, and the only cost
+left is one ContextVar read per template render. When enabled, unsampled
+requests also pay for one random() call and one ContextVar read per query.
+
+The middleware is sync and async capable, so under ASGI it does not adapt
+the async views to sync. The profile of a sampled request is held in a
+ContextVar, which sync_to_async() copies into the thread running the
+queries. Queries are timed by an execute wrapper added once to every
+database connection, when it opens or, for a connection that was already
+open, on its first sampled request. Templates are timed by the
+ProfilingDjangoTemplates backend set in TEMPLATES. Nothing global is
+patched or swapped per request.
+
+
+Settings:
+    PROFILING_ENABLED (bool): Turn profiling on.
+    PROFILING_SAMPLE_RATE (float): Fraction of requests to profile, 0-1.
+"""
+
+import json
+import logging
+import random
+from contextvars import ContextVar
+from time import perf_counter
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+from django.db.backends.signals import connection_created
+from django.template.backends.django import DjangoTemplates, Template
+
+
+logger = logging.getLogger('replus.profiling')
+
+# The profile of the request being handled, None when it is not sampled.
+_current_profile = ContextVar('replus_profile', default=None)
+
+
+
+class RequestProfile:
+    """
+    Timings collected for one request, in seconds.
+    """
+    __slots__ = ('db_time', 'db_queries', 'template_time')
+
+    def __init__(self):
+        self.db_time = 0.0
+        self.db_queries = 0
+        self.template_time = 0.0
+
+
+
+def time_query(execute, sql, params, many, context):
+    """
+    Database execute wrapper adding the query's duration to the current profile.
+    """
+    profile = _current_profile.get()
+    if profile is None:
+        return execute(sql, params, many, context)
+
+    start = perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        profile.db_time += perf_counter() - start
+        profile.db_queries += 1
+
+
+
+def install_query_timer(connection, **kwargs):
+    """
+    Add time_query to a database connection once. Connected to connection_created, so every
+    connection opened after the middleware is loaded is timed too.
+    """
+    if time_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(time_query)
+
+
+
+def install_query_timers():
+    """
+    Add time_query to the connections already open in this thread, which connection_created missed.
+    """
+    for connection in connections.all(initialized_only=True):
+        install_query_timer(connection)
+
+
+
+class ProfiledTemplate(Template):
+    """
+    Django template recording its render time in the current profile.
+    """
+    def render(self, context=None, request=None):
+        """
+        Render the template, timing it for sampled requests.
+        Queries run while rendering (e.g. lazy QuerySets) count as database time, not template time.
+        """
+        profile = _current_profile.get()
+        if profile is None:
+            return super().render(context, request)
+
+        start = perf_counter()
+        db_time_before = profile.db_time
+        try:
+            return super().render(context, request)
+        finally:
+            profile.template_time += (perf_counter() - start) - (profile.db_time - db_time_before)
+
+
+
+class ProfilingDjangoTemplates(DjangoTemplates):
+    """
+    The Django template backend, returning templates that report their render time to the profiler.
+    """
+    def from_string(self, template_code):
+        return ProfiledTemplate(self.engine.from_string(template_code), self)
+
+
+    def get_template(self, template_name):
+        return ProfiledTemplate(super().get_template(template_name).template, self)
+
+
+
+class ProfilingMiddleware:
+    """
+    Add Server-Timing headers and a structured log line to a sample of requests.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        """
+        Read the settings once; remove the middleware entirely when profiling is disabled.
+        Follows the chain's mode, so an async chain is not adapted to sync.
+        """
+        if not getattr(settings, 'PROFILING_ENABLED', False):
+            raise MiddlewareNotUsed
+
+        self.get_response = get_response
+        self.sample_rate = getattr(settings, 'PROFILING_SAMPLE_RATE', 0.01)
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+        connection_created.connect(install_query_timer, dispatch_uid='replus.profiling')
+
+
+    def __call__(self, request):
+        """
+        Profile the request if it is sampled.
+        """
+        if self.async_mode:
+            return self.__acall__(request)
+
+        if random.random() >= self.sample_rate:
+            return self.get_response(request)
+
+        install_query_timers()
+        profile = RequestProfile()
+        token = _current_profile.set(profile)
+        start = perf_counter()
+        try:
+            response = self.get_response(request)
+        finally:
+            _current_profile.reset(token)
+
+        return self.report(request, response, profile, perf_counter() - start)
+
+
+    async def __acall__(self, request):
+        """
+        Async version of __call__.
+        """
+        if random.random() >= self.sample_rate:
+            return await self.get_response(request)
+
+        await sync_to_async(install_query_timers)()  # In the thread the views' queries run in
+        profile = RequestProfile()
+        token = _current_profile.set(profile)
+        start = perf_counter()
+        try:
+            response = await self.get_response(request)
+        finally:
+            _current_profile.reset(token)
+
+        return self.report(request, response, profile, perf_counter() - start)
+
+
+    def report(self, request, response, profile, total):
+        """
+        Add the Server-Timing header to the response and log the profile.
+        """
+        timings = {
+            'db': profile.db_time,
+            'tpl': profile.template_time,
+            'view': max(total - profile.db_time - profile.template_time, 0.0),
+            'total': total,
+        }
+
+        response.headers['Server-Timing'] = ', '.join(
+            f'{name};dur={seconds * 1000:.2f}' + (f';desc="{profile.db_queries} queries"' if name == 'db' else '')
+            for name, seconds in timings.items()
+        )
+        logger.info(json.dumps({
+            'method': request.method,
+            'path': request.path,
+            'status': response.status_code,
+            'db_queries': profile.db_queries,
+            **{f'{name}_ms': round(seconds * 1000, 2) for name, seconds in timings.items()},
+        }))
+
+        return response
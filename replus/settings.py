@@ -39,7 +39,9 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'replus.profiling.ProfilingMiddleware',  # First, so its total covers every other middleware. Removed unless PROFILING_ENABLED.
     'django.middleware.security.SecurityMiddleware',
+    'replus.static_files.StaticFilesMiddleware',  # Before sessions, so static files skip them. Removed unless STATIC_PIPELINE.
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
@@ -48,11 +50,18 @@ MIDDLEWARE = [
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
 
+# Per-request profiling (replus/profiling.py): Server-Timing header and a JSON log line for sampled requests.
+PROFILING_ENABLED = config('PROFILING_ENABLED', default=False, cast=bool)
+PROFILING_SAMPLE_RATE = config('PROFILING_SAMPLE_RATE', default=0.01, cast=float)
+
+# Deleting a session or exercise only marks it, and the purge_deleted command removes it later (base/deletion.py).
+SOFT_DELETE = config('SOFT_DELETE', default=False, cast=bool)
+
 ROOT_URLCONF = 'replus.urls'
 
 TEMPLATES = [
     {
-        'BACKEND': 'django.template.backends.django.DjangoTemplates',
+        'BACKEND': 'replus.profiling.ProfilingDjangoTemplates',  # DjangoTemplates that report render times to replus/profiling.py
         'DIRS': [
             BASE_DIR / 'templates'],
         'APP_DIRS': True,
@@ -73,14 +82,71 @@ WSGI_APPLICATION = 'replus.wsgi.application'
 # Database
 # https://docs.djangoproject.com/en/5.1/ref/settings/#databases
 
+# SQLite performance profile, applied to every new connection:
+# WAL lets readers run alongside a writer, synchronous=NORMAL is safe under WAL,
+# busy_timeout waits for a lock instead of failing with "database is locked",
+# and IMMEDIATE transactions take the write lock up front so they cannot deadlock on upgrade.
+SQLITE_PERFORMANCE_PROFILE = config('SQLITE_PERFORMANCE_PROFILE', default=True, cast=bool)
+
+SQLITE_PRAGMAS = {
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',
+    'busy_timeout': config('SQLITE_BUSY_TIMEOUT_MS', default=5000, cast=int),
+    'cache_size': -config('SQLITE_CACHE_SIZE_KB', default=20000, cast=int),  # Negative means KiB rather than pages
+    'mmap_size': config('SQLITE_MMAP_SIZE', default=128 * 1024 * 1024, cast=int),
+    'temp_store': 'MEMORY',
+}
+
 DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
+        'NAME': config('SQLITE_PATH', default=str(BASE_DIR / 'db.sqlite3')),
+        # Seconds; None keeps connections forever. replus/asgi.py defaults it to 0, as ASGI requests each get their own thread.
+        'CONN_MAX_AGE': config('DB_CONN_MAX_AGE', default=600 if SQLITE_PERFORMANCE_PROFILE else 0, cast=int),
+        'CONN_HEALTH_CHECKS': True,
+        'OPTIONS': {
+            'init_command': ';'.join(f'PRAGMA {pragma}={value}' for pragma, value in SQLITE_PRAGMAS.items()),
+            'transaction_mode': 'IMMEDIATE',
+        } if SQLITE_PERFORMANCE_PROFILE else {},
+    }
+}
+
+
+# Cache
+# https://docs.djangoproject.com/en/5.1/topics/cache/
+# Holds the per-user data versions and listings (see base/listing_cache.py), which also key the page ETags.
+# The versions need an atomic incr(), which the file-based and database backends lack, so startup
+# refuses them. Local memory is per process, so a write in one worker would not invalidate another's
+# listings and pages: with several workers use Redis (django.core.cache.backends.redis.RedisCache) or
+# Memcached (django.core.cache.backends.memcached.PyMemcacheCache). WEB_CONCURRENCY, the worker count
+# gunicorn and uvicorn read, must be set when running several, and startup fails if the cache is per
+# process (base/data_version.py).
+WEB_CONCURRENCY = config('WEB_CONCURRENCY', default=1, cast=int)
+
+CACHES = {
+    'default': {
+        'BACKEND': config('CACHE_BACKEND', default='django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': config('CACHE_LOCATION', default='replus'),  # e.g. redis://127.0.0.1:6379 for RedisCache
     }
 }
 
 
+# Logging
+# https://docs.djangoproject.com/en/5.1/topics/logging/
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {'class': 'logging.StreamHandler'},
+    },
+    'loggers': {
+        'replus.profiling': {'handlers': ['console'], 'level': 'INFO', 'propagate': False},
+        'replus.static_files': {'handlers': ['console'], 'level': 'WARNING', 'propagate': False},
+    },
+}
+
+
 # Password validation
 # https://docs.djangoproject.com/en/5.1/ref/settings/#auth-password-validators
 
@@ -121,6 +187,23 @@ STATICFILES_DIRS = [
     os.path.join(BASE_DIR, 'static')
 ]
 
+# Production static pipeline (replus/static_files.py): collectstatic writes content-hashed files with gzip
+# and brotli variants to STATIC_ROOT, and the middleware serves them with immutable caching.
+# Needs `collectstatic` to have run, as {% static %} then looks every name up in the manifest.
+STATIC_PIPELINE = config('STATIC_PIPELINE', default=False, cast=bool)
+
+STATIC_ROOT = config('STATIC_ROOT', default=str(BASE_DIR / 'staticfiles'))
+
+STORAGES = {
+    'default': {
+        'BACKEND': 'django.core.files.storage.FileSystemStorage',
+    },
+    'staticfiles': {
+        'BACKEND': 'replus.static_files.PrecompressedManifestStaticFilesStorage' if STATIC_PIPELINE
+        else 'django.contrib.staticfiles.storage.StaticFilesStorage',
+    },
+}
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.1/ref/settings/#default-auto-field
 
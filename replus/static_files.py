@@ -0,0 +1,239 @@
+"""
+Production static files: hashed names, precompressed variants and long-lived caching
+
+Author: Joshua Delos Santos
+Date: 18/10/2026
+
+
+PrecompressedManifestStaticFilesStorage is the storage collectstatic uses
+when STATIC_PIPELINE is on. It is Django's ManifestStaticFilesStorage, so
+every file is copied under a name carrying a hash of its content
+(css/style.3f2a1c9b7e4d.css) and {% static %} looks the name up in the
+manifest. After hashing, each hashed text file also gets a gzip (.gz) and,
+when the optional brotli package is installed, a brotli (.br) variant,
+compressed once at build time at the highest level instead of per request.
+Without brotli, collectstatic logs a warning to 'replus.static_files'.
+
+StaticFilesMiddleware serves STATIC_ROOT from Django itself, without a
+separate web server. It picks the smallest variant the client accepts from
+its Accept-Encoding header and sends it with Content-Encoding and
+Vary: Accept-Encoding. Hashed names never change content, so they are sent
+with a one year immutable Cache-Control and browsers stop revalidating
+them; any other file is sent with no-cache and Last-Modified. A 304
+carries the same caching headers as the 200 it stands for. It sits
+before the session and auth middleware, so a static request costs no
+session lookup. It is sync and async capable, so under ASGI requests stay
+on the event loop; only the file lookup of a static request runs in a
+thread. When STATIC_PIPELINE is off the middleware raises
+MiddlewareNotUsed and DEBUG serving works as before.
+
+
+Settings:
+    STATIC_PIPELINE (bool): Use the hashed, precompressed storage and serve it.
+    STATIC_ROOT (str): Where collectstatic writes the files and the middleware reads them.
+
+Example:
+    STATIC_PIPELINE=True python manage.py collectstatic --noinput
+"""
+
+import gzip
+import logging
+import mimetypes
+import os
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.contrib.staticfiles.storage import ManifestStaticFilesStorage, staticfiles_storage
+from django.core.exceptions import MiddlewareNotUsed, SuspiciousFileOperation
+from django.core.files.base import ContentFile
+from django.http import FileResponse, HttpResponseNotModified
+from django.utils._os import safe_join
+from django.utils.http import http_date
+from django.views.static import was_modified_since
+
+try:
+    import brotli
+except ImportError:  # Optional dependency, only gzip variants are built without it
+    brotli = None
+
+
+logger = logging.getLogger('replus.static_files')
+
+
+COMPRESSIBLE_EXTENSIONS = ('.css', '.js', '.map', '.svg', '.json', '.txt', '.html', '.xml', '.ico')
+MIN_SAVING = 0.05  # A variant less than 5% smaller than the file is not worth a separate response
+IMMUTABLE_CACHE_CONTROL = 'public, max-age=31536000, immutable'
+REVALIDATE_CACHE_CONTROL = 'no-cache'
+ENCODINGS = [('br', '.br'), ('gzip', '.gz')]  # In order of preference, the smallest first
+
+
+
+def compress(data):
+    """
+    Compress data with every available encoding.
+
+    Returns:
+        dict: {suffix: compressed bytes} of the variants worth keeping.
+    """
+    variants = {'.gz': gzip.compress(data, compresslevel=9, mtime=0)}  # mtime=0 keeps builds reproducible
+    if brotli is not None:
+        variants['.br'] = brotli.compress(data, quality=11)
+
+    return {suffix: variant for suffix, variant in variants.items() if len(variant) <= len(data) * (1 - MIN_SAVING)}
+
+
+
+def accepts_encoding(header, encoding):
+    """
+    Whether an Accept-Encoding header accepts an encoding, honouring q=0 and the * wildcard.
+    """
+    qualities = {}
+    for item in header.split(','):
+        coding, *params = [part.strip() for part in item.split(';')]
+        quality = 1.0
+        for param in params:
+            name, _, value = param.partition('=')
+            if name.strip().lower() == 'q':
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        if coding:
+            qualities[coding.lower()] = quality
+
+    return qualities.get(encoding, qualities.get('*', 0.0)) > 0
+
+
+
+class PrecompressedManifestStaticFilesStorage(ManifestStaticFilesStorage):
+    """
+    Manifest storage that also writes gzip and brotli variants of the hashed text files.
+    """
+    def post_process(self, paths, dry_run=False, **options):
+        """
+        Hash the files as usual, then compress every hashed file once.
+        """
+        hashed_names = set()
+        for name, hashed_name, processed in super().post_process(paths, dry_run, **options):
+            if not isinstance(processed, Exception) and hashed_name:
+                hashed_names.add(hashed_name)
+            yield name, hashed_name, processed
+
+        if not dry_run:
+            if brotli is None:
+                logger.warning("brotli is not installed, so only gzip variants are written. Install it for smaller static files.")
+            for hashed_name in sorted(hashed_names):
+                if hashed_name.endswith(COMPRESSIBLE_EXTENSIONS):
+                    self._write_variants(hashed_name)
+
+
+    def _write_variants(self, name):
+        """
+        Write the compressed variants of a file next to it, replacing older ones.
+        """
+        with self.open(name) as file:
+            data = file.read()
+
+        for suffix, variant in compress(data).items():
+            if self.exists(name + suffix):
+                self.delete(name + suffix)
+            self._save(name + suffix, ContentFile(variant))
+
+
+
+class StaticFilesMiddleware:
+    """
+    Serve STATIC_ROOT with content-encoding negotiation and immutable caching of hashed names.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        """
+        Read the settings and the manifest once; remove the middleware when the pipeline is off.
+        Follows the chain's mode, so an async chain is not adapted to sync.
+        """
+        if not getattr(settings, 'STATIC_PIPELINE', False) or not settings.STATIC_ROOT:
+            raise MiddlewareNotUsed
+
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+        self.root = str(settings.STATIC_ROOT)
+        self.prefix = settings.STATIC_URL  # Already starts with the script prefix
+        self.immutable = set(getattr(staticfiles_storage, 'hashed_files', {}).values())
+
+
+    def __call__(self, request):
+        """
+        Answer GET and HEAD requests for existing static files, pass everything else on.
+        """
+        if self.async_mode:
+            return self.__acall__(request)
+
+        name = self.static_name(request)
+        if name is not None:
+            response = self.serve(request, name)
+            if response is not None:
+                return response
+
+        return self.get_response(request)
+
+
+    async def __acall__(self, request):
+        """
+        Async version of __call__. Only static requests leave the event loop, for the file system calls.
+        """
+        name = self.static_name(request)
+        if name is not None:
+            response = await sync_to_async(self.serve)(request, name)
+            if response is not None:
+                return response
+
+        return await self.get_response(request)
+
+
+    def static_name(self, request):
+        """
+        Return the file name a GET or HEAD request asks for under STATIC_URL, None for other requests.
+        """
+        if request.method in ('GET', 'HEAD') and request.path.startswith(self.prefix):
+            return request.path[len(self.prefix):]
+        return None
+
+
+    def serve(self, request, name):
+        """
+        Build the response for a static file, None when there is no such file.
+        """
+        try:
+            path = safe_join(self.root, name)
+        except SuspiciousFileOperation:
+            return None
+        if not os.path.isfile(path):
+            return None
+
+        modified = os.stat(path).st_mtime
+        headers = {
+            'Vary': 'Accept-Encoding',
+            'Last-Modified': http_date(modified),
+            'Cache-Control': IMMUTABLE_CACHE_CONTROL if name in self.immutable else REVALIDATE_CACHE_CONTROL,
+        }
+        if not was_modified_since(request.headers.get('If-Modified-Since'), modified):
+            return HttpResponseNotModified(headers=headers)  # A 304 carries the headers the 200 would have
+
+        accept_encoding = request.headers.get('Accept-Encoding', '')
+        encoding, served_path = next(
+            ((encoding, path + suffix) for encoding, suffix in ENCODINGS
+             if accepts_encoding(accept_encoding, encoding) and os.path.isfile(path + suffix)),
+            (None, path),
+        )
+
+        content_type = mimetypes.guess_type(path)[0] or 'application/octet-stream'
+        response = FileResponse(open(served_path, 'rb'), content_type=content_type, headers=headers)
+        del response.headers['Content-Disposition']  # Set from the file's name, it would name the .gz or .br variant
+        if encoding:
+            response.headers['Content-Encoding'] = encoding
+
+        return response
@@ -11,5 +11,6 @@ from django.urls import path, include
 urlpatterns = [
     path('admin/', admin.site.urls),
     path('', include('base.urls')),  # Include urls from the base app
-    path('users/', include('users.urls'))  # Include urls from the users app
+    path('users/', include('users.urls')),  # Include urls from the users app
+    path('api/v1/', include('base.api.urls')),  # Versioned JSON API for the mobile client
 ]
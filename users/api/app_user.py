@@ -6,7 +6,9 @@ Date: 21/10/2024
 
 from django.contrib.auth.models import User
 from django.shortcuts import get_object_or_404
-from base.models import Session, Exercise, Line
+from base.models import Session, Exercise, Line, PersonalRecord
+from base.pagination import LINES_PAGE_SIZE, paginate_lines, apaginate_lines
+from base.listing_cache import listing_cache
 
 
 class AppUser:
@@ -21,6 +23,11 @@ class AppUser:
         user_sessions = app_user.get_user_sessions()
         user_exercises = app_user.get_user_exercises()
         user_lines = app_user.get_user_lines()
+        cached_sessions = app_user.get_cached_user_sessions()
+        first_page = app_user.get_user_lines_page()
+        older_page = app_user.get_user_lines_page(first_page.next_cursor)
+        cached_sessions = await app_user.aget_cached_user_sessions()  # From async views
+        records = app_user.get_cached_exercise_records(exercise)
     """
 
 
@@ -44,6 +51,30 @@ class AppUser:
         return Session.objects.filter(user=self.user)
 
 
+    def get_cached_user_sessions(self):
+        """
+        Returns all sessions associated with the user, served from the listing cache
+        until the user's data changes.
+
+        Returns:
+            list: The user's sessions.
+        """
+        return listing_cache.get_or_load(self.user.id, 'sessions', lambda: list(self.get_user_sessions()))
+
+
+    async def aget_cached_user_sessions(self):
+        """
+        Async version of get_cached_user_sessions.
+
+        Returns:
+            list: The user's sessions.
+        """
+        async def load():
+            return [session async for session in self.get_user_sessions()]
+
+        return await listing_cache.aget_or_load(self.user.id, 'sessions', load)
+
+
     def get_user_exercises(self):
         """
         Returns all exercises associated with the user through sessions.
@@ -65,28 +96,233 @@ class AppUser:
             QuerySet: A QuerySet containing the exercises for the specified session.
         """
         session = get_object_or_404(Session, slug=session_slug, user=self.user)
+        return self.get_session_exercises(session)
+
+
+    def get_session_exercises(self, session):
+        """
+        Returns exercises associated with the user for an already resolved session.
+
+        Args:
+            session (Session): The session to filter exercises by.
+
+        Returns:
+            QuerySet: A QuerySet containing the exercises for the specified session.
+        """
         return Exercise.objects.filter(session=session, user=self.user)
 
 
+    def get_cached_session_exercises(self, session):
+        """
+        Returns exercises for an already resolved session, served from the listing cache
+        until the user's data changes.
+
+        Args:
+            session (Session): The session to filter exercises by.
+
+        Returns:
+            list: The exercises for the specified session.
+        """
+        return listing_cache.get_or_load(
+            self.user.id, f'exercises:{session.id}', lambda: list(self.get_session_exercises(session))
+        )
+
+
+    async def aget_cached_session_exercises(self, session):
+        """
+        Async version of get_cached_session_exercises.
+
+        Args:
+            session (Session): The session to filter exercises by.
+
+        Returns:
+            list: The exercises for the specified session.
+        """
+        async def load():
+            return [exercise async for exercise in self.get_session_exercises(session)]
+
+        return await listing_cache.aget_or_load(self.user.id, f'exercises:{session.id}', load)
+
+
     def get_user_lines(self):
         """
         Returns all lines associated with the user's exercises.
+        Lines of soft-deleted exercises are left out until they are purged.
 
         Returns:
             QuerySet: A QuerySet containing the lines related to the user's exercises.
         """
-        return Line.objects.filter(exercise__session__user=self.user)
+        deleted_exercises = Exercise.all_objects.filter(user=self.user, deleted_at__isnull=False)
+        return Line.objects.filter(user=self.user).exclude(exercise__in=deleted_exercises)
+
+
+    def get_user_lines_page(self, cursor=None, page_size=LINES_PAGE_SIZE):
+        """
+        Returns one page of the user's lines, newest first.
+
+        Args:
+            cursor (str): The cursor returned with the previous page. None for the first page.
+            page_size (int): The maximum number of lines on the page.
+
+        Returns:
+            LinePage: The lines on the page and the cursor of the next (older) page.
+        """
+        return paginate_lines(self.get_user_lines(), cursor, page_size)
 
 
-    def get_lines_for_exercise(self, exercise_slug):
+    def get_lines_for_exercise(self, exercise_slug, session_slug=None):
         """
         Returns lines associated with the user filtered by the selected exercise slug.
 
         Args:
             exercise_slug (str): The slug of the exercise to filter lines by.
+            session_slug (str): The slug of the exercise's session. Exercise slugs are only
+                unique within a session, so pass it when the user may have several.
+
+        Returns:
+            QuerySet: A QuerySet containing the lines for the specified exercise.
+        """
+        lookup = {'session__slug': session_slug} if session_slug else {}
+        exercise = get_object_or_404(Exercise, slug=exercise_slug, session__user=self.user, **lookup)
+        return self.get_exercise_lines(exercise)
+
+
+    def get_exercise_lines(self, exercise):
+        """
+        Returns lines for an already resolved exercise of the user.
+
+        Args:
+            exercise (Exercise): The exercise to filter lines by.
 
         Returns:
             QuerySet: A QuerySet containing the lines for the specified exercise.
         """
-        exercise = get_object_or_404(Exercise, slug=exercise_slug, session__user=self.user)
         return Line.objects.filter(exercise=exercise)
+
+
+    def get_lines_page_for_exercise(self, exercise_slug, cursor=None, page_size=LINES_PAGE_SIZE, session_slug=None):
+        """
+        Returns one page of the lines for the selected exercise slug, newest first.
+
+        Args:
+            exercise_slug (str): The slug of the exercise to filter lines by.
+            cursor (str): The cursor returned with the previous page. None for the first page.
+            page_size (int): The maximum number of lines on the page.
+            session_slug (str): The slug of the exercise's session, see get_lines_for_exercise.
+
+        Returns:
+            LinePage: The lines on the page and the cursor of the next (older) page.
+        """
+        return paginate_lines(self.get_lines_for_exercise(exercise_slug, session_slug), cursor, page_size)
+
+
+    def get_exercise_lines_page(self, exercise, cursor=None, page_size=LINES_PAGE_SIZE):
+        """
+        Returns one page of the lines for an already resolved exercise, newest first.
+
+        Args:
+            exercise (Exercise): The exercise to filter lines by.
+            cursor (str): The cursor returned with the previous page. None for the first page.
+            page_size (int): The maximum number of lines on the page.
+
+        Returns:
+            LinePage: The lines on the page and the cursor of the next (older) page.
+        """
+        return paginate_lines(self.get_exercise_lines(exercise), cursor, page_size)
+
+
+    def get_cached_exercise_lines_page(self, exercise, cursor=None, page_size=LINES_PAGE_SIZE):
+        """
+        Returns one page of the lines for an already resolved exercise, served from the
+        listing cache until the user's data changes.
+
+        Args:
+            exercise (Exercise): The exercise to filter lines by.
+            cursor (str): The cursor returned with the previous page. None for the first page.
+            page_size (int): The maximum number of lines on the page.
+
+        Returns:
+            LinePage: The lines on the page and the cursor of the next (older) page.
+        """
+        return listing_cache.get_or_load(
+            self.user.id,
+            f'lines:{exercise.id}:{page_size}:{cursor or ""}',
+            lambda: self.get_exercise_lines_page(exercise, cursor, page_size),
+        )
+
+
+    async def aget_exercise_lines_page(self, exercise, cursor=None, page_size=LINES_PAGE_SIZE):
+        """
+        Async version of get_exercise_lines_page.
+
+        Returns:
+            LinePage: The lines on the page and the cursor of the next (older) page.
+        """
+        return await apaginate_lines(self.get_exercise_lines(exercise), cursor, page_size)
+
+
+    async def aget_cached_exercise_lines_page(self, exercise, cursor=None, page_size=LINES_PAGE_SIZE):
+        """
+        Async version of get_cached_exercise_lines_page.
+
+        Returns:
+            LinePage: The lines on the page and the cursor of the next (older) page.
+        """
+        return await listing_cache.aget_or_load(
+            self.user.id,
+            f'lines:{exercise.id}:{page_size}:{cursor or ""}',
+            lambda: self.aget_exercise_lines_page(exercise, cursor, page_size),
+        )
+
+
+    def get_exercise_records(self, exercise):
+        """
+        Returns the personal records of an already resolved exercise of the user.
+        The records table is kept up to date as lines change, so no lines are read.
+
+        Args:
+            exercise (Exercise): The exercise to filter records by.
+
+        Returns:
+            QuerySet: A QuerySet of the exercise's PersonalRecords, fewest reps first.
+        """
+        return PersonalRecord.objects.filter(exercise=exercise, user=self.user).order_by('reps')
+
+
+    def get_cached_exercise_records(self, exercise):
+        """
+        Returns the personal records of an already resolved exercise, served from the
+        listing cache until the user's data changes.
+
+        Args:
+            exercise (Exercise): The exercise to filter records by.
+
+        Returns:
+            list: The exercise's PersonalRecords, fewest reps first.
+        """
+        return listing_cache.get_or_load(
+            self.user.id, f'records:{exercise.id}', lambda: list(self.get_exercise_records(exercise)),
+        )
+
+
+    async def aget_cached_exercise_records(self, exercise):
+        """
+        Async version of get_cached_exercise_records.
+
+        Returns:
+            list: The exercise's PersonalRecords, fewest reps first.
+        """
+        async def load():
+            return [record async for record in self.get_exercise_records(exercise)]
+
+        return await listing_cache.aget_or_load(self.user.id, f'records:{exercise.id}', load)
+
+
+    def get_user_records(self):
+        """
+        Returns the personal records of all the user's exercises.
+
+        Returns:
+            QuerySet: A QuerySet of the user's PersonalRecords by exercise, fewest reps first.
+        """
+        return PersonalRecord.objects.filter(user=self.user).order_by('exercise_id', 'reps')
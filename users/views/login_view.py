@@ -5,26 +5,28 @@ Date: 28/10/2024
 
 from django.shortcuts import render, redirect
 from django.contrib.auth.forms import AuthenticationForm
-from django.contrib.auth import login
+from django.contrib.auth import alogin
 from django.views import View
+from asgiref.sync import sync_to_async
+from base.views.mixins import AsyncUserMixin
 
-class LoginView(View):
+class LoginView(AsyncUserMixin, View):
     """
     Handle user login.
     """
-    def get(self, request):
+    async def get(self, request):
         """
         Handle GET requests: instantiate a blank version of the form.
         """
         form = AuthenticationForm()
         return render(request, 'users/login.html', {"form": form})
 
-    def post(self, request):
+    async def post(self, request):
         """
         Handle POST requests: instantiate a form instance with the passed POST variables and then check if it's valid.
         """
         form = AuthenticationForm(data=request.POST)
-        if form.is_valid():
-            login(request, form.get_user())
+        if await sync_to_async(form.is_valid)():  # authenticate() is sync and hashes the password, keep it off the event loop
+            await alogin(request, form.get_user())
             return redirect('sessions')
         return render(request, 'users/login.html', {"form": form})
\ No newline at end of file
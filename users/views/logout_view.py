@@ -4,16 +4,16 @@ Date: 28/10/2024
 """
 
 from django.shortcuts import redirect
-from django.contrib.auth import logout
+from django.contrib.auth import alogout
 from django.views import View
 
 class LogoutView(View):
     """
     Handle user logout.
     """
-    def post(self, request):
+    async def post(self, request):
         """
         Handle POST requests: log out the user and redirect to the home page.
         """
-        logout(request)
+        await alogout(request)
         return redirect('home')
\ No newline at end of file
@@ -5,27 +5,29 @@ Date: 28/10/2024
 
 from django.shortcuts import render, redirect
 from django.contrib.auth.forms import UserCreationForm
-from django.contrib.auth import login
+from django.contrib.auth import alogin
 from django.views import View
+from asgiref.sync import sync_to_async
+from base.views.mixins import AsyncUserMixin
 
-class RegisterView(View):
+class RegisterView(AsyncUserMixin, View):
     """
     Handle user registration.
     """
-    def get(self, request):
+    async def get(self, request):
         """
         Handle GET requests: instantiate a blank version of the form.
         """
         form = UserCreationForm()
         return render(request, 'users/register.html', {"form": form})
 
-    def post(self, request):
+    async def post(self, request):
         """
         Handle POST requests: instantiate a form instance with the passed POST variables and then check if it's valid.
         """
         form = UserCreationForm(request.POST)
-        if form.is_valid():
-            user = form.save()
-            login(request, user)
+        if await sync_to_async(form.is_valid)():  # Checks the username is free and runs the password validators
+            user = await sync_to_async(form.save)()
+            await alogin(request, user)
             return redirect('home')
         return render(request, 'users/register.html', {"form": form})
\ No newline at end of file